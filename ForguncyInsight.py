@@ -36,23 +36,22 @@ try:
 except ImportError:
     DND_AVAILABLE = False
 
-# python-docx
-from docx import Document
-from docx.shared import Inches, Pt, Cm, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.enum.style import WD_STYLE_TYPE
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-
-# openpyxl for Excel
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-    from openpyxl.utils import get_column_letter
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
+# python-docx / openpyxl は読み込みに時間がかかるため、出力時（またはウィンドウ表示後の
+# バックグラウンドスレッド）で読み込む。ここではインストール有無のみ判定する。
+import importlib.util
+import threading
+EXCEL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+
+
+def _preload_export_libraries() -> None:
+    """python-docx / openpyxl を事前に読み込む（バックグラウンドスレッド用）"""
+    try:
+        import docx  # noqa: F401
+        if EXCEL_AVAILABLE:
+            import openpyxl  # noqa: F401
+    except Exception:
+        # 読み込みに失敗しても出力時に改めて読み込む
+        pass
 
 
 # =============================================================================
@@ -986,6 +985,10 @@ def _classify_command_type(commands: list) -> str:
 
 def _set_table_header_style(table, header_row_idx=0):
     """テーブルヘッダー行のスタイル設定"""
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import RGBColor
+
     for cell in table.rows[header_row_idx].cells:
         cell._element.get_or_add_tcPr()
         shading = OxmlElement('w:shd')
@@ -999,6 +1002,11 @@ def _set_table_header_style(table, header_row_idx=0):
 
 def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
     """詳細仕様書ドキュメントを生成"""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml.ns import qn
+    from docx.shared import Pt
+
     os.makedirs(output_dir, exist_ok=True)
     doc = Document()
 
@@ -1299,6 +1307,8 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
     """Excel形式で出力"""
     if not EXCEL_AVAILABLE:
         raise ImportError("openpyxlがインストールされていません。pip install openpyxl を実行してください。")
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Border, Side, PatternFill
 
     os.makedirs(output_dir, exist_ok=True)
     wb = Workbook()
@@ -1711,6 +1721,9 @@ class ForguncyInsightApp:
         self.setup_ui()
         self.setup_menu()
 
+        # ウィンドウ表示後に出力用ライブラリをバックグラウンドで読み込んでおく
+        self.root.after(500, lambda: threading.Thread(target=_preload_export_libraries, daemon=True).start())
+
         # 起動時ライセンスチェック（UIセットアップ後）
         if not self.license_manager.is_activated:
             self.root.after(100, self._show_license_dialog)
@@ -7,23 +7,31 @@ Forguncy Insight - Core モジュール
 """
 
 from core.logging_setup import logger, get_log_dir, setup_logging
-from core.safety_checks import ZipSafetyError, check_zip_safety, ZIP_SAFETY_LIMITS
+from core.cancellation import CancellationToken, OperationCancelled
+from core.safety_checks import (
+    ZipSafetyError, check_zip_safety, ZIP_SAFETY_LIMITS,
+    FgcpArchive, open_checked_archive, VerifyReport
+)
 from core.models import (
     AnalysisEvent, AnalysisResult, AnalysisSummary,
     ColumnInfo, RelationInfo, TableInfo, WorkflowInfo,
     PageInfo, ButtonInfo, FormulaInfo, CellCommandInfo,
     ServerCommandInfo, ParameterInfo, CommandInfo,
     StateInfo, TransitionInfo, AssigneeInfo, ConditionInfo,
-    DiffResult
+    DiffResult, DiffRecord
 )
+from core.events import AnalysisEventBus, EventBatch
 
 __all__ = [
     'logger', 'get_log_dir', 'setup_logging',
+    'CancellationToken', 'OperationCancelled',
     'ZipSafetyError', 'check_zip_safety', 'ZIP_SAFETY_LIMITS',
+    'FgcpArchive', 'open_checked_archive', 'VerifyReport',
     'AnalysisEvent', 'AnalysisResult', 'AnalysisSummary',
     'ColumnInfo', 'RelationInfo', 'TableInfo', 'WorkflowInfo',
     'PageInfo', 'ButtonInfo', 'FormulaInfo', 'CellCommandInfo',
     'ServerCommandInfo', 'ParameterInfo', 'CommandInfo',
     'StateInfo', 'TransitionInfo', 'AssigneeInfo', 'ConditionInfo',
-    'DiffResult',
+    'DiffResult', 'DiffRecord',
+    'AnalysisEventBus', 'EventBatch',
 ]
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Forguncy Insight - コマンドライン版エントリポイント
+
+使用方法:
+    python -m core analyze <ファイル|フォルダ|globパターン>...
+"""
+
+import sys
+
+from core.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
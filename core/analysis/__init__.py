@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Forguncy Insight - 静的解析モジュール
+
+解析結果（AnalysisResult）のコマンドツリー・テーブル定義をもとに、
+パフォーマンス上の問題や構造上の問題を検出する。
+"""
+
+from core.analysis.commands import (
+    ROOT_KIND_LABELS, CommandRoot, format_command_path, iter_command_roots, walk_commands
+)
+from core.analysis.perf_lint import SEVERITY_LABELS, detect_n_plus_one
+from core.analysis.sql import parse_sql, tokenize_sql
+from core.analysis.index_advisor import recommend_indexes
+from core.analysis.cost_model import CostEstimator, estimate_costs
+from core.analysis.formulas import analyze_formulas, parse_formula, tokenize_formula
+from core.analysis.project_index import (
+    REFERENCE_KIND_LABELS, CallSite, ColumnReference, ProjectIndex, TableAccess
+)
+from core.analysis.workflows import analyze_workflows
+from core.analysis.navigation import build_navigation_graph
+from core.analysis.dead_code import ARTIFACT_KIND_LABELS, find_unused_artifacts
+from core.analysis.pipeline import run_static_analysis
+
+__all__ = [
+    'CommandRoot', 'iter_command_roots', 'walk_commands', 'format_command_path', 'ROOT_KIND_LABELS',
+    'detect_n_plus_one', 'SEVERITY_LABELS',
+    'parse_sql', 'tokenize_sql', 'recommend_indexes', 'estimate_costs', 'CostEstimator',
+    'parse_formula', 'tokenize_formula', 'analyze_formulas',
+    'ProjectIndex', 'TableAccess', 'CallSite', 'ColumnReference', 'REFERENCE_KIND_LABELS',
+    'analyze_workflows', 'build_navigation_graph',
+    'find_unused_artifacts', 'ARTIFACT_KIND_LABELS',
+    'run_static_analysis',
+]
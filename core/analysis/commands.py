@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コマンドツリー走査モジュール
+
+サーバーコマンド・ボタン・セルコマンド・ワークフロー遷移のコマンドツリーを
+共通の形（CommandRoot）で列挙し、ループの入れ子の深さと起点からのパスを付けて走査する。
+各静的解析はこのモジュールを通してコマンドを参照する。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Set, Tuple
+
+from core.analysis.graph import strongly_connected_components
+from core.models import AnalysisResult, CommandInfo
+
+
+# コマンド種別の分類
+LOOP_COMMAND_TYPES = frozenset({'LoopCommand'})
+TABLE_WRITE_COMMAND_TYPES = frozenset({
+    'UpdateTableDataCommand', 'InsertTableDataCommand', 'DeleteTableDataCommand',
+})
+SQL_COMMAND_TYPES = frozenset({'ExecuteSqlCommand'})
+DATA_ACCESS_COMMAND_TYPES = SQL_COMMAND_TYPES | TABLE_WRITE_COMMAND_TYPES
+CALL_SERVER_COMMAND_TYPES = frozenset({'CallServerCommandCommand'})
+
+# CommandRoot.kind
+ROOT_SERVER_COMMAND = 'server_command'
+ROOT_BUTTON = 'button'
+ROOT_CELL_COMMAND = 'cell_command'
+ROOT_WORKFLOW = 'workflow'
+ROOT_KIND_LABELS = {
+    ROOT_SERVER_COMMAND: 'サーバーコマンド',
+    ROOT_BUTTON: 'ボタン',
+    ROOT_CELL_COMMAND: 'セルコマンド',
+    ROOT_WORKFLOW: 'ワークフロー',
+}
+
+
+@dataclass
+class CommandRoot:
+    """コマンドツリーの起点（サーバーコマンド・ボタン・セルコマンド・ワークフロー遷移）"""
+    kind: str
+    owner: str       # サーバーコマンド名・ページ名・テーブル名
+    location: str    # 表示用の場所（例: 'ページ: 受注一覧 / ボタン: 保存'）
+    commands: list = field(default_factory=list)
+
+
+def iter_command_roots(analysis: AnalysisResult) -> Iterator[CommandRoot]:
+    """プロジェクト内のすべてのコマンドツリーの起点を列挙"""
+    for cmd in analysis.server_commands:
+        yield CommandRoot(ROOT_SERVER_COMMAND, cmd.name, f'サーバーコマンド: {cmd.name}', cmd.raw_commands)
+
+    for page in analysis.pages:
+        for btn in page.buttons:
+            yield CommandRoot(ROOT_BUTTON, page.name,
+                              f'ページ: {page.name} / ボタン: {btn.name or "(名称なし)"} ({btn.cell})', btn.commands)
+        for cc in page.cell_commands:
+            yield CommandRoot(ROOT_CELL_COMMAND, page.name,
+                              f'ページ: {page.name} / セル: {cc.cell} ({cc.event})', cc.commands)
+
+    for wf in analysis.workflows:
+        for t in wf.transitions:
+            yield CommandRoot(ROOT_WORKFLOW, wf.table_name,
+                              f'ワークフロー: {wf.table_name} / {t.from_state} → {t.to_state} ({t.action})',
+                              t.commands)
+
+
+def walk_commands(commands: List[CommandInfo], path: Tuple[str, ...] = (),
+                  loop_depth: int = 0) -> Iterator[Tuple[CommandInfo, Tuple[str, ...], int]]:
+    """
+    コマンドツリーを深さ優先で走査
+
+    Yields:
+        (コマンド, 起点からのコマンド説明のパス（自身を含む）, 自身を囲むループの数)
+    """
+    for cmd in commands:
+        cmd_path = path + (cmd.description,)
+        yield cmd, cmd_path, loop_depth
+        if cmd.sub_commands:
+            inner_depth = loop_depth + 1 if cmd.type in LOOP_COMMAND_TYPES else loop_depth
+            yield from walk_commands(cmd.sub_commands, cmd_path, inner_depth)
+
+
+def called_server_command(cmd: CommandInfo) -> str:
+    """サーバーコマンド呼出の呼出先名（呼出コマンドでなければ空文字）"""
+    if cmd.type in CALL_SERVER_COMMAND_TYPES:
+        return (cmd.details or {}).get('server_command') or ''
+    return ''
+
+
+def format_command_path(path, item_max: int = 40) -> str:
+    """コマンド説明のパスを表示用の1行にする（各要素は item_max 文字で切り詰め）"""
+    items = []
+    for desc in path:
+        desc = ' '.join(str(desc).split())
+        items.append(desc if len(desc) <= item_max else desc[:item_max - 3] + '...')
+    return ' > '.join(items)
+
+
+def build_page_reach(analysis: AnalysisResult) -> Dict[str, Set[str]]:
+    """
+    サーバーコマンド名 -> そのコマンドを（呼出の連鎖も含めて）実行するページ名の集合
+
+    ページ（ボタン・セルコマンド）から直接呼び出されるコマンドを起点に、
+    サーバーコマンド間の呼出関係をたどって伝播する。
+    """
+    callees: Dict[str, Set[str]] = {}
+    reach: Dict[str, Set[str]] = {}
+    for root in iter_command_roots(analysis):
+        for cmd, _, _ in walk_commands(root.commands):
+            target = called_server_command(cmd)
+            if not target:
+                continue
+            if root.kind == ROOT_SERVER_COMMAND:
+                callees.setdefault(root.owner, set()).add(target)
+            elif root.kind in (ROOT_BUTTON, ROOT_CELL_COMMAND):
+                reach.setdefault(target, set()).add(root.owner)
+
+    return propagate_page_reach(reach, callees)
+
+
+def propagate_page_reach(reach: Dict[str, Set[str]], callees: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+    """
+    ページから直接呼ばれるサーバーコマンドのページ集合を、サーバーコマンド間の呼出先へ伝播
+
+    呼出グラフを強連結成分にまとめ、呼出元の成分から順に（トポロジカル順に）1回だけ伝播する
+    （サーバーコマンド数＋呼出関係数に比例する回数の集合演算）。相互に呼び出し合うコマンドは同じページ集合になる。
+
+    Args:
+        reach: サーバーコマンド名 -> 直接呼び出すページ名の集合（更新して返す）
+        callees: サーバーコマンド名 -> そのコマンドが呼び出すサーバーコマンド名の集合
+    """
+    edges = {name: list(targets) for name, targets in callees.items()}
+    nodes = list(dict.fromkeys(list(reach) + list(edges) + [t for ts in edges.values() for t in ts]))
+    components = strongly_connected_components(nodes, edges)
+    component_of = {member: i for i, comp in enumerate(components) for member in comp}
+
+    # 逆トポロジカル順の逆 = 呼出元の成分が先
+    incoming: List[Set[str]] = [set() for _ in components]
+    for comp_id in range(len(components) - 1, -1, -1):
+        pages = incoming[comp_id]
+        for member in components[comp_id]:
+            pages.update(reach.get(member, ()))
+        if not pages:
+            continue
+        for member in components[comp_id]:
+            reach[member] = pages
+            for target in edges.get(member, ()):
+                if component_of[target] != comp_id:
+                    incoming[component_of[target]].update(pages)
+    return reach
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静的コストモデル
+
+各処理（サーバーコマンド・ボタン・セルコマンド・ワークフロー遷移）のコマンドツリーに
+重みを付けて合計し、負荷試験の前に重い処理の当たりを付ける。
+
+- SQL実行・テーブル更新・メール送信はそれぞれ COMMAND_WEIGHTS の重み
+- ループ内のコマンドは入れ子1段ごとに LOOP_MULTIPLIER 倍
+- サーバーコマンド呼出は CALL_WEIGHT ＋ 呼出先のコスト（呼出先は1回だけ計算してメモ化。
+  相互に呼び出し合うコマンドの組は組全体のコスト）
+- 条件分岐は両方の分岐を合計（最悪ケース）
+
+値は相対的な目安であり、実行時間の予測ではない。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from core.analysis.commands import (
+    ROOT_SERVER_COMMAND, SQL_COMMAND_TYPES, TABLE_WRITE_COMMAND_TYPES,
+    called_server_command, iter_command_roots, walk_commands
+)
+from core.analysis.graph import strongly_connected_components
+from core.models import AnalysisResult, HandlerCost
+
+
+COMMAND_WEIGHTS = {
+    'ExecuteSqlCommand': 10.0,
+    'UpdateTableDataCommand': 5.0,
+    'InsertTableDataCommand': 5.0,
+    'DeleteTableDataCommand': 5.0,
+    'SendEmailCommand': 20.0,
+}
+DEFAULT_WEIGHT = 0.1
+CALL_WEIGHT = 2.0
+LOOP_MULTIPLIER = 10.0
+
+# 出力する上位件数
+MAX_HOT_PATHS = 50
+
+
+@dataclass
+class _Cost:
+    cost: float = 0.0
+    sql: int = 0
+    write: int = 0
+    email: int = 0
+    call: int = 0
+    max_depth: int = 0
+    hot_cost: float = 0.0
+    hot_path: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class CostEstimator:
+    """
+    コマンドツリーのコストを計算（サーバーコマンド単位でメモ化）
+
+    サーバーコマンドは呼出グラフを強連結成分にまとめ、呼出先の成分から順に（逆トポロジカル順に）1回ずつ計算する。
+    相互に呼び出し合う（再帰する）コマンドの組は、組の全コマンドのコストを合計した1つのコストを共有する
+    （計算の順序によって結果が変わらない）。
+    """
+
+    def __init__(self, analysis: AnalysisResult):
+        self._by_name = {c.name: c for c in analysis.server_commands}
+        self._memo: Dict[str, _Cost] = {}
+        self._resolve()
+
+    def server_command(self, name: str) -> _Cost:
+        # 解析対象外（機能制限など）のコマンドは0
+        return self._memo.get(name) or _Cost()
+
+    def _resolve(self) -> None:
+        edges = {
+            name: list(dict.fromkeys(target for target in (called_server_command(cmd) for cmd, _, _
+                                                           in walk_commands(sc.raw_commands))
+                                     if target in self._by_name))
+            for name, sc in self._by_name.items()
+        }
+        for component in strongly_connected_components(list(self._by_name), edges):
+            members = set(component)
+            costs = [self.commands(self._by_name[name].raw_commands, members) for name in component]
+            if len(component) == 1 and component[0] not in edges[component[0]]:
+                self._memo[component[0]] = costs[0]
+                continue
+            # 再帰呼出の組: 組の中のどのコマンドからも、組の全コマンドが実行されうる
+            shared = _Cost()
+            for c in costs:
+                shared.cost += c.cost
+                shared.sql += c.sql
+                shared.write += c.write
+                shared.email += c.email
+                shared.call += c.call
+                shared.max_depth = max(shared.max_depth, c.max_depth)
+                if c.hot_cost > shared.hot_cost:
+                    shared.hot_cost, shared.hot_path = c.hot_cost, c.hot_path
+            for name in component:
+                self._memo[name] = shared
+
+    def commands(self, commands: list, recursive: Set[str] = frozenset()) -> _Cost:
+        """
+        コマンドツリーのコスト
+
+        Args:
+            recursive: 呼出先のコストを加算しないサーバーコマンド名（同じ強連結成分 = 再帰呼出）
+        """
+        total = _Cost()
+        for cmd, path, depth in walk_commands(commands):
+            multiplier = LOOP_MULTIPLIER ** depth
+            total.max_depth = max(total.max_depth, depth)
+            item_cost = COMMAND_WEIGHTS.get(cmd.type, DEFAULT_WEIGHT) * multiplier
+
+            if cmd.type in SQL_COMMAND_TYPES:
+                total.sql += 1
+            elif cmd.type in TABLE_WRITE_COMMAND_TYPES:
+                total.write += 1
+            elif cmd.type == 'SendEmailCommand':
+                total.email += 1
+
+            target = called_server_command(cmd)
+            hot_cost, hot_path = item_cost, path
+            if target:
+                callee = _Cost() if target in recursive else self.server_command(target)
+                total.call += 1 + callee.call
+                total.sql += callee.sql
+                total.write += callee.write
+                total.email += callee.email
+                total.max_depth = max(total.max_depth, depth + callee.max_depth)
+                item_cost = (CALL_WEIGHT + callee.cost) * multiplier
+                hot_cost = item_cost
+                if callee.hot_path:
+                    # 呼出先で最も重いコマンドまでたどる
+                    hot_cost, hot_path = callee.hot_cost * multiplier, path + callee.hot_path
+
+            total.cost += item_cost
+            if hot_cost > total.hot_cost:
+                total.hot_cost, total.hot_path = hot_cost, hot_path
+        return total
+
+
+def estimate_costs(analysis: AnalysisResult) -> List[HandlerCost]:
+    """
+    全処理のコストを見積もり、重い順に上位 MAX_HOT_PATHS 件を返す
+
+    各サーバーコマンドのコストは1回だけ計算し、呼出元では再利用する（全体で線形時間）。
+    """
+    estimator = CostEstimator(analysis)
+    results = []
+    for root in iter_command_roots(analysis):
+        if not root.commands:
+            continue
+        if root.kind == ROOT_SERVER_COMMAND:
+            c = estimator.server_command(root.owner)
+        else:
+            c = estimator.commands(root.commands)
+        if c.cost <= 0:
+            continue
+        results.append(HandlerCost(
+            location=root.location,
+            kind=root.kind,
+            cost=round(c.cost, 1),
+            sql_count=c.sql,
+            write_count=c.write,
+            email_count=c.email,
+            call_count=c.call,
+            max_loop_depth=c.max_depth,
+            hot_path=list(c.hot_path),
+        ))
+    results.sort(key=lambda h: (-h.cost, h.location))
+    return results[:MAX_HOT_PATHS]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+未使用定義の検出
+
+ProjectIndex（全コマンドツリーを1回だけ走査した参照索引）をもとに、どこからも使われていない
+定義を列挙する。削除するとプロジェクトファイル（.fgcp）が小さくなり、発行時間も短くなる。
+
+実際に実行される起点（画面とそれが使うマスターページ、ワークフロー、スケジュールタスクのトリガーを持つ
+サーバーコマンド）から呼出関係をたどり、到達できないものを未使用とする。未使用のサーバーコマンドからしか
+呼ばれないサーバーコマンドや、未使用のコマンドからしか読み書きされないテーブルも未使用になる。
+
+- テーブル: 起点から到達できるコマンド・SQL・ワークフローのいずれからも読み書きされない
+- サーバーコマンド: 起点から呼出の連鎖で到達できない
+- マスターページ: どの画面からも（マスターページの入れ子を含めて）使われない
+
+画面のデータバインド（一覧表示など）やWeb APIからの呼出は解析対象外のため、
+削除前に該当する使い方がないことを確認する必要がある。
+"""
+
+from typing import List, Set
+
+from core.analysis.commands import ROOT_BUTTON, ROOT_CELL_COMMAND, ROOT_SERVER_COMMAND, ROOT_WORKFLOW
+from core.analysis.graph import reachable_from
+from core.analysis.project_index import ProjectIndex
+from core.models import AnalysisResult, UnusedArtifact
+
+
+ARTIFACT_TABLE = 'table'
+ARTIFACT_SERVER_COMMAND = 'server_command'
+ARTIFACT_MASTER_PAGE = 'master_page'
+ARTIFACT_KIND_LABELS = {
+    ARTIFACT_TABLE: 'テーブル',
+    ARTIFACT_SERVER_COMMAND: 'サーバーコマンド',
+    ARTIFACT_MASTER_PAGE: 'マスターページ',
+}
+
+# 起点として扱うサーバーコマンドのトリガー型名に含まれる語（小文字で比較）
+SCHEDULE_TRIGGER_KEYWORDS = ('schedule', 'timer')
+
+
+def _live_pages(analysis: AnalysisResult) -> Set[str]:
+    """画面と、画面から（マスターページの入れ子を含めて）使われるマスターページの名前"""
+    master_of = {p.name: p.metrics.master_page for p in analysis.pages if p.metrics.master_page}
+    live = {p.name for p in analysis.pages if p.page_type != 'masterPage'}
+    for name in list(live):
+        master = master_of.get(name)
+        while master and master not in live:
+            live.add(master)
+            master = master_of.get(master)
+    return live
+
+
+def _is_scheduled(cmd) -> bool:
+    return any(keyword in trigger.lower() for trigger in cmd.trigger_types for keyword in SCHEDULE_TRIGGER_KEYWORDS)
+
+
+def _live_server_commands(analysis: AnalysisResult, index: ProjectIndex, live_pages: Set[str]) -> Set[str]:
+    """起点（画面・ワークフロー・スケジュールタスク）から呼出の連鎖で到達できるサーバーコマンド"""
+    roots = [cmd.name for cmd in analysis.server_commands if _is_scheduled(cmd)]
+    for cmd in analysis.server_commands:
+        for site in index.callers_of(cmd.name):
+            if site.root_kind == ROOT_WORKFLOW or (
+                    site.root_kind in (ROOT_BUTTON, ROOT_CELL_COMMAND) and site.owner in live_pages):
+                roots.append(cmd.name)
+                break
+    edges = {name: list(targets) for name, targets in index.server_command_callees().items()}
+    return reachable_from(roots, edges)
+
+
+def find_unused_artifacts(analysis: AnalysisResult, index: ProjectIndex = None) -> List[UnusedArtifact]:
+    """
+    未使用のテーブル・サーバーコマンド・マスターページを列挙
+
+    Args:
+        analysis: 解析結果
+        index: 作成済みの参照索引（省略時は作成する）
+
+    Returns:
+        List[UnusedArtifact]: 種別（テーブル・サーバーコマンド・マスターページ）ごとに定義順
+    """
+    index = index or ProjectIndex(analysis)
+    unused = []
+
+    live_pages = _live_pages(analysis)
+    live_commands = _live_server_commands(analysis, index, live_pages)
+
+    def is_live(kind: str, owner: str) -> bool:
+        if kind == ROOT_SERVER_COMMAND:
+            return owner in live_commands
+        if kind in (ROOT_BUTTON, ROOT_CELL_COMMAND):
+            return owner in live_pages
+        return True
+
+    referenced_by_relation = {rel.target_table for t in analysis.tables for rel in t.relations
+                              if rel.target_table != t.name}
+    for t in analysis.tables:
+        accesses = index.table_access(t.name)
+        if any(is_live(a.root_kind, a.owner) for a in accesses):
+            continue
+        if accesses:
+            note = '未使用のサーバーコマンド・マスターページからのみ読み書きされています'
+        elif t.name in referenced_by_relation:
+            note = 'リレーションで参照されています'
+        else:
+            note = ''
+        unused.append(UnusedArtifact(ARTIFACT_TABLE, t.name, t.folder, note))
+
+    for cmd in analysis.server_commands:
+        if cmd.name in live_commands:
+            continue
+        callers = index.callers_of(cmd.name)
+        if not callers:
+            note = ''
+        elif all(site.root_kind == ROOT_SERVER_COMMAND and site.owner == cmd.name for site in callers):
+            note = '自身からのみ呼び出されています'
+        else:
+            note = '未使用のサーバーコマンド・マスターページからのみ呼び出されています'
+        unused.append(UnusedArtifact(ARTIFACT_SERVER_COMMAND, cmd.name, cmd.folder, note))
+
+    for page in analysis.pages:
+        if page.page_type == 'masterPage' and page.name not in live_pages:
+            used_by_master = any(p.metrics.master_page == page.name for p in analysis.pages)
+            note = '未使用のマスターページからのみ使われています' if used_by_master else ''
+            unused.append(UnusedArtifact(ARTIFACT_MASTER_PAGE, page.name, page.folder, note))
+
+    return unused
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数式依存関係解析モジュール
+
+ページごとにセル数式（FormulaInfo）をトークン分割してセル参照・範囲参照を取り出し、
+「数式セル → 参照先セル」の依存グラフを作成する。グラフから以下を検出する。
+
+- 循環参照（強連結成分。自己参照を含む）
+- 深い依存チェーン（再計算が連鎖する段数）
+- 被参照数（ファンイン）の多いセル（値の変更で多数の数式が再計算される）
+
+同じ数式テキストは1回だけ解析する（parse_formula の結果をキャッシュ）。
+別シート参照（Sheet!A1）はページ内の依存関係に含めない。
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from core.analysis.graph import find_cycles, longest_chain, strongly_connected_components
+from core.models import AnalysisResult, FormulaGraphReport, PageInfo
+
+
+# 報告する閾値
+DEEP_CHAIN_THRESHOLD = 5       # この段数以上の依存チェーンを報告
+HIGH_FAN_IN_THRESHOLD = 10     # この数以上の数式から参照されるセルを報告
+MAX_FAN_IN_CELLS = 5           # ページごとに報告する被参照セル数
+MAX_CYCLES_PER_PAGE = 10
+MAX_RANGE_CELLS = 10000        # ファンイン集計で展開する範囲の上限（全列参照などは除外）
+
+_FORMULA_TOKEN_RE = re.compile(r"""
+    (?P<string>"(?:[^"]|"")*")
+  | (?P<sheetref>(?:'[^']+'|[^\W\d][\w.]*)!\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)
+  | (?P<range>\$?[A-Za-z]{1,3}\$?\d+:\$?[A-Za-z]{1,3}\$?\d+)(?![\w(.])
+  | (?P<cell>\$?[A-Za-z]{1,3}\$?\d+)(?![\w(!.])
+  | (?P<bracket>\[[^\]]*\])
+  | (?P<name>[^\W\d]\w*)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ws>\s+)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+_CELL_RE = re.compile(r'\$?([A-Za-z]{1,3})\$?(\d+)')
+
+# (列番号, 行番号) ※1始まり
+Cell = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class FormulaRefs:
+    """数式から取り出したページ内の参照"""
+    cells: Tuple[Cell, ...]
+    ranges: Tuple[Tuple[Cell, Cell], ...]
+    functions: Tuple[str, ...]
+    fields: Tuple[Tuple[str, str], ...] = ()   # テーブル列の参照 (修飾子, 名前)（Table.Column / [Table].[Column] / [Column]）
+
+
+def _column_number(letters: str) -> int:
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+
+def _column_letters(n: int) -> str:
+    letters = ''
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def parse_cell(address: str):
+    """'A1' / '$B$2' → (列番号, 行番号)。セル番地でなければ None"""
+    m = _CELL_RE.fullmatch(address.strip())
+    if not m:
+        return None
+    return _column_number(m.group(1)), int(m.group(2))
+
+
+def cell_name(cell: Cell) -> str:
+    return f'{_column_letters(cell[0])}{cell[1]}'
+
+
+def tokenize_formula(formula: str) -> List[Tuple[str, str]]:
+    """数式を (種別, テキスト) のトークン列に分割（空白は除く）"""
+    return [(m.lastgroup, m.group()) for m in _FORMULA_TOKEN_RE.finditer(formula or '')
+            if m.lastgroup != 'ws']
+
+
+@lru_cache(maxsize=16384)
+def parse_formula(formula: str) -> FormulaRefs:
+    """数式からセル参照・範囲参照・関数名・列参照を取り出す（同一テキストはキャッシュから返す）"""
+    cells, ranges, functions, fields = [], [], [], []
+    tokens = tokenize_formula(formula)
+    for i, (kind, text) in enumerate(tokens):
+        if kind in ('name', 'bracket') and i >= 2 and tokens[i - 1][1] == '.' and tokens[i - 2][0] in ('name', 'bracket'):
+            fields.append((tokens[i - 2][1].strip('[]'), text.strip('[]')))
+        elif kind == 'bracket' and not (i + 1 < len(tokens) and tokens[i + 1][1] == '.'):
+            fields.append(('', text[1:-1]))
+        if kind == 'cell':
+            cells.append(parse_cell(text))
+        elif kind == 'range':
+            start, end = (parse_cell(part) for part in text.split(':'))
+            ranges.append(((min(start[0], end[0]), min(start[1], end[1])),
+                           (max(start[0], end[0]), max(start[1], end[1]))))
+        elif kind == 'name' and i + 1 < len(tokens) and tokens[i + 1][1] == '(':
+            functions.append(text.upper())
+    return FormulaRefs(tuple(cells), tuple(ranges), tuple(functions), tuple(fields))
+
+
+# =============================================================================
+# 依存グラフ
+# =============================================================================
+class _FormulaCellIndex:
+    """数式セルを列ごとに行番号でソートして保持（範囲内の数式セルを二分探索で求める）"""
+
+    def __init__(self, cells):
+        self._rows: Dict[int, List[int]] = {}
+        for col, row in cells:
+            self._rows.setdefault(col, []).append(row)
+        for rows in self._rows.values():
+            rows.sort()
+
+    def in_range(self, start: Cell, end: Cell):
+        for col, rows in self._rows.items():
+            if start[0] <= col <= end[0]:
+                for row in rows[bisect_left(rows, start[1]):bisect_right(rows, end[1])]:
+                    yield col, row
+
+
+def analyze_page_formulas(page: PageInfo) -> FormulaGraphReport:
+    """1ページ分の数式依存グラフを解析"""
+    formula_cells: Dict[Cell, FormulaRefs] = {}
+    for f in page.formulas:
+        cell = parse_cell(f.cell)
+        if cell is not None:
+            formula_cells[cell] = parse_formula(f.formula)
+
+    index = _FormulaCellIndex(formula_cells)
+    edges: Dict[Cell, List[Cell]] = {}
+    fan_in: Dict[Cell, int] = {}
+    for cell, refs in formula_cells.items():
+        targets = set(refs.cells)
+        for ref in refs.cells:
+            fan_in[ref] = fan_in.get(ref, 0) + 1
+        for start, end in refs.ranges:
+            size = (end[0] - start[0] + 1) * (end[1] - start[1] + 1)
+            if size <= MAX_RANGE_CELLS:
+                for col in range(start[0], end[0] + 1):
+                    for row in range(start[1], end[1] + 1):
+                        fan_in[(col, row)] = fan_in.get((col, row), 0) + 1
+            # 依存辺は範囲内の数式セルにのみ張る（範囲の大きさに依存しない）
+            targets.update(index.in_range(start, end))
+        edges[cell] = [t for t in targets if t in formula_cells]
+
+    components = strongly_connected_components(sorted(formula_cells), edges)
+    cycles = [sorted(c) for c in find_cycles(components, edges)]
+    chain = longest_chain(components, edges)
+
+    high_fan_in = sorted(((c, n) for c, n in fan_in.items() if n >= HIGH_FAN_IN_THRESHOLD),
+                         key=lambda cn: (-cn[1], cn[0]))[:MAX_FAN_IN_CELLS]
+
+    return FormulaGraphReport(
+        page=page.name,
+        formula_count=len(page.formulas),
+        distinct_formulas=len({f.formula for f in page.formulas}),
+        max_chain_depth=len(chain),
+        deepest_chain=[cell_name(min(component)) for component in chain],
+        cycles=[[cell_name(c) for c in cycle] for cycle in cycles[:MAX_CYCLES_PER_PAGE]],
+        cycle_count=len(cycles),
+        high_fan_in=[[cell_name(c), n] for c, n in high_fan_in],
+    )
+
+
+def analyze_formulas(analysis: AnalysisResult) -> List[FormulaGraphReport]:
+    """
+    全ページの数式依存グラフを解析し、問題のあるページの報告を返す
+
+    Returns:
+        List[FormulaGraphReport]: 循環参照・深いチェーン・高ファンインのいずれかがあるページ
+            （循環参照の多い順、次にチェーンの深い順）
+    """
+    reports = []
+    for page in analysis.pages:
+        if not page.formulas:
+            continue
+        report = analyze_page_formulas(page)
+        if report.cycle_count or report.max_chain_depth >= DEEP_CHAIN_THRESHOLD or report.high_fan_in:
+            reports.append(report)
+    reports.sort(key=lambda r: (-r.cycle_count, -r.max_chain_depth, r.page))
+    return reports
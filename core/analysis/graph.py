@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+有向グラフの共通処理
+
+数式の依存関係・ワークフローの状態遷移・画面遷移など、各解析のグラフを
+「ノードの列 + ノード -> 隣接ノードの列」の形で受け取り、線形時間で処理する。
+再帰を使わないため、数千ノードの深いグラフでも再帰上限に達しない。
+"""
+
+from typing import Dict, Hashable, Iterable, List, Sequence, Set
+
+
+def strongly_connected_components(nodes: Iterable[Hashable],
+                                  edges: Dict[Hashable, Sequence[Hashable]]) -> List[List[Hashable]]:
+    """
+    Tarjan法（反復版）で強連結成分を求める
+
+    Returns:
+        強連結成分の一覧。逆トポロジカル順（辺の先の成分が先）に並ぶ
+    """
+    index: Dict[Hashable, int] = {}
+    low: Dict[Hashable, int] = {}
+    on_stack = set()
+    stack: list = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child_idx = work[-1]
+            if child_idx == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            children = edges.get(node, ())
+            if child_idx < len(children):
+                work[-1] = (node, child_idx + 1)
+                child = children[child_idx]
+                if child not in index:
+                    work.append((child, 0))
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def find_cycles(components: List[List[Hashable]], edges: Dict[Hashable, Sequence[Hashable]]) -> List[List[Hashable]]:
+    """強連結成分のうち循環になっているもの（2ノード以上、または自己ループ）"""
+    return [c for c in components if len(c) > 1 or c[0] in edges.get(c[0], ())]
+
+
+def reachable_from(starts: Iterable[Hashable], edges: Dict[Hashable, Sequence[Hashable]]) -> Set[Hashable]:
+    """starts から辺をたどって到達できるノードの集合（starts を含む）"""
+    seen = set(starts)
+    stack = list(seen)
+    while stack:
+        for child in edges.get(stack.pop(), ()):
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def longest_chain(components: List[List[Hashable]],
+                  edges: Dict[Hashable, Sequence[Hashable]]) -> List[List[Hashable]]:
+    """
+    強連結成分を1ノードとみなした最長の経路（成分の並び）
+
+    Args:
+        components: strongly_connected_components の結果（逆トポロジカル順）
+    """
+    component_of = {member: i for i, comp in enumerate(components) for member in comp}
+    depth = [0] * len(components)
+    next_comp = [-1] * len(components)
+    for comp_id, component in enumerate(components):
+        best, best_next = 0, -1
+        for member in component:
+            for target in edges.get(member, ()):
+                t = component_of[target]
+                if t != comp_id and depth[t] > best:
+                    best, best_next = depth[t], t
+        depth[comp_id] = best + 1
+        next_comp[comp_id] = best_next
+
+    chain = []
+    if components:
+        comp_id = max(range(len(components)), key=lambda c: (depth[c], -c))
+        while comp_id != -1:
+            chain.append(components[comp_id])
+            comp_id = next_comp[comp_id]
+    return chain
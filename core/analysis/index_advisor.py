@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+インデックス推奨モジュール
+
+ExecuteSqlCommand の SQL から検索条件（WHERE）・結合条件（JOIN ON）・並び順（ORDER BY /
+GROUP BY）で使われるカラムを集計し、テーブル定義と照合してインデックスの候補を順位付けする。
+主キー・一意制約のカラムは既にインデックスがあるため候補から除外する。
+
+スコアは「句の重み × (使用コマンド数 + ページ数 × PAGE_WEIGHT)」で、画面から頻繁に
+実行される検索条件ほど上位になる。
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from core.analysis.commands import (
+    ROOT_BUTTON, ROOT_CELL_COMMAND, ROOT_SERVER_COMMAND, SQL_COMMAND_TYPES,
+    build_page_reach, iter_command_roots, walk_commands
+)
+from core.analysis.sql import (
+    CLAUSE_GROUP_BY, CLAUSE_HAVING, CLAUSE_JOIN, CLAUSE_ORDER_BY, CLAUSE_WHERE,
+    build_table_columns, parse_sql, resolve_column_refs
+)
+from core.models import AnalysisResult, IndexRecommendation
+
+
+# 句ごとの重み（検索・結合条件は並び順より効果が大きい）
+CLAUSE_WEIGHTS = {
+    CLAUSE_WHERE: 3.0,
+    CLAUSE_JOIN: 3.0,
+    CLAUSE_ORDER_BY: 1.0,
+    CLAUSE_GROUP_BY: 1.0,
+    CLAUSE_HAVING: 0.5,
+}
+
+# 画面から実行されるSQLはユーザー操作ごとに走るため重く見る
+PAGE_WEIGHT = 2.0
+
+# 出力する推奨の上限と、使用箇所の例の件数
+MAX_RECOMMENDATIONS = 100
+MAX_EXAMPLES = 3
+
+
+def recommend_indexes(analysis: AnalysisResult) -> List[IndexRecommendation]:
+    """
+    インデックス推奨を作成
+
+    Returns:
+        List[IndexRecommendation]: スコアの高い順（最大 MAX_RECOMMENDATIONS 件）
+    """
+    table_columns = build_table_columns(analysis.tables)
+    indexed: Set[Tuple[str, str]] = set()
+    for t in analysis.tables:
+        indexed.update((t.name, pk) for pk in t.primary_key)
+        indexed.update((t.name, c.name) for c in t.columns if c.unique)
+
+    page_reach = build_page_reach(analysis)
+
+    # (テーブル, カラム) -> 集計
+    clauses: Dict[Tuple[str, str], Dict[str, int]] = {}
+    commands: Dict[Tuple[str, str], Set[str]] = {}
+    pages: Dict[Tuple[str, str], Set[str]] = {}
+
+    for root in iter_command_roots(analysis):
+        if root.kind == ROOT_SERVER_COMMAND:
+            root_pages = page_reach.get(root.owner, set())
+        elif root.kind in (ROOT_BUTTON, ROOT_CELL_COMMAND):
+            root_pages = {root.owner}
+        else:
+            root_pages = set()
+
+        for cmd, _, _ in walk_commands(root.commands):
+            if cmd.type not in SQL_COMMAND_TYPES:
+                continue
+            sql = (cmd.details or {}).get('sql') or ''
+            if not sql:
+                continue
+            info = parse_sql(sql)
+            # 1つのSQL内で同じカラムが複数回出ても句ごとに1回と数える
+            for table, column, clause in set(resolve_column_refs(info, table_columns)):
+                if clause not in CLAUSE_WEIGHTS:
+                    continue  # SELECT句のみで使われるカラムはインデックスの効果がない
+                key = (table, column)
+                per_clause = clauses.setdefault(key, {})
+                per_clause[clause] = per_clause.get(clause, 0) + 1
+                commands.setdefault(key, set()).add(root.location)
+                pages.setdefault(key, set()).update(root_pages)
+
+    recommendations = []
+    for key, per_clause in clauses.items():
+        if key in indexed:
+            continue
+        weight = max(CLAUSE_WEIGHTS.get(c, 1.0) for c in per_clause)
+        command_count = len(commands[key])
+        page_count = len(pages[key])
+        recommendations.append(IndexRecommendation(
+            table=key[0],
+            column=key[1],
+            score=round(weight * (command_count + PAGE_WEIGHT * page_count), 1),
+            clauses=dict(sorted(per_clause.items())),
+            command_count=command_count,
+            page_count=page_count,
+            examples=sorted(commands[key])[:MAX_EXAMPLES],
+        ))
+
+    recommendations.sort(key=lambda r: (-r.score, r.table, r.column))
+    return recommendations[:MAX_RECOMMENDATIONS]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+画面遷移グラフの解析
+
+ページ読み込み時に集めた遷移先（PageInfo.navigation_targets）から画面間のサイトマップを作成する。
+マスターページ上のメニュー・ボタンからの遷移は、そのマスターページを使う各画面からの遷移として扱う。
+
+- 孤立画面: 他の画面から遷移されない画面（開始画面・URL直接指定の画面もここに含まれる）
+- 存在しない画面への遷移
+- 最長の遷移経路: 入口の画面から最短で何回の遷移で到達するかを求め、最も遠い画面までの経路
+
+処理時間は画面数と遷移数に比例する。
+"""
+
+from collections import deque
+from typing import Dict, List, Set
+
+from core.analysis.graph import strongly_connected_components
+from core.models import AnalysisResult, NavigationGraph
+
+
+MAX_LONGEST_CHAINS = 10
+
+
+def _master_targets(masters: Dict[str, object]) -> Dict[str, List[tuple]]:
+    """マスターページ名 -> [(遷移先, 定義元マスターページ)]（継承元のマスターページ分を含む）"""
+    resolved: Dict[str, List[tuple]] = {}
+
+    def resolve(name: str, visiting: Set[str]) -> List[tuple]:
+        if name in resolved:
+            return resolved[name]
+        master = masters.get(name)
+        if master is None or name in visiting:
+            return []
+        visiting.add(name)
+        targets = [(t, name) for t in master.navigation_targets]
+        if master.metrics.master_page:
+            targets += resolve(master.metrics.master_page, visiting)
+        resolved[name] = targets
+        return targets
+
+    for name in masters:
+        resolve(name, set())
+    return resolved
+
+
+def build_navigation_graph(analysis: AnalysisResult) -> NavigationGraph:
+    """画面遷移グラフを作成し、孤立画面・存在しない遷移先・最長の遷移経路を求める"""
+    pages = [p for p in analysis.pages if p.page_type == 'page']
+    masters = {p.name: p for p in analysis.pages if p.page_type == 'masterPage'}
+    page_names = [p.name for p in pages]
+    known = set(page_names)
+    master_targets = _master_targets(masters)
+
+    links = []
+    broken = []
+    edges: Dict[str, List[str]] = {name: [] for name in page_names}
+    incoming: Dict[str, int] = {name: 0 for name in page_names}
+    for page in pages:
+        seen = set()
+        inherited = master_targets.get(page.metrics.master_page, []) if page.metrics.master_page else []
+        for target, via in [(t, '') for t in page.navigation_targets] + inherited:
+            if target in seen or target == page.name:
+                continue
+            seen.add(target)
+            if target not in known:
+                broken.append([via or page.name, target])
+                continue
+            links.append([page.name, target, via])
+            edges[page.name].append(target)
+            incoming[target] += 1
+
+    orphans = [name for name in page_names if incoming[name] == 0]
+
+    # 入口: 孤立画面。循環だけで構成される部分は、外から入る遷移のない強連結成分の代表画面を入口とする
+    entries = list(orphans)
+    components = strongly_connected_components(page_names, edges)
+    component_of = {member: i for i, comp in enumerate(components) for member in comp}
+    has_incoming = [False] * len(components)
+    for source, targets in edges.items():
+        for target in targets:
+            if component_of[source] != component_of[target]:
+                has_incoming[component_of[target]] = True
+    for comp_id, component in enumerate(components):
+        if not has_incoming[comp_id] and len(component) > 1:
+            entries.append(min(component))
+
+    # 入口からの幅優先探索（各画面への最短の遷移回数）
+    depth: Dict[str, int] = {}
+    parent: Dict[str, str] = {}
+    queue = deque()
+    for name in entries:
+        if name not in depth:
+            depth[name] = 0
+            queue.append(name)
+    while queue:
+        name = queue.popleft()
+        for target in edges[name]:
+            if target not in depth:
+                depth[target] = depth[name] + 1
+                parent[target] = name
+                queue.append(target)
+
+    # 他の経路の途中にある画面は除き、経路の末端の画面だけを遠い順に並べる
+    intermediate = set(parent.values())
+    deepest = sorted((n for n in depth if depth[n] > 0 and n not in intermediate),
+                     key=lambda n: (-depth[n], n))[:MAX_LONGEST_CHAINS]
+    chains = []
+    for name in deepest:
+        chain = [name]
+        while chain[-1] in parent:
+            chain.append(parent[chain[-1]])
+        chains.append(list(reversed(chain)))
+
+    # 重複（複数の画面からの同じ存在しない遷移先）は1件にまとめる
+    broken = [list(b) for b in dict.fromkeys(tuple(b) for b in broken)]
+
+    return NavigationGraph(
+        page_count=len(pages),
+        links=links,
+        orphan_pages=orphans,
+        broken_links=broken,
+        longest_chains=chains,
+        max_depth=max(depth.values()) if depth else 0,
+    )
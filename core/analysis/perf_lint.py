@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+パフォーマンスチェックモジュール
+
+ループ（LoopCommand）の中で実行されるデータアクセス（SQL実行・テーブル更新/挿入/削除）を
+N+1 クエリとして検出する。ループ内のサーバーコマンド呼出は呼出先をたどり、
+呼出先（さらにその呼出先）に含まれるデータアクセスも検出対象とする。
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from core.analysis.commands import (
+    DATA_ACCESS_COMMAND_TYPES, ROOT_SERVER_COMMAND,
+    called_server_command, iter_command_roots, walk_commands
+)
+from core.analysis.graph import strongly_connected_components
+from core.models import AnalysisResult, PerfFinding
+
+
+RULE_N_PLUS_ONE = 'n_plus_one'
+
+SEVERITY_HIGH = 'high'
+SEVERITY_MEDIUM = 'medium'
+SEVERITY_LABELS = {SEVERITY_HIGH: '高', SEVERITY_MEDIUM: '中'}
+
+# 1つのサーバーコマンドから到達するデータアクセスとして保持する上限（呼出の連鎖で組合せが膨らむのを防ぐ）
+MAX_SINKS_PER_SERVER_COMMAND = 50
+
+# (パス, ループ深さ, コマンド種別, 経由したサーバーコマンド名)
+_Sink = Tuple[Tuple[str, ...], int, str, Tuple[str, ...]]
+
+
+def _severity(loop_depth: int) -> str:
+    return SEVERITY_HIGH if loop_depth >= 2 else SEVERITY_MEDIUM
+
+
+class _SinkResolver:
+    """
+    サーバーコマンドごとに、到達するデータアクセスを呼出先も含めて求める
+
+    呼出グラフを強連結成分にまとめ、呼出先の成分から順に（逆トポロジカル順に）1回ずつ求めてメモ化する。
+    相互に呼び出し合う（再帰する）コマンドの組は、組の中の各コマンドのデータアクセスを共有する
+    （走査の順序によって結果が変わらない）。
+    """
+
+    def __init__(self, analysis: AnalysisResult):
+        self._by_name = {c.name: c for c in analysis.server_commands}
+        self._memo: Dict[str, List[_Sink]] = {}
+        self._resolve()
+
+    def sinks(self, name: str) -> List[_Sink]:
+        # 解析対象外（機能制限など）のコマンドは空
+        return self._memo.get(name, [])
+
+    def _resolve(self) -> None:
+        edges = {
+            name: list(dict.fromkeys(target for target in (called_server_command(cmd) for cmd, _, _
+                                                           in walk_commands(sc.raw_commands))
+                                     if target in self._by_name))
+            for name, sc in self._by_name.items()
+        }
+        for component in strongly_connected_components(list(self._by_name), edges):
+            members = set(component)
+            local = {name: self._local_sinks(name, members) for name in component}
+            if len(component) == 1 and component[0] not in edges[component[0]]:
+                self._memo[component[0]] = local[component[0]]
+                continue
+            # 再帰呼出の組: 組の中のどのコマンドからも、組の全コマンドのデータアクセスに到達しうる
+            for name in component:
+                shared: List[_Sink] = list(local[name])
+                for other in component:
+                    if other != name:
+                        shared.extend((path, depth, cmd_type, (other,) + chain)
+                                      for path, depth, cmd_type, chain in local[other])
+                self._memo[name] = shared[:MAX_SINKS_PER_SERVER_COMMAND]
+
+    def _local_sinks(self, name: str, component: Set[str]) -> List[_Sink]:
+        """同じ強連結成分への呼出（再帰呼出）を除いた、自身と呼出先のデータアクセス"""
+        result: List[_Sink] = []
+        for cmd, path, depth in walk_commands(self._by_name[name].raw_commands):
+            if len(result) >= MAX_SINKS_PER_SERVER_COMMAND:
+                break
+            if cmd.type in DATA_ACCESS_COMMAND_TYPES:
+                result.append((path, depth, cmd.type, ()))
+            target = called_server_command(cmd)
+            if target and target not in component:
+                for sub_path, sub_depth, sub_type, chain in self.sinks(target):
+                    result.append((path + sub_path, depth + sub_depth, sub_type, (target,) + chain))
+        return result[:MAX_SINKS_PER_SERVER_COMMAND]
+
+
+def detect_n_plus_one(analysis: AnalysisResult) -> List[PerfFinding]:
+    """
+    ループ内のデータアクセスを検出
+
+    サーバーコマンド・ボタン・セルコマンド・ワークフロー遷移のコマンドツリーを1回ずつ走査する。
+    ループ外のサーバーコマンド呼出は、呼出先自身の走査で検出されるため重複して報告しない。
+
+    Returns:
+        List[PerfFinding]: ループ深さの深い順
+    """
+    resolver = _SinkResolver(analysis)
+    findings: List[PerfFinding] = []
+
+    def add(location, path, depth, cmd_type, chain):
+        findings.append(PerfFinding(
+            rule=RULE_N_PLUS_ONE,
+            severity=_severity(depth),
+            location=location,
+            loop_depth=depth,
+            command_type=cmd_type,
+            path=list(path),
+            call_chain=list(chain),
+        ))
+
+    for root in iter_command_roots(analysis):
+        for cmd, path, depth in walk_commands(root.commands):
+            if depth == 0:
+                continue
+            if cmd.type in DATA_ACCESS_COMMAND_TYPES:
+                add(root.location, path, depth, cmd.type, ())
+            target = called_server_command(cmd)
+            if target:
+                if root.kind == ROOT_SERVER_COMMAND and target == root.owner:
+                    continue
+                for sub_path, sub_depth, sub_type, chain in resolver.sinks(target):
+                    add(root.location, path + sub_path, depth + sub_depth, sub_type, (target,) + chain)
+
+    findings.sort(key=lambda f: (-f.loop_depth, f.location))
+    return findings
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静的解析パイプライン
+
+解析結果（AnalysisResult）に対して各静的解析を順に実行し、結果を格納する。
+"""
+
+from typing import Optional
+
+from core.analysis.cost_model import estimate_costs
+from core.analysis.dead_code import find_unused_artifacts
+from core.analysis.formulas import analyze_formulas
+from core.analysis.index_advisor import recommend_indexes
+from core.analysis.navigation import build_navigation_graph
+from core.analysis.perf_lint import detect_n_plus_one
+from core.analysis.project_index import ProjectIndex
+from core.analysis.workflows import analyze_workflows
+from core.cancellation import CancellationToken, check_cancelled
+from core.logging_setup import logger
+from core.models import AnalysisResult
+
+
+def run_static_analysis(result: AnalysisResult, cancel_token: Optional[CancellationToken] = None) -> None:
+    """
+    静的解析を実行して result の各フィールドに格納
+
+    作成した参照索引（ProjectIndex）は result.project_index に残し、影響調査などで再利用する。
+    """
+    check_cancelled(cancel_token)
+    result.perf_findings = detect_n_plus_one(result)
+    if result.perf_findings:
+        logger.info(f"パフォーマンス指摘: ループ内のデータアクセス {len(result.perf_findings)}件")
+
+    check_cancelled(cancel_token)
+    result.index_recommendations = recommend_indexes(result)
+    if result.index_recommendations:
+        logger.info(f"インデックス推奨: {len(result.index_recommendations)}件")
+
+    check_cancelled(cancel_token)
+    result.hot_paths = estimate_costs(result)
+
+    check_cancelled(cancel_token)
+    result.formula_reports = analyze_formulas(result)
+    if result.formula_reports:
+        cycles = sum(r.cycle_count for r in result.formula_reports)
+        logger.info(f"数式依存関係: 要確認ページ {len(result.formula_reports)}件（循環参照 {cycles}件）")
+
+    check_cancelled(cancel_token)
+    index = ProjectIndex(result)
+    result.project_index = index
+    result.table_pressure = index.table_pressure()
+
+    check_cancelled(cancel_token)
+    result.workflow_analytics = analyze_workflows(result)
+    problems = sum(1 for w in result.workflow_analytics if w.unreachable_states or w.dead_end_states)
+    if problems:
+        logger.info(f"ワークフロー分析: 到達不能・行き止まりの状態があるワークフロー {problems}件")
+
+    check_cancelled(cancel_token)
+    result.navigation = build_navigation_graph(result)
+    if result.navigation.broken_links:
+        logger.info(f"画面遷移: 存在しない画面への遷移 {len(result.navigation.broken_links)}件")
+
+    check_cancelled(cancel_token)
+    result.unused_artifacts = find_unused_artifacts(result, index)
+    if result.unused_artifacts:
+        logger.info(f"未使用の定義: {len(result.unused_artifacts)}件")
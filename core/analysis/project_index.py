@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+プロジェクト参照索引
+
+全コマンドツリー（サーバーコマンド・ボタン・セルコマンド・ワークフロー遷移）を1回だけ走査し、
+テーブルの読み書き箇所・サーバーコマンドの呼出関係・カラムの参照箇所を索引にまとめる。
+各種の横断的な問い合わせ（どのテーブルに書き込みが集中するか、あるカラムを変更すると
+どこに影響するか、など）はこの索引から答える。
+
+- テーブル更新・挿入・削除コマンドは対象テーブルへの書き込み
+- SQL実行は UPDATE / INSERT / DELETE の対象テーブルへの書き込み、それ以外の参照テーブルの読み込み
+- ワークフロー遷移は対象テーブル（状態）への書き込み
+- 重みはループの入れ子1段ごとに LOOP_MULTIPLIER 倍
+
+カラムの参照箇所は SQL（SELECT句・述語・UPDATE SET・INSERT列）、テーブル更新コマンドの列の対応付け、
+ワークフロー遷移の条件、セル数式の列参照（Table.Column など）から集める。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.analysis.commands import (
+    ROOT_BUTTON, ROOT_CELL_COMMAND, ROOT_SERVER_COMMAND, ROOT_WORKFLOW, SQL_COMMAND_TYPES,
+    TABLE_WRITE_COMMAND_TYPES, called_server_command, iter_command_roots, propagate_page_reach,
+    walk_commands
+)
+from core.analysis.cost_model import LOOP_MULTIPLIER
+from core.analysis.formulas import parse_formula, tokenize_formula
+from core.analysis.sql import build_table_columns, parse_sql, resolve_column_refs, resolve_table
+from core.models import AnalysisResult, TablePressure
+
+
+ACCESS_READ = 'read'
+ACCESS_WRITE = 'write'
+
+# 同時実行時の競合は書き込みで起きるため、書き込みを読み込みより重く見る
+WRITE_CONTENTION_WEIGHT = 3.0
+
+WORKFLOW_TRANSITION_TYPE = 'WorkflowTransition'
+
+MAX_EXAMPLES = 5
+
+# 数式の参照箇所の ColumnReference.root_kind
+ROOT_PAGE_FORMULA = 'page'
+
+# ColumnReference.kind
+REF_SQL = 'sql'
+REF_TABLE_UPDATE = 'table_update'
+REF_WORKFLOW_CONDITION = 'workflow_condition'
+REF_FORMULA = 'formula'
+REFERENCE_KIND_LABELS = {
+    REF_SQL: 'SQL',
+    REF_TABLE_UPDATE: 'テーブル更新',
+    REF_WORKFLOW_CONDITION: 'ワークフロー条件',
+    REF_FORMULA: '数式',
+}
+
+# 参照箇所に表示するSQL・数式の最大文字数
+DETAIL_MAX_CHARS = 200
+
+# テーブル更新コマンドの列の対応付けで列名を表すキー
+_MAPPING_COLUMN_KEYS = ('ColumnName', 'Column', 'FieldName', 'TargetColumn', 'Name')
+
+
+@dataclass(frozen=True)
+class TableAccess:
+    """テーブルの読み書き箇所"""
+    table: str
+    mode: str            # ACCESS_READ / ACCESS_WRITE
+    root_kind: str       # CommandRoot.kind
+    owner: str           # サーバーコマンド名・ページ名・テーブル名
+    location: str
+    loop_depth: int
+    command_type: str
+
+    @property
+    def weight(self) -> float:
+        return LOOP_MULTIPLIER ** self.loop_depth
+
+
+@dataclass(frozen=True)
+class CallSite:
+    """サーバーコマンドの呼出箇所"""
+    server_command: str  # 呼出先
+    root_kind: str
+    owner: str
+    location: str
+    loop_depth: int
+
+
+@dataclass(frozen=True)
+class ColumnReference:
+    """カラムの参照箇所"""
+    table: str
+    column: str
+    kind: str            # REF_SQL / REF_TABLE_UPDATE / REF_WORKFLOW_CONDITION / REF_FORMULA
+    root_kind: str       # CommandRoot.kind（数式は ROOT_PAGE_FORMULA）
+    owner: str           # サーバーコマンド名・ページ名・テーブル名
+    location: str
+    detail: str          # 句・SQL・数式・条件などの内容
+
+
+def _short(text: str) -> str:
+    text = ' '.join(str(text).split())
+    return text if len(text) <= DETAIL_MAX_CHARS else text[:DETAIL_MAX_CHARS - 3] + '...'
+
+
+def _mapping_columns(mappings) -> List[str]:
+    """テーブル更新コマンドの列の対応付け（辞書 または 辞書のリスト）から列名を取り出す"""
+    if isinstance(mappings, dict):
+        return [str(k) for k in mappings]
+    columns = []
+    for m in mappings or []:
+        if isinstance(m, dict):
+            name = next((m[k] for k in _MAPPING_COLUMN_KEYS if m.get(k)), None)
+            if name:
+                columns.append(str(name))
+        elif isinstance(m, str):
+            columns.append(m)
+    return columns
+
+
+class ProjectIndex:
+    """プロジェクト横断の参照索引（作成時に全コマンドツリーを1回だけ走査）"""
+
+    def __init__(self, analysis: AnalysisResult):
+        self.analysis = analysis
+        self._table_columns = build_table_columns(analysis.tables)
+        self._table_accesses: Dict[str, List[TableAccess]] = {}
+        self._call_sites: Dict[str, List[CallSite]] = {}
+        self._column_refs: Dict[Tuple[str, str], List[ColumnReference]] = {}
+        self._page_reach: Optional[Dict[str, Set[str]]] = None
+        self._build()
+
+    # -------------------------------------------------------------------------
+    # 索引の作成
+    # -------------------------------------------------------------------------
+    def _table_name(self, name: str) -> str:
+        """定義上のテーブル名に揃える（定義にないテーブルはそのままの名前）"""
+        return resolve_table(name, self._table_columns) or name
+
+    def _add_access(self, table: str, mode: str, root, loop_depth: int, command_type: str):
+        if not table:
+            return
+        table = self._table_name(table)
+        self._table_accesses.setdefault(table, []).append(
+            TableAccess(table, mode, root.kind, root.owner, root.location, loop_depth, command_type))
+
+    def _add_column_ref(self, table: str, column: str, kind: str, root_kind: str, owner: str,
+                        location: str, detail: str):
+        """テーブル定義にあるカラムの参照だけを登録（表記は定義に揃える）"""
+        entry = self._table_columns.get((table or '').lower())
+        if entry is None:
+            return
+        column = entry[1].get((column or '').lower())
+        if column is None:
+            return
+        self._column_refs.setdefault((entry[0].lower(), column.lower()), []).append(
+            ColumnReference(entry[0], column, kind, root_kind, owner, location, detail))
+
+    def _build(self):
+        for root in iter_command_roots(self.analysis):
+            if root.kind == ROOT_WORKFLOW:
+                # 遷移するたびに対象テーブルの状態が更新される
+                self._add_access(root.owner, ACCESS_WRITE, root, 0, WORKFLOW_TRANSITION_TYPE)
+
+            for cmd, _, depth in walk_commands(root.commands):
+                details = cmd.details or {}
+                if cmd.type in TABLE_WRITE_COMMAND_TYPES:
+                    table = details.get('table') or ''
+                    self._add_access(table, ACCESS_WRITE, root, depth, cmd.type)
+                    for column in _mapping_columns(details.get('mappings')):
+                        self._add_column_ref(table, column, REF_TABLE_UPDATE, root.kind, root.owner,
+                                             root.location, cmd.description)
+                elif cmd.type in SQL_COMMAND_TYPES:
+                    sql = details.get('sql') or ''
+                    info = parse_sql(sql)
+                    for table in info.tables:
+                        mode = ACCESS_WRITE if table in info.write_tables else ACCESS_READ
+                        self._add_access(table, mode, root, depth, cmd.type)
+                    refs = resolve_column_refs(info, self._table_columns)
+                    refs += resolve_column_refs(info, self._table_columns, info.set_columns)
+                    for table, column, clause in dict.fromkeys(refs):
+                        self._add_column_ref(table, column, REF_SQL, root.kind, root.owner, root.location,
+                                             f'[{clause or "SET"}] {_short(sql)}')
+                else:
+                    target = called_server_command(cmd)
+                    if target:
+                        self._call_sites.setdefault(target, []).append(
+                            CallSite(target, root.kind, root.owner, root.location, depth))
+
+        self._build_condition_refs()
+        self._build_formula_refs()
+
+    def _build_condition_refs(self):
+        """ワークフロー遷移の条件（比較条件の項目・条件式中の列名）を対象テーブルのカラム参照として登録"""
+        for wf in self.analysis.workflows:
+            for t in wf.transitions:
+                location = f'ワークフロー: {wf.table_name} / {t.from_state} → {t.to_state} ({t.action})'
+                for cond in t.conditions:
+                    if cond.field:
+                        names = [cond.field.strip('[]').split('.')[-1].strip('[]')]
+                        detail = f'{cond.field} {cond.operator or ""} {cond.value or ""}'.strip()
+                    elif cond.expression:
+                        names = [text.strip('[]') for kind, text in tokenize_formula(cond.expression)
+                                 if kind in ('name', 'bracket')]
+                        detail = cond.expression
+                    else:
+                        continue
+                    for name in dict.fromkeys(names):
+                        self._add_column_ref(wf.table_name, name, REF_WORKFLOW_CONDITION, ROOT_WORKFLOW,
+                                             wf.table_name, location, _short(detail))
+
+    def _build_formula_refs(self):
+        """セル数式の列参照を登録（修飾なしの [列名] は、その列名を持つテーブルが1つだけの場合に限る）"""
+        owners: Dict[str, List[str]] = {}
+        for table_key, (_, columns) in self._table_columns.items():
+            for col_key in columns:
+                owners.setdefault(col_key, []).append(table_key)
+
+        for page in self.analysis.pages:
+            for f in page.formulas:
+                for qualifier, name in dict.fromkeys(parse_formula(f.formula).fields):
+                    if qualifier:
+                        table = qualifier
+                    else:
+                        candidates = owners.get(name.lower(), [])
+                        if len(candidates) != 1:
+                            continue
+                        table = candidates[0]
+                    self._add_column_ref(table, name, REF_FORMULA, ROOT_PAGE_FORMULA, page.name,
+                                         f'ページ: {page.name} / セル: {f.cell}', _short(f.formula))
+
+    # -------------------------------------------------------------------------
+    # 問い合わせ
+    # -------------------------------------------------------------------------
+    def table_access(self, table: str, mode: Optional[str] = None) -> List[TableAccess]:
+        """テーブルの読み書き箇所（mode を指定すると読み込み・書き込みの一方のみ）"""
+        accesses = self._table_accesses.get(self._table_name(table), [])
+        if mode is None:
+            return list(accesses)
+        return [a for a in accesses if a.mode == mode]
+
+    def accessed_tables(self) -> Set[str]:
+        """いずれかのコマンド・SQL・ワークフローから読み書きされるテーブル名"""
+        return set(self._table_accesses)
+
+    def callers_of(self, server_command: str) -> List[CallSite]:
+        """サーバーコマンドの呼出箇所"""
+        return list(self._call_sites.get(server_command, []))
+
+    def impact_of(self, table: str, column: str) -> List[ColumnReference]:
+        """
+        カラムの参照箇所（ページ・数式・SQL・テーブル更新・ワークフロー条件）を返す
+
+        索引は作成時に構築済みのため、問い合わせは辞書の参照のみ。テーブル名・カラム名の大文字小文字は区別しない。
+        """
+        return list(self._column_refs.get(((table or '').lower(), (column or '').lower()), []))
+
+    def affected_pages(self, references: List[ColumnReference]) -> List[str]:
+        """参照箇所を実行・表示するページ名（サーバーコマンド呼出経由を含む）"""
+        page_reach = self.page_reach()
+        pages: Set[str] = set()
+        for ref in references:
+            if ref.root_kind == ROOT_SERVER_COMMAND:
+                pages.update(page_reach.get(ref.owner, ()))
+            elif ref.root_kind in (ROOT_BUTTON, ROOT_CELL_COMMAND, ROOT_PAGE_FORMULA):
+                pages.add(ref.owner)
+        return sorted(pages)
+
+    def server_command_callees(self) -> Dict[str, Set[str]]:
+        """サーバーコマンド名 -> そのコマンドが呼び出すサーバーコマンド名の集合（呼出グラフ）"""
+        callees: Dict[str, Set[str]] = {}
+        for target, sites in self._call_sites.items():
+            for site in sites:
+                if site.root_kind == ROOT_SERVER_COMMAND:
+                    callees.setdefault(site.owner, set()).add(target)
+        return callees
+
+    def page_reach(self) -> Dict[str, Set[str]]:
+        """サーバーコマンド名 -> そのコマンドを（呼出の連鎖も含めて）実行するページ名の集合"""
+        if self._page_reach is None:
+            direct: Dict[str, Set[str]] = {}
+            for target, sites in self._call_sites.items():
+                for site in sites:
+                    if site.root_kind in (ROOT_BUTTON, ROOT_CELL_COMMAND):
+                        direct.setdefault(target, set()).add(site.owner)
+            self._page_reach = propagate_page_reach(direct, self.server_command_callees())
+        return self._page_reach
+
+    def table_pressure(self) -> List[TablePressure]:
+        """
+        テーブルごとの読み書き箇所数と、ループの入れ子で重み付けした負荷を集計
+
+        Returns:
+            List[TablePressure]: 書き込みを重く見たスコアの高い順
+        """
+        defined = {t.name for t in self.analysis.tables}
+        page_reach = self.page_reach()
+        results = []
+        for table, accesses in self._table_accesses.items():
+            reads = [a for a in accesses if a.mode == ACCESS_READ]
+            writes = [a for a in accesses if a.mode == ACCESS_WRITE]
+            pages: Set[str] = set()
+            for a in accesses:
+                if a.root_kind == ROOT_SERVER_COMMAND:
+                    pages.update(page_reach.get(a.owner, ()))
+                elif a.root_kind in (ROOT_BUTTON, ROOT_CELL_COMMAND):
+                    pages.add(a.owner)
+            read_weight = sum((a.weight for a in reads), 0.0)
+            write_weight = sum((a.weight for a in writes), 0.0)
+            writers = sorted(writes, key=lambda a: (-a.loop_depth, a.location))
+            results.append(TablePressure(
+                table=table,
+                defined=table in defined,
+                read_sites=len(reads),
+                write_sites=len(writes),
+                read_weight=round(read_weight, 1),
+                write_weight=round(write_weight, 1),
+                score=round(write_weight * WRITE_CONTENTION_WEIGHT + read_weight, 1),
+                page_count=len(pages),
+                writers=list(dict.fromkeys(a.location for a in writers))[:MAX_EXAMPLES],
+            ))
+        results.sort(key=lambda r: (-r.score, r.table))
+        return results
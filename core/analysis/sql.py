@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL解析モジュール
+
+ExecuteSqlCommand の SQL 文を軽量にトークン分割し、参照テーブル（FROM / JOIN / UPDATE /
+INSERT INTO / DELETE FROM）と、SELECT・WHERE・JOIN ON・ORDER BY・GROUP BY・HAVING で使われる
+カラムを抽出する。完全なSQLパーサーではなく、インデックス検討・影響調査に必要な範囲の
+参照関係だけを取り出す。
+
+同じSQL文は何度出現しても1回だけ解析する（parse_sql の結果をキャッシュ）。
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+# 句の種別（カラム参照の出現場所）
+CLAUSE_WHERE = 'WHERE'
+CLAUSE_JOIN = 'JOIN'
+CLAUSE_ORDER_BY = 'ORDER BY'
+CLAUSE_GROUP_BY = 'GROUP BY'
+CLAUSE_HAVING = 'HAVING'
+CLAUSE_SELECT = 'SELECT'
+PREDICATE_CLAUSES = (CLAUSE_WHERE, CLAUSE_JOIN, CLAUSE_ORDER_BY, CLAUSE_GROUP_BY, CLAUSE_HAVING)
+_REFERENCE_CLAUSES = PREDICATE_CLAUSES + (CLAUSE_SELECT,)
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>N?'(?:[^']|'')*')
+  | (?P<qident>\[[^\]]*\]|"[^"]*"|`[^`]*`)
+  | (?P<param>[@:?][^\W\d]\w*)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ident>[^\W\d]\w*)
+  | (?P<op><>|<=|>=|!=|\|\||[=<>+\-*/%])
+  | (?P<punct>[(),.;])
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+# 識別子として扱わない語（テーブル別名・カラムと誤認しないため）
+_KEYWORDS = frozenset("""
+    select from where and or not in is null like between exists join inner left right full outer cross
+    on as order group by having union all distinct top limit offset fetch next rows only insert into
+    values update set delete case when then else end asc desc with nolock over partition
+    count sum avg min max coalesce isnull cast convert true false
+""".split())
+
+# 表参照の直後に来る語（別名ではない）
+_TABLE_TERMINATORS = _KEYWORDS | {'using', 'natural', 'apply', 'pivot', 'unpivot', 'output'}
+
+
+@dataclass(frozen=True)
+class SqlStatementInfo:
+    """SQL文の参照関係"""
+    tables: Tuple[str, ...]                          # 参照テーブル（出現順・重複なし）
+    write_tables: Tuple[str, ...]                    # UPDATE / INSERT / DELETE の対象テーブル
+    aliases: Tuple[Tuple[str, str], ...]             # (小文字の別名, テーブル名)
+    column_refs: Tuple[Tuple[str, str, str], ...]    # (修飾子, カラム名, 句)（SELECT句・述語）
+    set_columns: Tuple[Tuple[str, str], ...]         # UPDATE SET / INSERT の列 (修飾子, カラム名)
+
+
+def tokenize_sql(sql: str) -> List[Tuple[str, str]]:
+    """SQLを (種別, テキスト) のトークン列に分割（空白・コメントは除く）"""
+    tokens = []
+    for m in _TOKEN_RE.finditer(sql or ''):
+        kind = m.lastgroup
+        if kind in ('ws', 'comment'):
+            continue
+        text = m.group()
+        if kind == 'qident':
+            kind, text = 'ident', text[1:-1]
+        tokens.append((kind, text))
+    return tokens
+
+
+def _is_word(token: Tuple[str, str], *words: str) -> bool:
+    return token[0] == 'ident' and token[1].lower() in words
+
+
+def _read_name(tokens, i) -> Tuple[Optional[str], int]:
+    """tokens[i] からドット区切りの名前を読み、最後の要素と次の位置を返す（schema.table → table）"""
+    if i >= len(tokens) or tokens[i][0] != 'ident':
+        return None, i
+    name = tokens[i][1]
+    i += 1
+    while i + 1 < len(tokens) and tokens[i] == ('punct', '.') and tokens[i + 1][0] == 'ident':
+        name = tokens[i + 1][1]
+        i += 2
+    return name, i
+
+
+@lru_cache(maxsize=8192)
+def parse_sql(sql: str) -> SqlStatementInfo:
+    """SQL文から参照テーブル・別名・述語カラムを抽出（同一テキストはキャッシュから返す）"""
+    tokens = tokenize_sql(sql)
+    tables: List[str] = []
+    write_tables: List[str] = []
+    aliases: Dict[str, str] = {}
+    column_refs: List[Tuple[str, str, str]] = []
+    set_columns: List[Tuple[str, str]] = []
+
+    def add_table(name, write=False):
+        if name not in tables:
+            tables.append(name)
+        if write and name not in write_tables:
+            write_tables.append(name)
+        aliases.setdefault(name.lower(), name)
+
+    def read_table_ref(i, write=False):
+        """表参照（名前 [AS] 別名）を読む。サブクエリ・関数の場合は読まずに返す"""
+        if i < len(tokens) and tokens[i] == ('punct', '('):
+            return i
+        name, j = _read_name(tokens, i)
+        if name is None or name.lower() in _KEYWORDS:
+            return i
+        if not write and j < len(tokens) and tokens[j] == ('punct', '('):
+            return j  # テーブル値関数
+        add_table(name, write)
+        if j < len(tokens) and _is_word(tokens[j], 'as'):
+            j += 1
+        if j < len(tokens) and tokens[j][0] == 'ident' and tokens[j][1].lower() not in _TABLE_TERMINATORS:
+            aliases[tokens[j][1].lower()] = name
+            j += 1
+        return j
+
+    clause = None
+    i = 0
+    n = len(tokens)
+    while i < n:
+        kind, text = tokens[i]
+        word = text.lower() if kind == 'ident' else ''
+
+        if word == 'from':
+            clause = 'FROM'
+            i = read_table_ref(i + 1)
+            continue
+        if word == 'join':
+            clause = 'JOIN_TABLE'
+            i = read_table_ref(i + 1)
+            continue
+        if word == 'update':
+            clause = 'UPDATE'
+            i = read_table_ref(i + 1, write=True)
+            continue
+        if word == 'into' and i > 0 and _is_word(tokens[i - 1], 'insert'):
+            i = read_table_ref(i + 1, write=True)
+            clause = 'INSERT_COLUMNS'
+            continue
+        if word == 'delete':
+            j = i + 1
+            if j < n and _is_word(tokens[j], 'from'):
+                j += 1
+            j2 = read_table_ref(j, write=True)
+            clause = 'FROM'
+            i = max(j2, i + 1)
+            continue
+        if word == 'select':
+            clause = CLAUSE_SELECT
+        elif word == 'where':
+            clause = CLAUSE_WHERE
+        elif word == 'on' and clause in ('JOIN_TABLE', 'FROM', CLAUSE_JOIN):
+            clause = CLAUSE_JOIN
+        elif word == 'set' and clause == 'UPDATE':
+            clause = 'SET'
+        elif word == 'values':
+            clause = 'VALUES'
+        elif word in ('order', 'group') and i + 1 < n and _is_word(tokens[i + 1], 'by'):
+            clause = CLAUSE_ORDER_BY if word == 'order' else CLAUSE_GROUP_BY
+            i += 2
+            continue
+        elif word == 'having':
+            clause = CLAUSE_HAVING
+        elif kind == 'punct' and text == ',' and clause == 'FROM':
+            i = read_table_ref(i + 1)
+            continue
+        elif kind == 'ident' and word not in _KEYWORDS:
+            # カラム参照（修飾子付き a.Col / 修飾なし Col）
+            qualifier = ''
+            column = text
+            j = i + 1
+            if j + 1 < n and tokens[j] == ('punct', '.') and tokens[j + 1][0] == 'ident':
+                qualifier, column = text, tokens[j + 1][1]
+                j += 2
+                # schema.table.column の場合は最後の2要素を使う
+                while j + 1 < n and tokens[j] == ('punct', '.') and tokens[j + 1][0] == 'ident':
+                    qualifier, column = column, tokens[j + 1][1]
+                    j += 2
+            is_function = j < n and tokens[j] == ('punct', '(')
+            if not is_function:
+                if clause in _REFERENCE_CLAUSES:
+                    column_refs.append((qualifier, column, clause))
+                elif clause == 'SET':
+                    # SET Col = 値 の左辺のみ
+                    if j < n and tokens[j] == ('op', '='):
+                        set_columns.append((qualifier, column))
+                elif clause == 'INSERT_COLUMNS':
+                    set_columns.append((qualifier, column))
+            i = j
+            continue
+        elif kind == 'punct' and text == ')' and clause == 'INSERT_COLUMNS':
+            clause = None
+        i += 1
+
+    return SqlStatementInfo(
+        tables=tuple(tables),
+        write_tables=tuple(write_tables),
+        aliases=tuple(sorted(aliases.items())),
+        column_refs=tuple(column_refs),
+        set_columns=tuple(set_columns),
+    )
+
+
+# 小文字のテーブル名 -> (定義上のテーブル名, {小文字のカラム名: 定義上のカラム名})
+TableColumns = Dict[str, Tuple[str, Dict[str, str]]]
+
+
+def build_table_columns(tables) -> TableColumns:
+    """TableInfo の一覧から resolve_column_refs 用の照合表を作成"""
+    return {t.name.lower(): (t.name, {c.name.lower(): c.name for c in t.columns}) for t in tables}
+
+
+def resolve_table(name: str, table_columns: TableColumns) -> Optional[str]:
+    """SQL上のテーブル名を定義上のテーブル名に解決（定義にない場合はNone）"""
+    entry = table_columns.get(name.lower())
+    return entry[0] if entry else None
+
+
+def resolve_column_refs(info: SqlStatementInfo, table_columns: TableColumns,
+                        refs=None) -> List[Tuple[str, str, str]]:
+    """
+    カラム参照をテーブル定義と照合して (テーブル名, カラム名, 句) に解決
+
+    Args:
+        info: parse_sql の結果
+        table_columns: build_table_columns の結果
+        refs: 解決する (修飾子, カラム名, 句) または (修飾子, カラム名) の列（省略時は info.column_refs）
+
+    定義に存在しないテーブル・カラム（ビュー・一時テーブル・別名列など）は除外する。
+    テーブル名は定義上の表記で返す。
+    """
+    alias_map = dict(info.aliases)
+    candidates = [t.lower() for t in info.tables if t.lower() in table_columns]
+    resolved = []
+    for ref in (info.column_refs if refs is None else refs):
+        qualifier, column, clause = ref if len(ref) == 3 else (ref[0], ref[1], '')
+        col_key = column.lower()
+        if qualifier:
+            table_key = alias_map.get(qualifier.lower(), qualifier).lower()
+            owners = [table_key] if table_key in table_columns else []
+        else:
+            owners = [t for t in candidates if col_key in table_columns[t][1]]
+        if len(owners) != 1:
+            continue
+        table_name, columns = table_columns[owners[0]]
+        if col_key in columns:
+            resolved.append((table_name, columns[col_key], clause))
+    return resolved
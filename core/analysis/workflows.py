@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ワークフロー状態遷移の解析
+
+各ワークフローの状態・遷移を有向グラフとして扱い、以下を求める（状態数＋遷移数に比例する時間）。
+
+- 初期状態から到達できる状態・到達できない状態
+- 行き止まりの状態（終了状態ではないのに遷移先がない）
+- 状態一覧にない状態を参照している遷移
+- 循環（差戻しなど、2つ以上の状態を経て同じ状態に戻ってくる経路）
+- 重い処理（SQL実行・テーブル更新・メール送信・サーバーコマンド呼出）を含む遷移
+
+遷移コマンドのコストは cost_model と同じ重みで見積もり、呼出先のサーバーコマンドは
+全ワークフローを通して1回だけ計算する。
+"""
+
+from typing import Dict, List
+
+from core.analysis.cost_model import CostEstimator
+from core.analysis.graph import reachable_from, strongly_connected_components
+from core.models import AnalysisResult, WorkflowAnalytics, WorkflowInfo, WorkflowTransitionCost
+
+
+# このコスト以上の遷移を重い遷移として報告（SQL実行1回分）
+HEAVY_TRANSITION_COST = 10.0
+
+
+def analyze_workflow(workflow: WorkflowInfo, estimator: CostEstimator) -> WorkflowAnalytics:
+    """1つのワークフローの状態遷移グラフを解析"""
+    defined = [s.name for s in workflow.states]
+    defined_set = set(defined)
+
+    edges: Dict[str, List[str]] = {name: [] for name in defined}
+    undefined = []
+    for t in workflow.transitions:
+        for name in (t.from_state, t.to_state):
+            if name not in edges:
+                edges[name] = []
+                undefined.append(name)
+        if t.to_state not in edges[t.from_state]:
+            edges[t.from_state].append(t.to_state)
+
+    initial = [s.name for s in workflow.states if s.is_initial]
+    if not initial and defined:
+        # 初期状態の指定がない場合は先頭の状態から始まるものとみなす
+        initial = defined[:1]
+    reachable = reachable_from(initial, edges)
+
+    final = {s.name for s in workflow.states if s.is_final}
+    # 到達できない状態も含めて判定する（到達できない行き止まりは両方の一覧に載る）
+    dead_ends = [name for name in edges
+                 if name not in final and not any(t != name for t in edges[name])]
+
+    # 循環（同じ状態への遷移は保存などの操作で一般的なため除く）。状態は定義順に並べる
+    order = {name: i for i, name in enumerate(edges)}
+    components = strongly_connected_components(list(edges), edges)
+    cycles = [sorted(c, key=order.get) for c in components if len(c) > 1]
+    cycles.sort(key=lambda c: order[c[0]])
+
+    heavy = []
+    for t in workflow.transitions:
+        c = estimator.commands(t.commands)
+        if c.cost >= HEAVY_TRANSITION_COST:
+            heavy.append(WorkflowTransitionCost(
+                action=t.action,
+                from_state=t.from_state,
+                to_state=t.to_state,
+                cost=round(c.cost, 1),
+                sql_count=c.sql,
+                write_count=c.write,
+                email_count=c.email,
+                call_count=c.call,
+                max_loop_depth=c.max_depth,
+            ))
+    heavy.sort(key=lambda h: -h.cost)
+
+    return WorkflowAnalytics(
+        table_name=workflow.table_name,
+        initial_states=initial,
+        reachable_states=[name for name in edges if name in reachable and name in defined_set],
+        unreachable_states=[name for name in defined if name not in reachable],
+        dead_end_states=dead_ends,
+        undefined_states=undefined,
+        cycles=cycles,
+        heavy_transitions=heavy,
+    )
+
+
+def analyze_workflows(analysis: AnalysisResult) -> List[WorkflowAnalytics]:
+    """全ワークフローの状態遷移グラフを解析（ワークフローの定義順）"""
+    estimator = CostEstimator(analysis)
+    return [analyze_workflow(wf, estimator) for wf in analysis.workflows]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+バッチ処理モジュール
+
+1つの .fgcp ファイルについて「安全チェック → 解析 → 各形式の出力」を行い、
+結果をJSONに変換可能な辞書で返す。CLIなどGUIを持たない実行環境から使用する。
+tkinter には依存しない。エクスポーター（python-docx / openpyxl）は出力時にのみ読み込む。
+"""
+
+import dataclasses
+import glob
+import os
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.fgcp_parser import analyze_project, compare_projects
+from core.logging_setup import logger
+from core.safety_checks import ZipSafetyError, open_checked_archive
+from licensing.verify import FEATURE_LIMITS
+
+
+# 出力形式（指定順に出力する）
+EXPORT_FORMATS = ('word', 'excel', 'html')
+
+# 処理結果のステータス
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_REJECTED = 'rejected'  # 安全チェックで拒否
+
+
+def _export(fmt: str, analysis, output_dir: str, use_cache: bool) -> str:
+    """指定形式で出力（エクスポーターはここで初めて読み込む）"""
+    if fmt == 'word':
+        from core.exporters.word_export import generate_spec_document
+        return generate_spec_document(analysis, output_dir, use_cache=use_cache)
+    if fmt == 'excel':
+        from core.exporters.excel_export import generate_excel_document
+        return generate_excel_document(analysis, output_dir, use_cache=use_cache)
+    if fmt == 'html':
+        from core.exporters.html_export import generate_html_report
+        return generate_html_report(analysis, output_dir, use_cache=use_cache)
+    raise ValueError(f"不明な出力形式です: {fmt}")
+
+
+def _export_unavailable_reason(fmt: str, limits: Dict) -> Optional[str]:
+    """出力できない理由（出力可能ならNone）"""
+    if not limits.get(f'{fmt}_export'):
+        return 'license'
+    if fmt == 'excel':
+        from core.exporters.excel_export import EXCEL_AVAILABLE
+        if not EXCEL_AVAILABLE:
+            return 'openpyxl not installed'
+    return None
+
+
+def analyze_and_export(
+    file_path: str,
+    output_dir: Optional[str] = None,
+    formats: Iterable[str] = EXPORT_FORMATS,
+    limits: Optional[Dict] = None,
+    deep_verify: bool = False,
+    allow_large: bool = False,
+    use_cache: bool = True,
+    include_snapshot: bool = False
+) -> Dict:
+    """
+    1プロジェクトを解析して出力し、結果の辞書を返す（例外は送出しない）
+
+    Args:
+        file_path: FGCPファイルパス
+        output_dir: 出力フォルダ（省略時は入力ファイルと同じフォルダ）
+        formats: 出力形式（EXPORT_FORMATS の部分集合）
+        limits: 機能制限設定
+        deep_verify: 全エントリの詳細検証を行う
+        allow_large: ファイルサイズ上限を超えても続行する
+        use_cache: 解析内容に変更がなければ既存の出力を再利用する
+        include_snapshot: 解析結果全体（AnalysisResultの辞書表現）を snapshot キーに含める
+
+    Returns:
+        dict: file, project, status, summary, outputs, skipped, verify, elapsed_sec, error
+            （include_snapshot 指定時は snapshot も含む）
+    """
+    started = time.perf_counter()
+    file_path = os.path.abspath(file_path)
+    output_dir = os.path.abspath(output_dir) if output_dir else os.path.dirname(file_path)
+    limits = limits or FEATURE_LIMITS['FREE']
+    result = {
+        'file': file_path,
+        'project': Path(file_path).stem,
+        'status': STATUS_OK,
+        'summary': None,
+        'outputs': {},
+        'skipped': {},
+        'verify': None,
+        'elapsed_sec': 0.0,
+        'error': None,
+    }
+
+    try:
+        archive = open_checked_archive(
+            file_path,
+            (lambda msg: True) if allow_large else None,
+            deep_verify=deep_verify
+        )
+        with archive:
+            analysis = analyze_project(file_path, limits=limits, archive=archive)
+            if archive.verifier:
+                report = archive.verifier.report()
+                result['verify'] = {
+                    'verified': report.verified,
+                    'corrupted': report.corrupted,
+                }
+        result['summary'] = dataclasses.asdict(analysis.summary)
+        if include_snapshot:
+            result['snapshot'] = dataclasses.asdict(analysis)
+
+        os.makedirs(output_dir, exist_ok=True)
+        for fmt in [f for f in EXPORT_FORMATS if f in set(formats)]:
+            reason = _export_unavailable_reason(fmt, limits)
+            if reason:
+                result['skipped'][fmt] = reason
+                continue
+            result['outputs'][fmt] = _export(fmt, analysis, output_dir, use_cache)
+            logger.info(f"{fmt}出力完了: {result['outputs'][fmt]}")
+
+    except ZipSafetyError as e:
+        logger.warning(f"ZIP安全チェック失敗 {file_path}: {e}")
+        result['status'] = STATUS_REJECTED
+        result['error'] = str(e)
+    except Exception as e:
+        logger.error(f"処理エラー {file_path}: {e}\n{traceback.format_exc()}")
+        result['status'] = STATUS_FAILED
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['elapsed_sec'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def compare_and_export(
+    old_path: str,
+    new_path: str,
+    output_dir: Optional[str] = None,
+    limits: Optional[Dict] = None,
+    export: bool = True
+) -> Dict:
+    """
+    2プロジェクトを解析・比較して差分レポートを出力し、結果の辞書を返す（例外は送出しない）
+
+    Returns:
+        dict: old, new, status, counts（変更種別ごとの件数）, outputs, skipped, elapsed_sec, error
+    """
+    started = time.perf_counter()
+    old_path, new_path = os.path.abspath(old_path), os.path.abspath(new_path)
+    output_dir = os.path.abspath(output_dir) if output_dir else os.path.dirname(new_path)
+    limits = limits or FEATURE_LIMITS['FREE']
+    result = {
+        'old': old_path,
+        'new': new_path,
+        'status': STATUS_OK,
+        'counts': None,
+        'outputs': {},
+        'skipped': {},
+        'elapsed_sec': 0.0,
+        'error': None,
+    }
+
+    try:
+        if not limits.get('diff_compare'):
+            raise PermissionError('差分比較にはStandard版が必要です')
+        analyses = []
+        for path in (old_path, new_path):
+            with open_checked_archive(path) as archive:
+                analyses.append(analyze_project(path, limits=limits, archive=archive))
+        diff = compare_projects(*analyses)
+        result['counts'] = {f.name: len(getattr(diff, f.name)) for f in dataclasses.fields(diff)}
+
+        if export:
+            reason = _export_unavailable_reason('excel', limits)
+            if reason:
+                result['skipped']['diff_excel'] = reason
+            else:
+                from core.exporters.excel_export import generate_diff_excel
+                os.makedirs(output_dir, exist_ok=True)
+                result['outputs']['diff_excel'] = generate_diff_excel(
+                    diff, analyses[0].project_name, analyses[1].project_name, output_dir
+                )
+
+    except ZipSafetyError as e:
+        logger.warning(f"ZIP安全チェック失敗: {e}")
+        result['status'] = STATUS_REJECTED
+        result['error'] = str(e)
+    except Exception as e:
+        logger.error(f"差分比較エラー {old_path} / {new_path}: {e}\n{traceback.format_exc()}")
+        result['status'] = STATUS_FAILED
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['elapsed_sec'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    ファイル・フォルダ・globパターンを .fgcp ファイルの一覧に展開
+
+    フォルダは配下を再帰的に検索する。存在しないパスはそのまま残し、
+    処理時にエラーとして報告する。重複は除き、指定順を保つ。
+    """
+    files: List[str] = []
+    seen = set()
+
+    def add(path: str):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            files.append(path)
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for path in sorted(glob.glob(os.path.join(pattern, '**', '*.fgcp'), recursive=True)):
+                add(path)
+        elif any(c in pattern for c in '*?['):
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    add(path)
+        else:
+            add(pattern)
+    return files
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+キャンセル制御モジュール
+
+解析・出力処理を途中で止めるための協調的なキャンセルトークンを提供する。
+処理側はエントリ・セクションの区切りごとに check_cancelled() を呼び出し、
+キャンセル要求があれば OperationCancelled を送出して処理を抜ける。
+"""
+
+import threading
+from typing import Optional
+
+
+class OperationCancelled(Exception):
+    """ユーザー操作により処理がキャンセルされた"""
+
+    def __init__(self, message: str = "処理がキャンセルされました"):
+        super().__init__(message)
+
+
+class CancellationToken:
+    """キャンセル要求を伝えるトークン（スレッド間で共有可能）"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """キャンセルを要求（何度呼んでもよい）"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled()
+
+
+def check_cancelled(token: Optional[CancellationToken]) -> None:
+    """トークンが指定されていてキャンセル要求があれば OperationCancelled を送出"""
+    if token is not None and token.cancelled:
+        raise OperationCancelled()
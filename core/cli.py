@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+コマンドラインインターフェース
+
+GUIを起動せずに .fgcp ファイルを一括で解析・出力する（ビルドサーバー等での利用を想定）。
+tkinter は読み込まない。
+
+使用方法:
+    python -m core analyze <ファイル|フォルダ|globパターン>... [-o 出力フォルダ] [-j 並列数]
+    python -m core daemon [-j ワーカー数]   … 常駐モード（プロトコルは core.daemon を参照）
+    python -m core serve [--port 8765]     … ローカルHTTPサービス（APIは core.service を参照）
+
+標準出力にはプロジェクトごとに1行のJSON（JSON Lines）を、完了順に出力する。
+ログは標準エラー出力とログファイルに出力される。
+
+終了コード:
+    0: すべて成功
+    1: 解析・出力に失敗したプロジェクトがある
+    2: コマンドライン引数の誤り
+    3: 対象ファイルが見つからない
+    4: 安全チェックで拒否されたプロジェクトがある（失敗がない場合）
+    5: 詳細検証で破損エントリが見つかった（失敗・拒否がない場合）
+    130: 中断（Ctrl+C）
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+from core.batch import (
+    EXPORT_FORMATS, STATUS_FAILED, STATUS_REJECTED,
+    analyze_and_export, expand_inputs
+)
+from core.logging_setup import init_worker_logging, worker_log_queue
+
+
+APP_VERSION = "1.1.0"
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_INPUT = 3
+EXIT_REJECTED = 4
+EXIT_CORRUPTED = 5
+EXIT_INTERRUPTED = 130
+
+
+def _parse_formats(value: str) -> List[str]:
+    formats = [f.strip().lower() for f in value.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"不明な出力形式: {', '.join(unknown)}（指定可能: {', '.join(EXPORT_FORMATS)}）"
+        )
+    return formats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m core',
+        description='Forguncy Insight - Forguncyプロジェクト解析・仕様書自動生成（コマンドライン版）'
+    )
+    parser.add_argument('--version', action='version', version=f'Forguncy Insight {APP_VERSION}')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    analyze = sub.add_parser('analyze', help='.fgcp ファイルを解析して仕様書を出力')
+    analyze.add_argument('inputs', nargs='+', metavar='PATH',
+                         help='.fgcp ファイル、フォルダ（配下を再帰検索）、またはglobパターン')
+    analyze.add_argument('-o', '--output-dir',
+                         help='出力フォルダ（省略時は各入力ファイルと同じフォルダ）')
+    analyze.add_argument('-f', '--formats', type=_parse_formats, default=list(EXPORT_FORMATS),
+                         help=f"出力形式をカンマ区切りで指定（既定: {','.join(EXPORT_FORMATS)}）")
+    analyze.add_argument('--no-export', action='store_true',
+                         help='解析のみ行い、ファイルを出力しない')
+    analyze.add_argument('-j', '--jobs', type=int, default=0,
+                         help='並列プロセス数（既定: CPU数）')
+    analyze.add_argument('--verify', action='store_true',
+                         help='全エントリを詳細検証する（CRCチェック）')
+    analyze.add_argument('--allow-large', action='store_true',
+                         help='ファイルサイズ上限を超えても続行する')
+    analyze.add_argument('--no-cache', action='store_true',
+                         help='解析内容に変更がなくても再出力する')
+
+    daemon = sub.add_parser('daemon', help='ライブラリ読み込み済みのワーカーを常駐させ、標準入出力のJSONで解析ジョブを受け付ける')
+    daemon.add_argument('-j', '--jobs', type=int, default=0,
+                        help='ワーカープロセス数（既定: CPU数）')
+
+    serve = sub.add_parser('serve', help='ローカルHTTPサービスを起動（127.0.0.1のみで待ち受け）')
+    serve.add_argument('--port', type=int, default=8765, help='待ち受けポート（既定: 8765）')
+    serve.add_argument('-j', '--jobs', type=int, default=2, help='同時に実行するジョブ数（既定: 2）')
+    serve.add_argument('--work-dir', help='アップロード・出力結果の保存先（既定: ~/.forguncyinsight/service）')
+    return parser
+
+
+def _emit(result: dict) -> None:
+    sys.stdout.write(json.dumps(result, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+def _exit_code(results: List[dict]) -> int:
+    statuses = {r['status'] for r in results}
+    if STATUS_FAILED in statuses:
+        return EXIT_FAILED
+    if STATUS_REJECTED in statuses:
+        return EXIT_REJECTED
+    if any(r['verify'] and r['verify']['corrupted'] for r in results):
+        return EXIT_CORRUPTED
+    return EXIT_OK
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    """analyze サブコマンド"""
+    from licensing.verify import LicenseManager
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print('対象の .fgcp ファイルが見つかりません', file=sys.stderr)
+        return EXIT_NO_INPUT
+
+    options = {
+        'output_dir': args.output_dir,
+        'formats': [] if args.no_export else args.formats,
+        'limits': LicenseManager().limits,
+        'deep_verify': args.verify,
+        'allow_large': args.allow_large,
+        'use_cache': not args.no_cache,
+    }
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(files)))
+
+    results = []
+    if jobs == 1:
+        for path in files:
+            results.append(analyze_and_export(path, **options))
+            _emit(results[-1])
+    else:
+        # ワーカーのログは親プロセスがまとめてログファイルに書き込む
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker_logging,
+                                 initargs=(worker_log_queue(),)) as pool:
+            futures = {pool.submit(analyze_and_export, path, **options): path for path in files}
+            for future in as_completed(futures):
+                results.append(future.result())
+                _emit(results[-1])
+
+    return _exit_code(results)
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    """daemon サブコマンド"""
+    from core.daemon import AnalysisDaemon
+    from licensing.verify import LicenseManager
+
+    daemon = AnalysisDaemon(args.jobs or os.cpu_count() or 1, LicenseManager().limits)
+    return daemon.serve()
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """serve サブコマンド"""
+    from core.service import DEFAULT_HOST, serve
+    from licensing.verify import LicenseManager
+
+    return serve(DEFAULT_HOST, args.port, max(1, args.jobs), args.work_dir, LicenseManager().limits)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'analyze':
+            return run_analyze(args)
+        if args.command == 'daemon':
+            return run_daemon(args)
+        if args.command == 'serve':
+            return run_serve(args)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    return EXIT_USAGE
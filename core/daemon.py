@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析デーモンモジュール
+
+python-docx / openpyxl / lxml を読み込み済みのワーカープロセスを常駐させ、
+標準入出力のJSON Lines プロトコルで解析ジョブを受け付ける。数百件のプロジェクトを
+処理するスクリプトから使う場合に、プロジェクトごとのインタープリタ起動と
+ライブラリ読み込みのコストを省く。
+
+使用方法:
+    python -m core daemon [-j ワーカー数]
+
+プロトコル（1行に1つのJSON、UTF-8）:
+    要求: {"id": 1, "method": "analyze", "params": {"file": "a.fgcp", "output_dir": "out",
+           "formats": ["word", "excel"], "verify": false, "snapshot": true}}
+          {"id": 2, "method": "ping"}
+          {"id": 3, "method": "shutdown"}
+    応答: {"id": 1, "result": {...}}   … analyze_and_export() の戻り値
+          {"id": 2, "error": {"code": "bad_request", "message": "..."}}
+    通知: {"event": "ready", "workers": 4}   … ワーカーの準備完了時に1回
+
+analyze は並列に処理され、応答は完了順に返る（id で対応付ける）。
+標準入力が閉じられるか shutdown を受け取ると、実行中のジョブの完了を待って終了する。
+"""
+
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import IO, Any, Dict, Optional
+
+from core.batch import EXPORT_FORMATS, analyze_and_export
+from core.logging_setup import init_worker_logging, logger, worker_log_queue
+
+
+# =============================================================================
+# ワーカープロセス
+# =============================================================================
+def _init_worker(log_queue) -> None:
+    """ワーカー起動時の初期化（ログの送信先を親プロセスにし、重いライブラリを読み込んでおく）"""
+    init_worker_logging(log_queue)
+    _warm_imports()
+
+
+def _warm_imports() -> None:
+    """ワーカー起動時に重いライブラリを読み込んでおく"""
+    import core.exporters.word_export  # noqa: F401  (python-docx, lxml)
+    import core.exporters.html_export  # noqa: F401
+    from core.exporters.excel_export import EXCEL_AVAILABLE  # noqa: F401  (openpyxl)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _run_job(params: Dict, limits: Dict) -> Dict:
+    return analyze_and_export(
+        params['file'],
+        output_dir=params.get('output_dir'),
+        formats=params.get('formats', EXPORT_FORMATS),
+        limits=limits,
+        deep_verify=bool(params.get('verify', False)),
+        allow_large=bool(params.get('allow_large', False)),
+        use_cache=bool(params.get('use_cache', True)),
+        include_snapshot=bool(params.get('snapshot', False)),
+    )
+
+
+# =============================================================================
+# デーモン本体
+# =============================================================================
+class DaemonRequestError(Exception):
+    """不正な要求"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class AnalysisDaemon:
+    """読み込み済みワーカープールで解析ジョブを処理するデーモン"""
+
+    def __init__(self, workers: int, limits: Dict, output: IO[str] = None):
+        self.workers = max(1, workers)
+        self.limits = limits
+        self._output = output or sys.stdout
+        self._write_lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        line = json.dumps(message, ensure_ascii=False, default=str)
+        with self._write_lock:
+            self._output.write(line + '\n')
+            self._output.flush()
+
+    def _reply(self, request_id, future: Future) -> None:
+        try:
+            self._send({'id': request_id, 'result': future.result()})
+        except Exception as e:
+            logger.error(f"ジョブ実行エラー id={request_id}: {e}")
+            self._send({'id': request_id, 'error': {'code': 'worker_error', 'message': f"{type(e).__name__}: {e}"}})
+
+    def _dispatch(self, request: Dict) -> bool:
+        """要求を処理。shutdown を受け取った場合は False を返す"""
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+
+        if method == 'ping':
+            self._send({'id': request_id, 'result': {'workers': self.workers}})
+        elif method == 'shutdown':
+            self._send({'id': request_id, 'result': {'shutdown': True}})
+            return False
+        elif method == 'analyze':
+            if not isinstance(params, dict) or not params.get('file'):
+                raise DaemonRequestError('bad_request', 'params.file を指定してください')
+            formats = params.get('formats', list(EXPORT_FORMATS))
+            if not isinstance(formats, list):
+                raise DaemonRequestError('bad_request', 'params.formats は出力形式のリストで指定してください')
+            unknown = [f for f in formats if f not in EXPORT_FORMATS]
+            if unknown:
+                raise DaemonRequestError('bad_request', f"不明な出力形式: {', '.join(map(str, unknown))}")
+            try:
+                future = self._pool.submit(_run_job, params, self.limits)
+            except BrokenProcessPool:
+                # ワーカーの異常終了でプールが使えなくなった（実行中だったジョブには worker_error を応答済み）
+                logger.warning("ワーカープロセスが異常終了したため、ワーカープールを作り直します")
+                self._restart_pool()
+                future = self._pool.submit(_run_job, params, self.limits)
+            future.add_done_callback(lambda f, rid=request_id: self._reply(rid, f))
+        else:
+            raise DaemonRequestError('unknown_method', f"不明なメソッド: {method}")
+        return True
+
+    def _start_pool(self) -> None:
+        """ワーカープールを作成し、全ワーカーのライブラリ読み込みを済ませる"""
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(worker_log_queue(),))
+        pids = {f.result() for f in [self._pool.submit(_ping) for _ in range(self.workers)]}
+        logger.info(f"ワーカー起動: {self.workers} (pid={sorted(pids)})")
+
+    def _restart_pool(self) -> None:
+        """壊れたワーカープールを破棄して作り直す"""
+        broken, self._pool = self._pool, None
+        broken.shutdown(wait=False)
+        self._start_pool()
+
+    def serve(self, input_stream: IO[str] = None) -> int:
+        """標準入力（または指定ストリーム）から要求を読み、終了まで処理する"""
+        input_stream = input_stream or sys.stdin
+        # 全ワーカーを起動してライブラリの読み込みを済ませてから受け付ける
+        self._start_pool()
+        try:
+            logger.info(f"解析デーモン起動: ワーカー={self.workers}")
+            self._send({'event': 'ready', 'workers': self.workers})
+
+            for line in input_stream:
+                line = line.strip()
+                if not line:
+                    continue
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise DaemonRequestError('bad_request', '要求はJSONオブジェクトで指定してください')
+                    request_id = request.get('id')
+                    if not self._dispatch(request):
+                        break
+                except json.JSONDecodeError as e:
+                    self._send({'id': None, 'error': {'code': 'bad_json', 'message': str(e)}})
+                except DaemonRequestError as e:
+                    self._send({'id': request_id, 'error': {'code': e.code, 'message': str(e)}})
+                except Exception as e:
+                    # 1件の要求の失敗でデーモンを止めない
+                    logger.error(f"要求の処理に失敗 id={request_id}: {e}")
+                    self._send({'id': request_id, 'error': {'code': 'internal_error',
+                                                            'message': f"{type(e).__name__}: {e}"}})
+        finally:
+            # 実行中のジョブの完了（と応答の送信）を待つ
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+            self._pool = None
+        logger.info("解析デーモン終了")
+        return 0
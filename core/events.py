@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+イベントバスモジュール
+
+解析スレッドからUIスレッドへ AnalysisEvent を受け渡す。
+UIは一定間隔（100ms）でまとめて取り出すため、間に届いたイベントを以下のように集約する。
+
+- progress: 最新の値だけを保持（途中の値は描画しない）
+- log: 取り出しまでの行をまとめて返す（UIは1回の挿入で描画する）。
+  未取り出しの行数には上限があり、超えた分は古い行から捨てて件数だけ報告する
+- その他（complete / error / confirm / cancelled）: 順序どおりにすべて返す
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from core.models import AnalysisEvent
+
+
+# 未取り出しのログ行の上限（超えた分は古い行から捨てる）
+MAX_PENDING_LOG_LINES = 5000
+
+
+@dataclass
+class EventBatch:
+    """1回の取り出しで得られるイベント"""
+    progress: Optional[Tuple[int, str]] = None
+    logs: List[Tuple[str, str]] = field(default_factory=list)  # (level, message)
+    dropped_logs: int = 0
+    events: List[AnalysisEvent] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return self.progress is None and not self.logs and not self.dropped_logs and not self.events
+
+
+class AnalysisEventBus:
+    """
+    スレッドセーフなイベントバス
+
+    put() は任意のスレッドから呼び出せる。drain() はUIスレッドから呼び出す。
+    """
+
+    def __init__(self, max_pending_logs: int = MAX_PENDING_LOG_LINES):
+        self._lock = threading.Lock()
+        self._progress: Optional[Tuple[int, str]] = None
+        self._logs: deque = deque(maxlen=max_pending_logs)
+        self._dropped_logs = 0
+        self._events: List[AnalysisEvent] = []
+
+    def put(self, event: AnalysisEvent) -> None:
+        with self._lock:
+            if event.event_type == 'progress':
+                self._progress = event.data
+            elif event.event_type == 'log':
+                if len(self._logs) == self._logs.maxlen:
+                    self._dropped_logs += 1
+                self._logs.append(event.data)
+            else:
+                self._events.append(event)
+
+    def progress(self, pct: int, msg: str) -> None:
+        self.put(AnalysisEvent('progress', (pct, msg)))
+
+    def log(self, level: str, msg: str) -> None:
+        self.put(AnalysisEvent('log', (level, msg)))
+
+    def drain(self) -> EventBatch:
+        """溜まっているイベントをまとめて取り出す"""
+        with self._lock:
+            batch = EventBatch(
+                progress=self._progress,
+                logs=list(self._logs),
+                dropped_logs=self._dropped_logs,
+                events=self._events,
+            )
+            self._progress = None
+            self._logs.clear()
+            self._dropped_logs = 0
+            self._events = []
+        return batch
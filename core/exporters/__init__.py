@@ -4,20 +4,73 @@
 Forguncy Insight - Exporters モジュール
 
 仕様書エクスポート機能を提供する。
+
+python-docx / openpyxl / lxml の読み込みには時間がかかるため、各エクスポーターは
+属性に最初にアクセスした時点で読み込む（GUIの起動を遅らせない）。
+EXCEL_AVAILABLE は openpyxl を読み込まずにインストール有無だけを判定する。
 """
 
-from core.exporters.word_export import generate_spec_document
-from core.exporters.excel_export import (
-    generate_excel_document,
-    generate_er_mermaid,
-    generate_diff_excel,
-    EXCEL_AVAILABLE,
-)
+import importlib
+import importlib.util
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # 型チェッカー・PyInstaller の依存解析向け（実行時は読み込まない）
+    from core.exporters.word_export import generate_spec_document
+    from core.exporters.html_export import generate_html_report
+    from core.exporters.er_diagram import generate_er_diagrams, partition_tables
+    from core.exporters.export_cache import compute_analysis_hash, EXPORTER_VERSION
+    from core.exporters.excel_export import (
+        generate_excel_document, generate_er_mermaid, generate_diff_excel, write_diff_records
+    )
+
+EXCEL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+
+# 公開名 -> 定義モジュール
+_LAZY_ATTRS = {
+    'generate_spec_document': 'core.exporters.word_export',
+    'generate_html_report': 'core.exporters.html_export',
+    'generate_er_diagrams': 'core.exporters.er_diagram',
+    'partition_tables': 'core.exporters.er_diagram',
+    'compute_analysis_hash': 'core.exporters.export_cache',
+    'EXPORTER_VERSION': 'core.exporters.export_cache',
+    'generate_excel_document': 'core.exporters.excel_export',
+    'generate_er_mermaid': 'core.exporters.excel_export',
+    'generate_diff_excel': 'core.exporters.excel_export',
+    'write_diff_records': 'core.exporters.excel_export',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
+
+
+def preload() -> None:
+    """全エクスポーターを読み込む（GUI表示後にバックグラウンドスレッドから呼び出す）"""
+    for module_name in sorted(set(_LAZY_ATTRS.values())):
+        importlib.import_module(module_name)
+
 
 __all__ = [
     'generate_spec_document',
     'generate_excel_document',
+    'generate_html_report',
     'generate_er_mermaid',
+    'generate_er_diagrams',
+    'partition_tables',
     'generate_diff_excel',
+    'write_diff_records',
     'EXCEL_AVAILABLE',
+    'compute_analysis_hash',
+    'EXPORTER_VERSION',
+    'preload',
 ]
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ER図生成モジュール
+
+テーブル間のリレーショングラフを一度だけ構築し、連結成分（大きすぎる成分は
+フォルダ単位）でクラスタに分割して、クラスタごとのMermaid ER図と
+クラスタ間の関係を示す概要図を生成する。どの図も上限文字数に収まるよう、
+収まらない図は続きの図に分ける。
+
+すべての処理はテーブル数＋リレーション数に対して線形時間で完了する。
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+# 1図あたりの上限（Mermaidで描画可能な規模、Excelセル上限 32,767 文字以内）
+ER_MAX_TABLES_PER_DIAGRAM = 30
+ER_MAX_COLUMNS_PER_TABLE = 10
+ER_MAX_CHARS_PER_DIAGRAM = 30000
+
+
+@dataclass
+class ERCluster:
+    """ER図クラスタ（1枚の図に描画するテーブル群）"""
+    cluster_id: str
+    title: str
+    tables: list = field(default_factory=list)
+    relation_count: int = 0
+
+
+@dataclass
+class ERDiagram:
+    """生成済みER図"""
+    title: str
+    code: str
+    table_count: int = 0
+
+
+# =============================================================================
+# ヘルパー
+# =============================================================================
+def sanitize_er_name(s: str) -> str:
+    """Mermaid識別子として使えない文字を置換"""
+    return re.sub(r'[^a-zA-Z0-9_\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]', '_', s)
+
+
+def er_entity_lines(table, max_columns: int = ER_MAX_COLUMNS_PER_TABLE) -> List[str]:
+    """テーブル1件分のエンティティ定義行を生成"""
+    lines = [f'  {sanitize_er_name(table.name)} {{']
+    for col in table.columns[:max_columns]:
+        col_type = re.sub(r'[^a-z]', '', col.type.lower()) or 'string'
+        pk = 'PK' if col.name.lower() == 'id' else ''
+        lines.append(f'    {col_type} {sanitize_er_name(col.name)} {pk}'.strip())
+    if len(table.columns) > max_columns:
+        lines.append('    string more_columns "..."')
+    lines.append('  }')
+    return lines
+
+
+def er_relation_line(source_name: str, rel) -> str:
+    """リレーション1件分の行を生成"""
+    rel_type = '}o--||' if 'Many' in rel.relation_type else '||--||'
+    return (f'  {sanitize_er_name(source_name)} {rel_type} '
+            f'{sanitize_er_name(rel.target_table)} : "{rel.source_column}"')
+
+
+# =============================================================================
+# グラフ構築・分割
+# =============================================================================
+def build_relation_graph(tables: list) -> Dict[str, set]:
+    """リレーションの無向隣接リストを構築（定義済みテーブルのみ）"""
+    names = {t.name for t in tables}
+    adjacency: Dict[str, set] = {t.name: set() for t in tables}
+    for t in tables:
+        for rel in t.relations:
+            if rel.target_table in names and rel.target_table != t.name:
+                adjacency[t.name].add(rel.target_table)
+                adjacency[rel.target_table].add(t.name)
+    return adjacency
+
+
+def _connected_components(tables: list, adjacency: Dict[str, set]) -> List[List[str]]:
+    """BFSで連結成分を列挙（成分内はBFS順＝近いテーブルが隣接する順）"""
+    seen = set()
+    components = []
+    for t in tables:
+        if t.name in seen:
+            continue
+        seen.add(t.name)
+        order = []
+        queue = deque([t.name])
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for nb in adjacency[name]:
+                if nb not in seen:
+                    seen.add(nb)
+                    queue.append(nb)
+        components.append(order)
+    return components
+
+
+def _chunk_by_budget(names: List[str], table_map: dict, max_tables: int, max_chars: int) -> List[List[str]]:
+    """テーブル数と推定文字数の両方の上限でチャンク分割"""
+    chunks, current, size = [], [], 0
+    for name in names:
+        t = table_map[name]
+        cost = 40 + sum(len(c.name) + 20 for c in t.columns[:ER_MAX_COLUMNS_PER_TABLE]) \
+            + sum(len(r.target_table) + len(r.source_column) + len(name) + 20 for r in t.relations)
+        if current and (len(current) >= max_tables or size + cost > max_chars):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(name)
+        size += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def partition_tables(
+    tables: list,
+    max_tables: int = ER_MAX_TABLES_PER_DIAGRAM,
+    max_chars: int = ER_MAX_CHARS_PER_DIAGRAM,
+) -> List[ERCluster]:
+    """
+    テーブルをER図クラスタに分割
+
+    - リレーションで連結されたテーブル群（連結成分）を1クラスタとする
+    - 上限を超える成分はフォルダ順に並べ、テーブル数・文字数の上限でチャンク分割する
+    - リレーションを持たない独立テーブルはフォルダ単位でまとめる
+    """
+    table_map = {t.name: t for t in tables}
+    adjacency = build_relation_graph(tables)
+
+    groups = []  # (タイトル, テーブル名リスト)
+    isolated: Dict[str, List[str]] = {}
+    for component in _connected_components(tables, adjacency):
+        if len(component) == 1 and not adjacency[component[0]]:
+            isolated.setdefault(table_map[component[0]].folder or '(ルート)', []).append(component[0])
+            continue
+        if len(component) > max_tables:
+            # 大きな成分はフォルダ順（フォルダ内はBFS順）に並べ替えて分割する
+            component = sorted(component, key=lambda n: table_map[n].folder or '(ルート)')
+        groups.append((f'{table_map[component[0]].name} 周辺', component))
+
+    for folder in sorted(isolated):
+        groups.append((f'独立テーブル ({folder})', isolated[folder]))
+
+    clusters = []
+    for title, names in groups:
+        chunks = _chunk_by_budget(names, table_map, max_tables, max_chars)
+        for i, chunk in enumerate(chunks, 1):
+            members = set(chunk)
+            folders = sorted({table_map[n].folder or '(ルート)' for n in chunk})
+            label = title if len(chunks) == 1 else f'{title} {i}/{len(chunks)}'
+            if not title.startswith('独立テーブル'):
+                label += f" ({', '.join(folders[:3])}{' 他' if len(folders) > 3 else ''})"
+            cluster = ERCluster(
+                cluster_id=f'C{len(clusters) + 1}',
+                title=label,
+                tables=[table_map[n] for n in chunk],
+            )
+            cluster.relation_count = sum(
+                1 for n in chunk for r in table_map[n].relations if r.target_table in members
+            )
+            clusters.append(cluster)
+    return clusters
+
+
+# =============================================================================
+# Mermaid生成
+# =============================================================================
+_ER_HEADER = 'erDiagram'
+
+
+def _pack_blocks(blocks: List[List[str]], max_chars: int) -> List[str]:
+    """
+    行ブロック（エンティティ定義・リレーション行）を上限文字数以内の erDiagram コードに詰める
+
+    ブロックは分割せずに詰め、1ブロックだけで上限を超える場合のみ行単位に分ける。
+    どのコードも max_chars 文字を超えない。
+    """
+    budget = max_chars - len(_ER_HEADER)
+    codes, current, size = [], [], 0
+    for block in blocks:
+        block_size = sum(len(line) + 1 for line in block)
+        if block_size > budget:
+            # 極端に長い定義は行単位に分ける（1行が上限を超える場合は切り詰める）
+            block_lines = [[line[:budget - 1]] for line in block]
+        else:
+            block_lines = [block]
+        for lines in block_lines:
+            lines_size = sum(len(line) + 1 for line in lines)
+            if current and size + lines_size > budget:
+                codes.append('\n'.join([_ER_HEADER] + current))
+                current, size = [], 0
+            current.extend(lines)
+            size += lines_size
+    if current or not codes:
+        codes.append('\n'.join([_ER_HEADER] + current))
+    return codes
+
+
+def _cluster_diagrams(cluster: ERCluster, max_chars: int = ER_MAX_CHARS_PER_DIAGRAM) -> List[str]:
+    """クラスタのER図（上限文字数を超える場合は続きの図に分ける）"""
+    members = {t.name for t in cluster.tables}
+    blocks = [er_entity_lines(table) for table in cluster.tables]
+    for table in cluster.tables:
+        for rel in table.relations:
+            if rel.target_table in members:
+                blocks.append([er_relation_line(table.name, rel)])
+    return _pack_blocks(blocks, max_chars)
+
+
+def _overview_diagrams(clusters: List[ERCluster], max_chars: int = ER_MAX_CHARS_PER_DIAGRAM) -> List[str]:
+    """
+    クラスタを1エンティティとし、クラスタ間リレーション数を示す概要図
+
+    クラスタ数が多く上限文字数に収まらない場合はフォルダ単位（テーブル数のみ）に集約し、
+    それでも収まらない場合は続きの図に分ける。
+    """
+    owner = {t.name: c.cluster_id for c in clusters for t in c.tables}
+    codes = _pack_blocks(_group_overview(
+        [(c.cluster_id, c.tables) for c in clusters], owner, detail=True), max_chars)
+    if len(codes) == 1:
+        return codes
+
+    by_folder: Dict[str, list] = {}
+    for c in clusters:
+        for t in c.tables:
+            by_folder.setdefault(t.folder or '(ルート)', []).append(t)
+    owner = {t.name: sanitize_er_name(folder) for folder, ts in by_folder.items() for t in ts}
+    return _pack_blocks(_group_overview(
+        [(sanitize_er_name(folder), ts) for folder, ts in sorted(by_folder.items())], owner, detail=False),
+        max_chars)
+
+
+def _group_overview(groups: list, owner: Dict[str, str], detail: bool) -> List[List[str]]:
+    """概要図の行ブロック（グループごとのエンティティ定義、グループ間リレーション行）"""
+    blocks = []
+    for group_id, group_tables in groups:
+        lines = [f'  {group_id} {{']
+        if detail:
+            for t in group_tables[:3]:
+                lines.append(f'    table {sanitize_er_name(t.name)}')
+        lines.append(f'    int tables "{len(group_tables)}"')
+        lines.append('  }')
+        blocks.append(lines)
+
+    cross: Dict[tuple, int] = {}
+    for group_id, group_tables in groups:
+        for t in group_tables:
+            for rel in t.relations:
+                target = owner.get(rel.target_table)
+                if target and target != group_id:
+                    key = tuple(sorted((group_id, target)))
+                    cross[key] = cross.get(key, 0) + 1
+    for (a, b), count in sorted(cross.items()):
+        blocks.append([f'  {a} }}o--o{{ {b} : "{count}"'])
+    return blocks
+
+
+def _numbered(title: str, codes: List[str]) -> List[tuple]:
+    """続きの図がある場合はタイトルに連番を付ける"""
+    if len(codes) == 1:
+        return [(title, codes[0])]
+    return [(f'{title} ({i}/{len(codes)})', code) for i, code in enumerate(codes, 1)]
+
+
+def generate_er_diagrams(
+    tables: list,
+    max_tables: int = ER_MAX_TABLES_PER_DIAGRAM,
+    max_chars: int = ER_MAX_CHARS_PER_DIAGRAM,
+) -> List[ERDiagram]:
+    """
+    分割済みER図を生成
+
+    Returns:
+        List[ERDiagram]: 先頭が概要図、以降がクラスタごとのER図
+            （上限文字数を超える図は続きの図に分け、どの図も max_chars 文字以内）
+    """
+    clusters = partition_tables(tables, max_tables, max_chars)
+    diagrams = [ERDiagram(title=title, code=code, table_count=len(tables))
+                for title, code in _numbered('概要（クラスタ間の関係）', _overview_diagrams(clusters, max_chars))]
+    for c in clusters:
+        for title, code in _numbered(f'{c.cluster_id}: {c.title}', _cluster_diagrams(c, max_chars)):
+            diagrams.append(ERDiagram(title=title, code=code, table_count=len(c.tables)))
+    return diagrams
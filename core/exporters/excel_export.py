@@ -7,10 +7,16 @@ Excelエクスポートモジュール
 """
 
 import os
-import re
 from datetime import datetime
+from typing import Iterable, Optional
 
-from core.models import AnalysisResult
+from core.analysis import ARTIFACT_KIND_LABELS, ROOT_KIND_LABELS, SEVERITY_LABELS, format_command_path
+from core.cancellation import CancellationToken, check_cancelled
+from core.models import AnalysisResult, DiffRecord, DiffResult
+from core.fgcp_parser import iter_diff_records
+from core.exporters.er_diagram import er_entity_lines, er_relation_line, generate_er_diagrams
+from core.exporters.export_cache import compute_analysis_hash, is_export_current, record_export, save_atomically
+from core.logging_setup import logger
 
 
 # =============================================================================
@@ -26,7 +32,8 @@ VERSION_INFO = f"v{APP_VERSION} (Forguncy {', '.join(SUPPORTED_FORGUNCY_VERSIONS
 # =============================================================================
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, Border, Side, PatternFill
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Border, Side, PatternFill, NamedStyle
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
@@ -36,27 +43,14 @@ except ImportError:
 # ER図Mermaid生成
 # =============================================================================
 def generate_er_mermaid(tables: list) -> str:
-    """ER図のMermaid記法を生成"""
-    def sanitize(s):
-        return re.sub(r'[^a-zA-Z0-9_\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]', '_', s)
-
+    """ER図のMermaid記法を生成（全テーブルを1枚の図に出力）"""
     lines = ['erDiagram']
     for table in tables:
-        lines.append(f'  {sanitize(table.name)} {{')
-        for col in table.columns[:10]:
-            col_type = re.sub(r'[^a-z]', '', col.type.lower()) or 'string'
-            pk = 'PK' if col.name.lower() == 'id' else ''
-            lines.append(f'    {col_type} {sanitize(col.name)} {pk}'.strip())
-        if len(table.columns) > 10:
-            lines.append('    string more_columns "..."')
-        lines.append('  }')
+        lines.extend(er_entity_lines(table))
 
     for table in tables:
         for rel in table.relations:
-            from_t = sanitize(table.name)
-            to_t = sanitize(rel.target_table)
-            rel_type = '}o--||' if 'Many' in rel.relation_type else '||--||'
-            lines.append(f'  {from_t} {rel_type} {to_t} : "{rel.source_column}"')
+            lines.append(er_relation_line(table.name, rel))
 
     return '\n'.join(lines)
 
@@ -64,12 +58,43 @@ def generate_er_mermaid(tables: list) -> str:
 # =============================================================================
 # Excel出力
 # =============================================================================
-def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
-    """Excel形式で出力"""
+def _write_table_sheet(wb, title: str, headers: list, rows, styles: tuple, widths: list = None):
+    """見出し行＋データ行のシートを追加（styles: (header_fill, header_font, thin_border)）"""
+    header_fill, header_font, thin_border = styles
+    ws = wb.create_sheet(title)
+    for col_idx, header in enumerate(headers, 1):
+        cell = ws.cell(row=1, column=col_idx, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
+    for row_idx, values in enumerate(rows, 2):
+        for col_idx, value in enumerate(values, 1):
+            cell = ws.cell(row=row_idx, column=col_idx, value=value)
+            cell.border = thin_border
+    for col_idx, width in enumerate(widths or [], 1):
+        ws.column_dimensions[chr(ord('A') + col_idx - 1)].width = width
+    ws.freeze_panes = 'A2'
+    return ws
+
+
+def generate_excel_document(analysis: AnalysisResult, output_dir: str, use_cache: bool = True,
+                            cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    Excel形式で出力（use_cache=True の場合、解析内容が前回出力時と同一なら再生成しない）
+
+    cancel_token を指定した場合はシート・テーブルごとにキャンセルを確認し、
+    キャンセル時は OperationCancelled を送出する（出力ファイルは書き換えない）。
+    """
     if not EXCEL_AVAILABLE:
         raise ImportError("openpyxlがインストールされていません。pip install openpyxl を実行してください。")
 
     os.makedirs(output_dir, exist_ok=True)
+    file_path = os.path.join(output_dir, f'{analysis.project_name}_仕様書.xlsx')
+    content_hash = compute_analysis_hash(analysis)
+    if use_cache and is_export_current(file_path, content_hash, 'excel'):
+        logger.info(f"Excel出力スキップ（解析内容に変更なし）: {file_path}")
+        return file_path
+
     wb = Workbook()
 
     # ヘッダースタイル
@@ -106,6 +131,7 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
     ws_summary.column_dimensions['A'].width = 20
     ws_summary.column_dimensions['B'].width = 40
 
+    check_cancelled(cancel_token)
     # テーブル一覧シート
     ws_tables = wb.create_sheet('テーブル一覧')
     table_headers = ['No.', 'テーブル名', 'フォルダ', 'カラム数', 'リレーション数']
@@ -121,6 +147,7 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
             cell = ws_tables.cell(row=row_idx, column=col_idx, value=value)
             cell.border = thin_border
 
+    check_cancelled(cancel_token)
     # カラム定義シート
     ws_columns = wb.create_sheet('カラム定義')
     col_headers = ['テーブル名', 'カラム名', 'データ型', '必須', 'ユニーク', 'デフォルト値']
@@ -132,6 +159,7 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
 
     row_idx = 2
     for t in analysis.tables:
+        check_cancelled(cancel_token)
         for c in t.columns:
             values = [t.name, c.name, c.type, '○' if c.required else '', '○' if c.unique else '', c.default_value or '']
             for col_idx, value in enumerate(values, 1):
@@ -139,6 +167,7 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
                 cell.border = thin_border
             row_idx += 1
 
+    check_cancelled(cancel_token)
     # ページ一覧シート
     ws_pages = wb.create_sheet('ページ一覧')
     page_headers = ['No.', 'ページ名', '種別', 'ボタン数', '数式数']
@@ -154,6 +183,7 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
             cell = ws_pages.cell(row=row_idx, column=col_idx, value=value)
             cell.border = thin_border
 
+    check_cancelled(cancel_token)
     # サーバーコマンドシート
     ws_cmds = wb.create_sheet('サーバーコマンド')
     cmd_headers = ['No.', 'コマンド名', 'フォルダ', 'パラメータ数', '処理行数']
@@ -169,263 +199,268 @@ def generate_excel_document(analysis: AnalysisResult, output_dir: str) -> str:
             cell = ws_cmds.cell(row=row_idx, column=col_idx, value=value)
             cell.border = thin_border
 
+    check_cancelled(cancel_token)
     # ER図シート (テキスト形式)
+    # 大規模スキーマでもセル上限・描画上限を超えないようクラスタ単位に分割して出力
     ws_er = wb.create_sheet('ER図(Mermaid)')
-    ws_er.cell(row=1, column=1, value='以下をMermaid Live Editorに貼り付けてください')
-    er_code = generate_er_mermaid(analysis.tables)
-    ws_er.cell(row=3, column=1, value=er_code)
+    ws_er.cell(row=1, column=1, value='B列の各コードをMermaid Live Editorに貼り付けてください（先頭の行は概要図。(1/2) などの連番は続きの図）')
+    er_headers = ['図', 'Mermaidコード', 'テーブル数']
+    for col_idx, header in enumerate(er_headers, 1):
+        cell = ws_er.cell(row=2, column=col_idx, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
 
-    file_path = os.path.join(output_dir, f'{analysis.project_name}_仕様書.xlsx')
-    wb.save(file_path)
+    for row_idx, diagram in enumerate(generate_er_diagrams(analysis.tables), 3):
+        values = [diagram.title, diagram.code, diagram.table_count]
+        for col_idx, value in enumerate(values, 1):
+            cell = ws_er.cell(row=row_idx, column=col_idx, value=value)
+            cell.border = thin_border
+
+    ws_er.column_dimensions['A'].width = 40
+    ws_er.column_dimensions['B'].width = 80
+
+    styles = (header_fill, header_font, thin_border)
+
+    # パフォーマンス指摘シート（ループ内のデータアクセス）
+    if analysis.perf_findings:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, 'パフォーマンス指摘', [
+            'No.', '重要度', '場所', 'ループ深さ', 'コマンド種別', '経由サーバーコマンド', '処理パス'
+        ], (
+            [i, SEVERITY_LABELS.get(f.severity, f.severity), f.location, f.loop_depth, f.command_type,
+             ' → '.join(f.call_chain) or '-', format_command_path(f.path, item_max=80)]
+            for i, f in enumerate(analysis.perf_findings, 1)
+        ), styles, [6, 8, 50, 10, 24, 30, 100])
+
+    # インデックス推奨シート
+    if analysis.index_recommendations:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, 'インデックス推奨', [
+            '順位', 'テーブル', 'カラム', 'スコア', '使用句', 'コマンド数', 'ページ数', '使用箇所（例）'
+        ], (
+            [i, r.table, r.column, r.score, ', '.join(f'{c} {n}' for c, n in r.clauses.items()),
+             r.command_count, r.page_count, '\n'.join(r.examples)]
+            for i, r in enumerate(analysis.index_recommendations, 1)
+        ), styles, [6, 24, 24, 8, 30, 10, 10, 60])
+
+    # 高コスト処理シート
+    if analysis.hot_paths:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, '高コスト処理', [
+            '順位', '種別', '処理', 'コスト', 'SQL', '更新', 'メール', '呼出', 'ループ深さ', '最も重い処理パス'
+        ], (
+            [i, ROOT_KIND_LABELS.get(h.kind, h.kind), h.location, h.cost, h.sql_count, h.write_count,
+             h.email_count, h.call_count, h.max_loop_depth, format_command_path(h.hot_path, item_max=80)]
+            for i, h in enumerate(analysis.hot_paths, 1)
+        ), styles, [6, 14, 50, 10, 6, 6, 6, 6, 10, 100])
+
+    # ページ負荷シート（全ページ・マスターページを負荷スコア順に）
+    if analysis.pages:
+        check_cancelled(cancel_token)
+        ranked_pages = sorted(analysis.pages, key=lambda p: (-p.metrics.total_weight, p.name))
+        _write_table_sheet(wb, 'ページ負荷', [
+            '順位', 'ページ名', '種別', '負荷(合計)', '負荷(自ページ)', 'セル数', '数式数', '数式文字数',
+            'コマンド数', 'マスターページ', 'セル型内訳'
+        ], (
+            [i, p.name, 'マスターページ' if p.page_type == 'masterPage' else 'ページ',
+             p.metrics.total_weight, p.metrics.weight, p.metrics.attached_cells, p.metrics.formula_count,
+             p.metrics.formula_length, p.metrics.command_count, p.metrics.master_page or '-',
+             ', '.join(f'{k}×{v}' for k, v in sorted(p.metrics.cell_types.items(), key=lambda kv: (-kv[1], kv[0])))]
+            for i, p in enumerate(ranked_pages, 1)
+        ), styles, [6, 30, 14, 12, 12, 8, 8, 10, 10, 20, 60])
+
+    # 数式の依存関係シート
+    if analysis.formula_reports:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, '数式依存関係', [
+            'ページ名', '数式数', '異なる数式', '循環参照数', '循環参照セル', '最大段数', '最長チェーン', '被参照の多いセル'
+        ], (
+            [r.page, r.formula_count, r.distinct_formulas, r.cycle_count,
+             '\n'.join('・'.join(c) for c in r.cycles) or '-', r.max_chain_depth,
+             ' → '.join(r.deepest_chain) or '-', ', '.join(f'{cell}({n})' for cell, n in r.high_fan_in) or '-']
+            for r in analysis.formula_reports
+        ), styles, [30, 8, 10, 10, 40, 8, 60, 40])
+
+    # テーブル読み書きシート
+    if analysis.table_pressure:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, 'テーブル読み書き', [
+            '順位', 'テーブル', '定義', 'スコア', '書込箇所', '書込(重み付き)', '読込箇所', '読込(重み付き)',
+            'ページ数', '主な書込箇所'
+        ], (
+            [i, t.table, '○' if t.defined else '定義外', t.score, t.write_sites, t.write_weight,
+             t.read_sites, t.read_weight, t.page_count, '\n'.join(t.writers)]
+            for i, t in enumerate(analysis.table_pressure, 1)
+        ), styles, [6, 24, 8, 10, 10, 14, 10, 14, 10, 80])
+
+    # ワークフロー分析シート
+    if analysis.workflow_analytics:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, 'ワークフロー分析', [
+            'テーブル', '初期状態', '到達可能', '到達できない状態', '行き止まりの状態', '未定義の状態',
+            '循環', '重い遷移'
+        ], (
+            [w.table_name, ', '.join(w.initial_states), len(w.reachable_states),
+             ', '.join(w.unreachable_states), ', '.join(w.dead_end_states), ', '.join(w.undefined_states),
+             '\n'.join(' ⇄ '.join(c) for c in w.cycles),
+             '\n'.join(f'{h.action}（{h.from_state} → {h.to_state}）コスト {h.cost}' for h in w.heavy_transitions)]
+            for w in analysis.workflow_analytics
+        ), styles, [24, 16, 10, 30, 30, 20, 40, 60])
+
+    # 画面遷移シート（隣接リスト）
+    nav = analysis.navigation
+    if nav.links or nav.broken_links or nav.orphan_pages:
+        check_cancelled(cancel_token)
+        orphans = set(nav.orphan_pages)
+        sources = {link[0] for link in nav.links + nav.broken_links}
+        _write_table_sheet(wb, '画面遷移', ['遷移元', '遷移先', '経由マスターページ', '備考'], (
+            [[source, target, via or '-', '遷移元は他の画面から遷移されない画面' if source in orphans else '']
+             for source, target, via in nav.links]
+            + [[source, target, '-', '遷移先の画面が存在しない'] for source, target in nav.broken_links]
+            + [[name, '-', '-', '他の画面から遷移されず、他の画面へも遷移しない画面']
+               for name in nav.orphan_pages if name not in sources]
+        ), styles, [30, 30, 24, 40])
+
+    # 未使用の定義シート
+    if analysis.unused_artifacts:
+        check_cancelled(cancel_token)
+        _write_table_sheet(wb, '未使用の定義', ['No.', '種別', '名前', 'フォルダ', '備考'], (
+            [i, ARTIFACT_KIND_LABELS.get(u.kind, u.kind), u.name, u.folder, u.note]
+            for i, u in enumerate(analysis.unused_artifacts, 1)
+        ), styles, [6, 16, 40, 30, 40])
+
+    check_cancelled(cancel_token)
+    save_atomically(file_path, wb.save)
+    record_export(file_path, content_hash, 'excel')
     return file_path
 
 
 # =============================================================================
 # 差分比較Excel出力
 # =============================================================================
-def generate_diff_excel(diff, old_name: str, new_name: str, output_dir: str) -> str:
-    """差分比較結果をExcel形式で出力"""
-    if not EXCEL_AVAILABLE:
-        raise ImportError("openpyxlがインストールされていません。pip install openpyxl を実行してください。")
+DIFF_CHANGE_LABELS = {'added': '追加', 'removed': '削除', 'modified': '変更'}
 
-    os.makedirs(output_dir, exist_ok=True)
-    wb = Workbook()
+# カテゴリ: (シート名, 名前列見出し, サマリー表示名, 列幅)
+DIFF_SHEETS = {
+    'table': ('テーブル変更', 'テーブル名', 'テーブル', [10, 30, 20, 60]),
+    'page': ('ページ変更', 'ページ名', 'ページ', [10, 40, 20, 50]),
+    'server_command': ('サーバーコマンド変更', 'コマンド名', 'サーバーコマンド', [10, 40, 20, 50]),
+}
 
-    # スタイル定義
-    header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-    added_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
-    removed_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
-    modified_fill = PatternFill(start_color='FFEB9C', end_color='FFEB9C', fill_type='solid')
-    header_font = Font(bold=True, color='FFFFFF')
-    added_font = Font(color='006100')
-    removed_font = Font(color='9C0006')
-    modified_font = Font(color='9C6500')
+
+def _register_diff_styles(wb) -> None:
+    """差分レポートの共有スタイルを名前付きスタイルとして一度だけ登録"""
     thin_border = Border(
         left=Side(style='thin'), right=Side(style='thin'),
         top=Side(style='thin'), bottom=Side(style='thin')
     )
+    styles = {
+        'diff_header': (Font(bold=True, color='FFFFFF'), '4472C4'),
+        'diff_added': (Font(color='006100'), 'C6EFCE'),
+        'diff_removed': (Font(color='9C0006'), 'FFC7CE'),
+        'diff_modified': (Font(color='9C6500'), 'FFEB9C'),
+        'diff_plain': (Font(), None),
+    }
+    for name, (font, color) in styles.items():
+        style = NamedStyle(name=name, font=font, border=thin_border)
+        if color:
+            style.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+        wb.add_named_style(style)
+    wb.add_named_style(NamedStyle(name='diff_title', font=Font(bold=True, size=14)))
+
+
+def _styled_row(ws, values, style: str) -> list:
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        cells.append(cell)
+    return cells
+
+
+def write_diff_records(records: Iterable[DiffRecord], old_name: str, new_name: str, output_dir: str,
+                       cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    差分レコードを逐次書き込んでExcelを出力
+
+    書き込み専用ワークブックに1行ずつ追記するため、メモリ使用量は変更件数に依存しない。
+    スタイルは名前付きスタイルとして共有し、セルごとのフォント・塗りつぶし生成を行わない。
+
+    Args:
+        records: 差分レコードのイテラブル（差分エンジンからのジェネレータをそのまま渡せる）
+        old_name: 比較元プロジェクト名
+        new_name: 比較先プロジェクト名
+        output_dir: 出力先フォルダ
+        cancel_token: キャンセルトークン（レコードごとに確認する）
+
+    Returns:
+        str: 出力ファイルパス
+
+    Raises:
+        OperationCancelled: キャンセルされた場合（出力ファイルは書き換えない）
+    """
+    if not EXCEL_AVAILABLE:
+        raise ImportError("openpyxlがインストールされていません。pip install openpyxl を実行してください。")
 
-    # =========================
-    # サマリーシート
-    # =========================
-    ws_summary = wb.active
-    ws_summary.title = 'サマリー'
-
-    summary_data = [
-        ['差分比較レポート', ''],
-        ['', ''],
-        ['比較元（旧）', old_name],
-        ['比較先（新）', new_name],
-        ['生成日時', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-        ['', ''],
-        ['変更サマリー', ''],
-        ['', ''],
-        ['カテゴリ', '追加', '削除', '変更'],
-    ]
-    for row_idx, row in enumerate(summary_data, 1):
-        for col_idx, value in enumerate(row, 1):
-            cell = ws_summary.cell(row=row_idx, column=col_idx, value=value)
-            if row_idx in [1, 7]:
-                cell.font = Font(bold=True, size=14)
-            if row_idx == 9:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.border = thin_border
-
-    # サマリーデータ
-    summary_rows = [
-        ['テーブル', len(diff.added_tables), len(diff.removed_tables), len(diff.modified_tables)],
-        ['ページ', len(diff.added_pages), len(diff.removed_pages), len(getattr(diff, 'modified_pages', []))],
-        ['サーバーコマンド', len(diff.added_server_commands), len(diff.removed_server_commands), len(diff.modified_server_commands)],
-    ]
-    for row_idx, row in enumerate(summary_rows, 10):
-        for col_idx, value in enumerate(row, 1):
-            cell = ws_summary.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            if col_idx == 2 and value > 0:
-                cell.fill = added_fill
-                cell.font = added_font
-            elif col_idx == 3 and value > 0:
-                cell.fill = removed_fill
-                cell.font = removed_font
-            elif col_idx == 4 and value > 0:
-                cell.fill = modified_fill
-                cell.font = modified_font
-
-    ws_summary.column_dimensions['A'].width = 20
-    ws_summary.column_dimensions['B'].width = 30
-    ws_summary.column_dimensions['C'].width = 10
-    ws_summary.column_dimensions['D'].width = 10
-
-    # =========================
-    # テーブル変更シート
-    # =========================
-    ws_tables = wb.create_sheet('テーブル変更')
-    table_headers = ['変更種別', 'テーブル名', 'フォルダ', '詳細']
-    for col_idx, header in enumerate(table_headers, 1):
-        cell = ws_tables.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = thin_border
-
-    row_idx = 2
-    # 追加テーブル
-    for t in diff.added_tables:
-        values = ['追加', t.name, t.folder or '-', f'カラム数: {len(t.columns)}']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_tables.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = added_fill
-            cell.font = added_font
-        row_idx += 1
-
-    # 削除テーブル
-    for t in diff.removed_tables:
-        values = ['削除', t.name, t.folder or '-', f'カラム数: {len(t.columns)}']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_tables.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = removed_fill
-            cell.font = removed_font
-        row_idx += 1
-
-    # 変更テーブル
-    for m in diff.modified_tables:
-        details = []
-        if m.get('added_columns'):
-            details.append(f"追加カラム: {', '.join(c.name for c in m['added_columns'])}")
-        if m.get('removed_columns'):
-            details.append(f"削除カラム: {', '.join(c.name for c in m['removed_columns'])}")
-        if m.get('modified_columns'):
-            for mc in m['modified_columns']:
-                details.append(f"{mc['name']}: {', '.join(mc['changes'])}")
-
-        values = ['変更', m['name'], m['old'].folder or '-', '; '.join(details) if details else '構造変更']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_tables.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = modified_fill
-            cell.font = modified_font
-        row_idx += 1
-
-    ws_tables.column_dimensions['A'].width = 10
-    ws_tables.column_dimensions['B'].width = 30
-    ws_tables.column_dimensions['C'].width = 20
-    ws_tables.column_dimensions['D'].width = 60
-
-    # =========================
-    # ページ変更シート
-    # =========================
-    ws_pages = wb.create_sheet('ページ変更')
-    page_headers = ['変更種別', 'ページ名', 'フォルダ', '詳細']
-    for col_idx, header in enumerate(page_headers, 1):
-        cell = ws_pages.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = thin_border
-
-    row_idx = 2
-    # 追加ページ
-    for p in diff.added_pages:
-        values = ['追加', p.name, p.folder or '-', f'ボタン: {len(p.buttons)}, 数式: {len(p.formulas)}']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_pages.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = added_fill
-            cell.font = added_font
-        row_idx += 1
-
-    # 削除ページ
-    for p in diff.removed_pages:
-        values = ['削除', p.name, p.folder or '-', f'ボタン: {len(p.buttons)}, 数式: {len(p.formulas)}']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_pages.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = removed_fill
-            cell.font = removed_font
-        row_idx += 1
-
-    # 変更ページ
-    for m in getattr(diff, 'modified_pages', []):
-        details = []
-        if m.get('added_buttons'):
-            details.append(f"追加ボタン: {len(m['added_buttons'])}個")
-        if m.get('removed_buttons'):
-            details.append(f"削除ボタン: {len(m['removed_buttons'])}個")
-        if m.get('added_formulas'):
-            details.append(f"追加数式: {len(m['added_formulas'])}個")
-        if m.get('removed_formulas'):
-            details.append(f"削除数式: {len(m['removed_formulas'])}個")
-
-        values = ['変更', m['name'], m['old'].folder or '-', '; '.join(details) if details else '内容変更']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_pages.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = modified_fill
-            cell.font = modified_font
-        row_idx += 1
-
-    ws_pages.column_dimensions['A'].width = 10
-    ws_pages.column_dimensions['B'].width = 40
-    ws_pages.column_dimensions['C'].width = 20
-    ws_pages.column_dimensions['D'].width = 50
-
-    # =========================
-    # サーバーコマンド変更シート
-    # =========================
-    ws_cmds = wb.create_sheet('サーバーコマンド変更')
-    cmd_headers = ['変更種別', 'コマンド名', 'フォルダ', '詳細']
-    for col_idx, header in enumerate(cmd_headers, 1):
-        cell = ws_cmds.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = thin_border
-
-    row_idx = 2
-    # 追加コマンド
-    for c in diff.added_server_commands:
-        values = ['追加', c.name, c.folder or '-', f'パラメータ: {len(c.parameters)}']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_cmds.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = added_fill
-            cell.font = added_font
-        row_idx += 1
-
-    # 削除コマンド
-    for c in diff.removed_server_commands:
-        values = ['削除', c.name, c.folder or '-', f'パラメータ: {len(c.parameters)}']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_cmds.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = removed_fill
-            cell.font = removed_font
-        row_idx += 1
-
-    # 変更コマンド
-    for m in diff.modified_server_commands:
-        details = []
-        if m.get('added_parameters'):
-            details.append(f"追加パラメータ: {', '.join(p.name for p in m['added_parameters'])}")
-        if m.get('removed_parameters'):
-            details.append(f"削除パラメータ: {', '.join(p.name for p in m['removed_parameters'])}")
-        if m.get('commands_changed'):
-            details.append("処理内容変更")
-
-        values = ['変更', m['name'], m['old'].folder or '-', '; '.join(details) if details else '内容変更']
-        for col_idx, value in enumerate(values, 1):
-            cell = ws_cmds.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            cell.fill = modified_fill
-            cell.font = modified_font
-        row_idx += 1
-
-    ws_cmds.column_dimensions['A'].width = 10
-    ws_cmds.column_dimensions['B'].width = 40
-    ws_cmds.column_dimensions['C'].width = 20
-    ws_cmds.column_dimensions['D'].width = 50
+    os.makedirs(output_dir, exist_ok=True)
+    wb = Workbook(write_only=True)
+    _register_diff_styles(wb)
+
+    # サマリーは先頭シートだが、件数が確定する最後に書き込む
+    ws_summary = wb.create_sheet('サマリー')
+    for letter, width in zip('ABCD', [20, 30, 10, 10]):
+        ws_summary.column_dimensions[letter].width = width
+
+    sheets = {}
+    for category, (title, name_header, _, widths) in DIFF_SHEETS.items():
+        ws = wb.create_sheet(title)
+        for letter, width in zip('ABCD', widths):
+            ws.column_dimensions[letter].width = width
+        ws.append(_styled_row(ws, ['変更種別', name_header, 'フォルダ', '詳細'], 'diff_header'))
+        sheets[category] = ws
+
+    counts = {(c, k): 0 for c in DIFF_SHEETS for k in DIFF_CHANGE_LABELS}
+    for rec in records:
+        check_cancelled(cancel_token)
+        ws = sheets[rec.category]
+        ws.append(_styled_row(
+            ws, [DIFF_CHANGE_LABELS[rec.change], rec.name, rec.folder or '-', rec.detail], f'diff_{rec.change}'))
+        counts[(rec.category, rec.change)] += 1
+
+    ws_summary.append([_styled_row(ws_summary, ['差分比較レポート'], 'diff_title')[0]])
+    ws_summary.append([])
+    ws_summary.append(['比較元（旧）', old_name])
+    ws_summary.append(['比較先（新）', new_name])
+    ws_summary.append(['生成日時', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+    ws_summary.append([])
+    ws_summary.append([_styled_row(ws_summary, ['変更サマリー'], 'diff_title')[0]])
+    ws_summary.append([])
+    ws_summary.append(_styled_row(ws_summary, ['カテゴリ', '追加', '削除', '変更'], 'diff_header'))
+    for category, (_, _, label, _) in DIFF_SHEETS.items():
+        row = [_styled_row(ws_summary, [label], 'diff_plain')[0]]
+        for change in DIFF_CHANGE_LABELS:
+            value = counts[(category, change)]
+            row.extend(_styled_row(ws_summary, [value], f'diff_{change}' if value > 0 else 'diff_plain'))
+        ws_summary.append(row)
 
     # 保存
     file_path = os.path.join(output_dir, f'差分比較_{old_name}_vs_{new_name}.xlsx')
-    wb.save(file_path)
+    save_atomically(file_path, wb.save)
     return file_path
+
+
+def generate_diff_excel(diff, old_name: str, new_name: str, output_dir: str,
+                        cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    差分比較結果をExcel形式で出力
+
+    Args:
+        diff: DiffResult、または DiffRecord のイテラブル
+        old_name: 比較元プロジェクト名
+        new_name: 比較先プロジェクト名
+        output_dir: 出力先フォルダ
+        cancel_token: キャンセルトークン
+    """
+    records = iter_diff_records(diff) if isinstance(diff, DiffResult) else diff
+    return write_diff_records(records, old_name, new_name, output_dir, cancel_token)
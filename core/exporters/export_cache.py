@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エクスポートキャッシュモジュール
+
+解析結果の内容ハッシュを計算し、出力ファイルと並べてサイドカーマニフェスト
+（<出力ファイル名>.manifest.json）に保存する。内容ハッシュ・エクスポーター
+バージョン・オプションがすべて一致し、出力ファイルが前回生成時のまま残っていれば
+再生成をスキップする。
+
+出力ファイル自体も一時パスに書き出してから置き換えるため、途中で失敗・キャンセル
+しても書きかけのファイルが残ることはない（前回の出力はそのまま残る）。
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Callable, Optional
+
+from core.logging_setup import logger
+
+
+# 出力形式を変更した場合はこのバージョンを上げてキャッシュを無効化する
+# 1.2.0: 静的解析の章・シート（パフォーマンス指摘〜未使用の定義）、ER図の続き分割、SVG図のPNGフォールバック
+EXPORTER_VERSION = "1.2.0"
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+# 書き込み中の一時ファイル・フォルダの接尾辞
+PARTIAL_SUFFIX = '.partial'
+
+
+# =============================================================================
+# 内容ハッシュ
+# =============================================================================
+def _feed(h, obj: Any) -> None:
+    """オブジェクトを型情報付きで順にハッシュへ投入（巨大な中間文字列を作らない）"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(b'D' + type(obj).__name__.encode())
+        for f in dataclasses.fields(obj):
+            h.update(b'F' + f.name.encode())
+            _feed(h, getattr(obj, f.name))
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'L%d' % len(obj))
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, dict):
+        h.update(b'M%d' % len(obj))
+        for key in sorted(obj, key=str):
+            _feed(h, str(key))
+            _feed(h, obj[key])
+    elif isinstance(obj, (set, frozenset)):
+        h.update(b'S%d' % len(obj))
+        for item in sorted(obj, key=repr):
+            _feed(h, item)
+    else:
+        h.update(b'V' + json.dumps(obj, ensure_ascii=False, default=str).encode('utf-8') + b'\x00')
+
+
+def compute_analysis_hash(analysis) -> str:
+    """解析結果の決定的な内容ハッシュ（SHA-256）を計算"""
+    h = hashlib.sha256()
+    _feed(h, analysis)
+    return h.hexdigest()
+
+
+# =============================================================================
+# サイドカーマニフェスト
+# =============================================================================
+def _manifest_path(file_path: str) -> str:
+    return file_path + MANIFEST_SUFFIX
+
+
+def _cache_key(content_hash: str, exporter: str, options: Optional[dict]) -> dict:
+    return {
+        'content_hash': content_hash,
+        'exporter': exporter,
+        'exporter_version': EXPORTER_VERSION,
+        'options': options or {},
+    }
+
+
+def is_export_current(file_path: str, content_hash: str, exporter: str, options: Optional[dict] = None) -> bool:
+    """
+    前回の出力が再利用できるかを判定
+
+    出力ファイルのサイズ・更新日時が記録と異なる場合（手動編集・削除）は再生成する。
+    """
+    try:
+        with open(_manifest_path(file_path), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return False
+
+    expected = _cache_key(content_hash, exporter, options)
+    if any(manifest.get(k) != v for k, v in expected.items()):
+        return False
+    return manifest.get('size') == stat.st_size and manifest.get('mtime_ns') == stat.st_mtime_ns
+
+
+def record_export(file_path: str, content_hash: str, exporter: str, options: Optional[dict] = None) -> None:
+    """出力完了後にマニフェストを書き込む（失敗しても出力自体は有効なので警告のみ）"""
+    try:
+        stat = os.stat(file_path)
+        manifest = _cache_key(content_hash, exporter, options)
+        manifest['size'] = stat.st_size
+        manifest['mtime_ns'] = stat.st_mtime_ns
+        tmp_path = _manifest_path(file_path) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, _manifest_path(file_path))
+    except OSError as e:
+        logger.warning(f"出力マニフェストの書き込みに失敗しました {file_path}: {e}")
+
+
+# =============================================================================
+# 出力ファイルの置き換え
+# =============================================================================
+def _remove_quietly(path: str) -> None:
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        logger.warning(f"一時出力の削除に失敗しました {path}: {e}")
+
+
+def save_atomically(file_path: str, save: Callable[[str], None]) -> None:
+    """
+    一時ファイルに保存してから出力ファイルを置き換える
+
+    Args:
+        file_path: 最終的な出力ファイルパス
+        save: 一時ファイルパスを受け取って書き込む関数（doc.save / wb.save など）
+    """
+    tmp_path = file_path + PARTIAL_SUFFIX
+    try:
+        save(tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+
+def build_directory_atomically(dir_path: str, build: Callable[[str], None]) -> None:
+    """
+    一時フォルダに出力を作成してからフォルダごと置き換える
+
+    os.replace はWindowsで既存フォルダを上書きできないため、旧フォルダを退避してから
+    入れ替え、入れ替え後に退避したフォルダを削除する。
+
+    Args:
+        dir_path: 最終的な出力フォルダ
+        build: 一時フォルダのパスを受け取って中身を書き出す関数
+    """
+    staging = dir_path + PARTIAL_SUFFIX
+    backup = dir_path + '.old'
+    _remove_quietly(staging)
+    _remove_quietly(backup)
+    try:
+        os.makedirs(staging)
+        build(staging)
+    except BaseException:
+        _remove_quietly(staging)
+        raise
+
+    if os.path.isdir(dir_path):
+        os.replace(dir_path, backup)
+    try:
+        os.replace(staging, dir_path)
+    except OSError:
+        # 入れ替えに失敗した場合は旧フォルダを戻す
+        if os.path.isdir(backup):
+            os.replace(backup, dir_path)
+        _remove_quietly(staging)
+        raise
+    _remove_quietly(backup)
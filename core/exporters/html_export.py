@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTMLレポートエクスポートモジュール
+
+解析結果を静的HTMLレポートとして出力する。
+index.html と、カテゴリ・フォルダ単位に分割したデータシャードで構成し、
+ブラウザ側で必要なシャードだけを遅延ロードする。
+
+file:// で開いた場合、ブラウザは fetch() によるJSON読み込みを禁止するため、
+シャードはJSONを1回のコールバック呼び出しで包んだ .js ファイルとして出力し、
+<script> タグで読み込む（サーバー不要・完全オフライン動作）。
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.cancellation import CancellationToken, check_cancelled
+from core.models import AnalysisResult, CommandInfo
+from core.exporters.er_diagram import partition_tables
+from core.exporters.svg_render import render_relation_svg, render_workflow_svg
+from core.exporters.export_cache import (
+    build_directory_atomically, compute_analysis_hash, is_export_current, record_export
+)
+from core.logging_setup import logger
+
+
+# =============================================================================
+# バージョン情報
+# =============================================================================
+APP_VERSION = "1.1.0"
+SUPPORTED_FORGUNCY_VERSIONS = ["9.x"]
+VERSION_INFO = f"v{APP_VERSION} (Forguncy {', '.join(SUPPORTED_FORGUNCY_VERSIONS)} 対応)"
+
+# 1シャードあたりの最大件数（巨大フォルダは複数シャードに分割）
+HTML_SHARD_SIZE = 500
+
+# カテゴリ定義（キー, 表示名）
+HTML_CATEGORIES = [
+    ('tables', 'テーブル'),
+    ('pages', '画面'),
+    ('server_commands', 'サーバーコマンド'),
+    ('workflows', 'ワークフロー'),
+]
+
+
+# =============================================================================
+# レコード変換
+# =============================================================================
+def _command_tree(commands: list) -> list:
+    """CommandInfoツリーを [説明, [子...]] 形式に変換"""
+    result = []
+    for cmd in commands:
+        if isinstance(cmd, CommandInfo):
+            result.append([cmd.description, _command_tree(cmd.sub_commands)])
+        else:
+            result.append([str(cmd), []])
+    return result
+
+
+def _table_record(t) -> dict:
+    return {
+        'name': t.name,
+        'folder': t.folder,
+        'pk': list(t.primary_key),
+        'columns': [[c.name, c.type, c.required, c.unique, c.default_value or '', c.description or '']
+                    for c in t.columns],
+        'relations': [[r.target_table, r.source_column, r.target_column, r.relation_type]
+                      for r in t.relations],
+        'workflow': bool(t.workflow),
+    }
+
+
+def _page_record(p) -> dict:
+    return {
+        'name': p.name,
+        'folder': p.folder,
+        'type': p.page_type,
+        'path': p.path,
+        'buttons': [{'name': b.name, 'cell': b.cell, 'commands': _command_tree(b.commands)} for b in p.buttons],
+        'formulas': [[f.cell, f.formula] for f in p.formulas],
+        'cell_commands': [{'cell': c.cell, 'event': c.event, 'commands': _command_tree(c.commands)}
+                          for c in p.cell_commands],
+    }
+
+
+def _server_command_record(c) -> dict:
+    return {
+        'name': c.name,
+        'folder': c.folder,
+        'path': c.path,
+        'parameters': [[p.name, p.type, p.required, p.default_value or ''] for p in c.parameters],
+        'commands': [x.description if isinstance(x, CommandInfo) else str(x) for x in c.commands],
+    }
+
+
+def _workflow_record(wf, folder: str, diagram: str) -> dict:
+    return {
+        'name': wf.table_name,
+        'folder': folder,
+        'diagram': diagram,
+        'states': [[s.name, s.is_initial, s.is_final] for s in wf.states],
+        'transitions': [{
+            'action': t.action,
+            'from': t.from_state,
+            'to': t.to_state,
+            'conditions': [c.expression or f'{c.field} {c.operator} {c.value}' for c in t.conditions],
+            'assignees': [f'{a.type}: {a.value}' for a in t.assignees],
+            'commands': _command_tree(t.commands),
+        } for t in wf.transitions],
+    }
+
+
+def _collect_records(analysis: AnalysisResult, workflow_diagrams: List[str]) -> Dict[str, List[dict]]:
+    """カテゴリ別のレコード一覧を作成"""
+    table_folders = {t.name: t.folder for t in analysis.tables}
+    return {
+        'tables': [_table_record(t) for t in analysis.tables],
+        'pages': [_page_record(p) for p in analysis.pages],
+        'server_commands': [_server_command_record(c) for c in analysis.server_commands],
+        'workflows': [_workflow_record(wf, table_folders.get(wf.table_name, ''), diagram)
+                      for wf, diagram in zip(analysis.workflows, workflow_diagrams)],
+    }
+
+
+def _write_diagrams(analysis: AnalysisResult, diagram_dir: str,
+                    cancel_token: Optional[CancellationToken] = None):
+    """ER図（クラスタ単位）と状態遷移図をSVGファイルとして書き出す"""
+    er_diagrams = []
+    for cluster in partition_tables(analysis.tables):
+        if not cluster.relation_count:
+            continue
+        check_cancelled(cancel_token)
+        file_name = f'er_{cluster.cluster_id}.svg'
+        with open(os.path.join(diagram_dir, file_name), 'w', encoding='utf-8') as f:
+            f.write(render_relation_svg(cluster.tables))
+        er_diagrams.append([f'{cluster.cluster_id}: {cluster.title}', f'diagrams/{file_name}'])
+
+    workflow_diagrams = []
+    for i, wf in enumerate(analysis.workflows, 1):
+        check_cancelled(cancel_token)
+        file_name = f'wf_{i}.svg'
+        with open(os.path.join(diagram_dir, file_name), 'w', encoding='utf-8') as f:
+            f.write(render_workflow_svg(wf))
+        workflow_diagrams.append(f'diagrams/{file_name}')
+    return er_diagrams, workflow_diagrams
+
+
+# =============================================================================
+# シャード出力
+# =============================================================================
+def _write_js_payload(path: str, callback: str, payload) -> None:
+    """JSONペイロードをコールバック呼び出しで包んで書き出す"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{callback}(')
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        f.write(');\n')
+
+
+def _write_shards(records: Dict[str, List[dict]], data_dir: str,
+                  cancel_token: Optional[CancellationToken] = None) -> dict:
+    """
+    カテゴリ・フォルダ単位にシャードを書き出し、マニフェストを返す
+
+    マニフェストには検索用の軽量インデックス（名前・フォルダ・シャード番号）のみを含め、
+    詳細データは各シャードに格納する。
+    """
+    manifest = {'categories': []}
+    shard_no = 0
+
+    for key, label in HTML_CATEGORIES:
+        by_folder: Dict[str, List[dict]] = {}
+        for rec in records[key]:
+            by_folder.setdefault(rec['folder'] or '(ルート)', []).append(rec)
+
+        folders = []
+        for folder in sorted(by_folder.keys()):
+            items = by_folder[folder]
+            index = []
+            for start in range(0, len(items), HTML_SHARD_SIZE):
+                check_cancelled(cancel_token)
+                chunk = items[start:start + HTML_SHARD_SIZE]
+                shard_id = f's{shard_no}'
+                shard_no += 1
+                _write_js_payload(os.path.join(data_dir, f'{shard_id}.js'), '__fiShard',
+                                  {'id': shard_id, 'items': chunk})
+                index.extend([rec['name'], shard_id, i] for i, rec in enumerate(chunk))
+            folders.append({'name': folder, 'count': len(items), 'index': index})
+
+        manifest['categories'].append({
+            'key': key,
+            'label': label,
+            'count': len(records[key]),
+            'folders': folders,
+        })
+
+    return manifest
+
+
+# =============================================================================
+# HTML出力
+# =============================================================================
+def generate_html_report(analysis: AnalysisResult, output_dir: str, use_cache: bool = True,
+                         cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    HTMLレポートを生成
+
+    レポートフォルダは一時フォルダに作成してから丸ごと置き換えるため、
+    キャンセル・失敗時は前回の出力がそのまま残る。
+
+    Args:
+        analysis: 解析結果
+        output_dir: 出力先フォルダ
+        use_cache: 解析内容が前回出力時と同一なら再生成をスキップする
+        cancel_token: キャンセルトークン（図・シャードの書き出しごとに確認する）
+
+    Returns:
+        str: index.html のパス
+
+    Raises:
+        OperationCancelled: キャンセルされた場合
+    """
+    report_dir = os.path.join(output_dir, f'{analysis.project_name}_仕様書_html')
+    file_path = os.path.join(report_dir, 'index.html')
+    content_hash = compute_analysis_hash(analysis)
+    if use_cache and is_export_current(file_path, content_hash, 'html'):
+        logger.info(f"HTML出力スキップ（解析内容に変更なし）: {file_path}")
+        return file_path
+
+    os.makedirs(output_dir, exist_ok=True)
+    build_directory_atomically(report_dir, lambda staging: _build_report(analysis, staging, cancel_token))
+    record_export(file_path, content_hash, 'html')
+    return file_path
+
+
+def _build_report(analysis: AnalysisResult, report_dir: str,
+                  cancel_token: Optional[CancellationToken]) -> None:
+    """レポートフォルダの中身（図・シャード・index.html）を書き出す"""
+    data_dir = os.path.join(report_dir, 'data')
+    diagram_dir = os.path.join(report_dir, 'diagrams')
+    for d in (data_dir, diagram_dir):
+        os.makedirs(d, exist_ok=True)
+
+    er_diagrams, workflow_diagrams = _write_diagrams(analysis, diagram_dir, cancel_token)
+    manifest = _write_shards(_collect_records(analysis, workflow_diagrams), data_dir, cancel_token)
+    manifest['er_diagrams'] = er_diagrams
+    manifest['project'] = analysis.project_name
+    manifest['generated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+    manifest['tool'] = f'Forguncy Insight {VERSION_INFO}'
+    manifest['summary'] = [
+        ['テーブル数', analysis.summary.table_count],
+        ['画面数', analysis.summary.page_count],
+        ['ワークフロー数', analysis.summary.workflow_count],
+        ['サーバーコマンド数', analysis.summary.server_command_count],
+        ['総カラム数', analysis.summary.total_columns],
+        ['リレーション数', analysis.summary.total_relations],
+    ]
+    check_cancelled(cancel_token)
+    _write_js_payload(os.path.join(data_dir, 'manifest.js'), '__fiManifest', manifest)
+
+    with open(os.path.join(report_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(_INDEX_HTML.replace('{{TITLE}}', _escape_html(analysis.project_name)))
+
+
+def _escape_html(s: str) -> str:
+    return (s.replace('&', '&amp;').replace('<', '&lt;')
+             .replace('>', '&gt;').replace('"', '&quot;'))
+
+
+# =============================================================================
+# index.html テンプレート
+# =============================================================================
+_INDEX_HTML = r"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>{{TITLE}} - 仕様書</title>
+<style>
+* { box-sizing: border-box; }
+body { margin: 0; font-family: "Yu Gothic UI", "Segoe UI", sans-serif; font-size: 13px; color: #1E293B; background: #F8FAFC; height: 100vh; display: flex; flex-direction: column; }
+header { background: #fff; border-bottom: 1px solid #E2E8F0; padding: 10px 16px; display: flex; align-items: center; gap: 16px; }
+header h1 { font-size: 18px; margin: 0; color: #3B82F6; }
+header .meta { color: #94A3B8; font-size: 11px; }
+header input { margin-left: auto; width: 320px; padding: 6px 10px; border: 1px solid #E2E8F0; border-radius: 4px; }
+main { flex: 1; display: flex; min-height: 0; }
+nav { width: 240px; overflow-y: auto; background: #fff; border-right: 1px solid #E2E8F0; }
+nav .cat { padding: 8px 12px; font-weight: bold; cursor: pointer; }
+nav .folder { padding: 4px 12px 4px 28px; cursor: pointer; color: #64748B; }
+nav .active { background: #DBEAFE; color: #2563EB; }
+nav .count { float: right; color: #94A3B8; font-weight: normal; }
+#list { width: 320px; overflow-y: auto; position: relative; background: #fff; border-right: 1px solid #E2E8F0; }
+#list .row { position: absolute; left: 0; right: 0; height: 28px; line-height: 28px; padding: 0 12px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; cursor: pointer; border-bottom: 1px solid #F1F5F9; }
+#list .row:hover { background: #F1F5F9; }
+#list .row.sel { background: #DBEAFE; }
+#list .row small { color: #94A3B8; margin-left: 6px; }
+#detail { flex: 1; overflow: auto; padding: 16px 24px; }
+#detail h2 { margin-top: 0; }
+#detail img { max-width: none; border: 1px solid #E2E8F0; }
+table.grid { border-collapse: collapse; margin: 8px 0 16px; }
+table.grid th { background: #4472C4; color: #fff; font-weight: bold; }
+table.grid th, table.grid td { border: 1px solid #CBD5E1; padding: 3px 8px; text-align: left; vertical-align: top; }
+ul.cmd { margin: 2px 0; padding-left: 18px; }
+code { font-family: Consolas, monospace; white-space: pre-wrap; }
+.muted { color: #94A3B8; }
+</style>
+</head>
+<body>
+<header>
+  <h1 id="title"></h1><span class="meta" id="meta"></span>
+  <input id="search" type="search" placeholder="名前で検索（全カテゴリ）">
+</header>
+<main>
+  <nav id="nav"></nav>
+  <div id="list"><div id="spacer"></div></div>
+  <div id="detail"></div>
+</main>
+<script>
+(function () {
+  var ROW_H = 28;
+  var manifest = null, shards = {}, waiting = {};
+  var view = [], selected = -1;
+  var listEl = document.getElementById('list'), spacer = document.getElementById('spacer');
+  var detailEl = document.getElementById('detail'), navEl = document.getElementById('nav');
+
+  window.__fiManifest = function (m) { manifest = m; init(); };
+  window.__fiShard = function (s) {
+    shards[s.id] = s.items;
+    (waiting[s.id] || []).forEach(function (cb) { cb(s.items); });
+    delete waiting[s.id];
+  };
+
+  function loadShard(id, cb) {
+    if (shards[id]) { cb(shards[id]); return; }
+    if (waiting[id]) { waiting[id].push(cb); return; }
+    waiting[id] = [cb];
+    var s = document.createElement('script');
+    s.src = 'data/' + id + '.js';
+    document.head.appendChild(s);
+  }
+
+  function esc(v) {
+    return String(v == null ? '' : v).replace(/[&<>"]/g, function (c) {
+      return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' }[c];
+    });
+  }
+  function grid(headers, rows) {
+    var h = '<table class="grid"><tr>' + headers.map(function (x) { return '<th>' + esc(x) + '</th>'; }).join('') + '</tr>';
+    rows.forEach(function (r) { h += '<tr>' + r.map(function (x) { return '<td>' + (x === true ? '○' : x === false ? '' : esc(x)) + '</td>'; }).join('') + '</tr>'; });
+    return h + '</table>';
+  }
+  function tree(cmds) {
+    if (!cmds.length) return '';
+    return '<ul class="cmd">' + cmds.map(function (c) { return '<li>' + esc(c[0]) + tree(c[1]) + '</li>'; }).join('') + '</ul>';
+  }
+
+  // ---- ナビゲーション ----
+  function init() {
+    document.title = manifest.project + ' - 仕様書';
+    document.getElementById('title').textContent = manifest.project;
+    document.getElementById('meta').textContent = manifest.generated + ' / ' + manifest.tool;
+    var h = '<div class="cat" data-k="summary">サマリー</div>';
+    if (manifest.er_diagrams.length) h += '<div class="cat" data-k="er">ER図<span class="count">' + manifest.er_diagrams.length + '</span></div>';
+    manifest.categories.forEach(function (c, ci) {
+      h += '<div class="cat" data-c="' + ci + '">' + esc(c.label) + '<span class="count">' + c.count + '</span></div>';
+      c.folders.forEach(function (f, fi) {
+        h += '<div class="folder" data-c="' + ci + '" data-f="' + fi + '">' + esc(f.name) + '<span class="count">' + f.count + '</span></div>';
+      });
+    });
+    navEl.innerHTML = h;
+    navEl.onclick = function (e) {
+      var el = e.target.closest('[data-c],[data-k]');
+      if (!el) return;
+      Array.prototype.forEach.call(navEl.querySelectorAll('.active'), function (x) { x.classList.remove('active'); });
+      el.classList.add('active');
+      document.getElementById('search').value = '';
+      if (el.dataset.k) { setView([]); if (el.dataset.k === 'er') showDiagrams(); else showSummary(); return; }
+      var cat = manifest.categories[+el.dataset.c];
+      var folders = el.dataset.f != null ? [cat.folders[+el.dataset.f]] : cat.folders;
+      setView(entries(cat, folders, null));
+    };
+    showSummary();
+  }
+
+  function entries(cat, folders, q) {
+    var out = [];
+    folders.forEach(function (f) {
+      f.index.forEach(function (e) {
+        if (!q || e[0].toLowerCase().indexOf(q) >= 0) out.push({ cat: cat, folder: f.name, name: e[0], shard: e[1], pos: e[2] });
+      });
+    });
+    return out;
+  }
+
+  function showSummary() {
+    detailEl.innerHTML = '<h2>' + esc(manifest.project) + '</h2>' + grid(['項目', '値'], manifest.summary);
+  }
+  function showDiagrams() {
+    detailEl.innerHTML = '<h2>ER図</h2>' + manifest.er_diagrams.map(function (d) {
+      return '<h3>' + esc(d[0]) + '</h3><img loading="lazy" src="' + esc(d[1]) + '" alt="' + esc(d[0]) + '">';
+    }).join('');
+  }
+
+  // ---- 仮想スクロール ----
+  function setView(v) {
+    view = v; selected = -1;
+    spacer.style.height = (view.length * ROW_H) + 'px';
+    listEl.scrollTop = 0;
+    render();
+  }
+  function render() {
+    Array.prototype.forEach.call(listEl.querySelectorAll('.row'), function (r) { r.remove(); });
+    var first = Math.max(0, Math.floor(listEl.scrollTop / ROW_H) - 5);
+    var last = Math.min(view.length, first + Math.ceil(listEl.clientHeight / ROW_H) + 10);
+    var frag = document.createDocumentFragment();
+    for (var i = first; i < last; i++) {
+      var d = document.createElement('div');
+      d.className = 'row' + (i === selected ? ' sel' : '');
+      d.style.top = (i * ROW_H) + 'px';
+      d.dataset.i = i;
+      d.innerHTML = esc(view[i].name) + '<small>' + esc(view[i].cat.label) + ' / ' + esc(view[i].folder) + '</small>';
+      frag.appendChild(d);
+    }
+    listEl.appendChild(frag);
+  }
+  var pending = false;
+  listEl.addEventListener('scroll', function () {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(function () { pending = false; render(); });
+  });
+  listEl.addEventListener('click', function (e) {
+    var r = e.target.closest('.row');
+    if (!r) return;
+    selected = +r.dataset.i; render();
+    var v = view[selected];
+    detailEl.innerHTML = '<p class="muted">読み込み中...</p>';
+    loadShard(v.shard, function (items) { showDetail(v.cat.key, items[v.pos]); });
+  });
+
+  // ---- 検索 ----
+  var timer = null;
+  document.getElementById('search').addEventListener('input', function (e) {
+    clearTimeout(timer);
+    var q = e.target.value.trim().toLowerCase();
+    timer = setTimeout(function () {
+      if (!q) { setView([]); return; }
+      var out = [];
+      manifest.categories.forEach(function (c) { out = out.concat(entries(c, c.folders, q)); });
+      setView(out);
+    }, 150);
+  });
+
+  // ---- 詳細表示 ----
+  function showDetail(key, r) {
+    var h = '<h2>' + esc(r.name) + '</h2><p class="muted">' + esc(r.folder || '(ルート)') + (r.path ? ' / ' + esc(r.path) : '') + '</p>';
+    if (key === 'tables') {
+      if (r.pk.length) h += '<p>主キー: ' + esc(r.pk.join(', ')) + '</p>';
+      h += grid(['カラム名', 'データ型', '必須', 'ユニーク', 'デフォルト値', '説明'], r.columns);
+      if (r.relations.length) h += '<h3>リレーション</h3>' + grid(['参照先テーブル', '元カラム', '先カラム', '種別'], r.relations);
+    } else if (key === 'pages') {
+      h += '<p>種別: ' + (r.type === 'masterPage' ? 'マスターページ' : 'ページ') + '</p>';
+      if (r.buttons.length) {
+        h += '<h3>ボタン</h3>';
+        r.buttons.forEach(function (b) { h += '<div><b>' + esc(b.name) + '</b> <span class="muted">' + esc(b.cell) + '</span>' + tree(b.commands) + '</div>'; });
+      }
+      if (r.cell_commands.length) {
+        h += '<h3>セルコマンド</h3>';
+        r.cell_commands.forEach(function (c) { h += '<div><b>' + esc(c.cell) + '</b> <span class="muted">' + esc(c.event) + '</span>' + tree(c.commands) + '</div>'; });
+      }
+      if (r.formulas.length) h += '<h3>数式</h3>' + grid(['セル', '数式'], r.formulas);
+    } else if (key === 'server_commands') {
+      if (r.parameters.length) h += '<h3>パラメータ</h3>' + grid(['パラメータ名', 'データ型', '必須', 'デフォルト値'], r.parameters);
+      h += '<h3>処理内容</h3><code>' + esc(r.commands.join('\n')) + '</code>';
+    } else if (key === 'workflows') {
+      h += '<h3>状態遷移図</h3><img src="' + esc(r.diagram) + '" alt="状態遷移図">';
+      h += '<h3>状態一覧</h3>' + grid(['状態名', '初期状態', '終了状態'], r.states);
+      h += '<h3>遷移一覧</h3>';
+      h += grid(['遷移名', '遷移元', '遷移先', '条件', '担当者'], r.transitions.map(function (t) {
+        return [t.action, t.from, t.to, t.conditions.join(', '), t.assignees.join(', ')];
+      }));
+      r.transitions.forEach(function (t) { if (t.commands.length) h += '<div><b>' + esc(t.action) + '</b>' + tree(t.commands) + '</div>'; });
+    }
+    detailEl.innerHTML = h;
+  }
+})();
+</script>
+<script src="data/manifest.js"></script>
+</body>
+</html>
+"""
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVG図のPNGフォールバック画像生成
+
+SVGを表示できないビューア（Word 2013以前、SVG非対応のLibreOffice、各種プレビュー）向けに、
+svg_render が出力する図形（矩形・直線・3次ベジェ曲線・矢印）を標準ライブラリだけでPNGに描画する。
+文字は描画しないため、図中の名前はSVG対応のビューア、または代替テキストで確認する。
+"""
+
+import math
+import re
+import struct
+import zlib
+from typing import List, Tuple
+
+
+# フォールバック画像の最大辺（ピクセル）。大きな図は縮小して描画する
+MAX_RASTER_SIZE = 1600
+
+_ELEMENT_RE = re.compile(r'<(rect|path)\s([^>]*?)/?>')
+_ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+_PATH_TOKEN_RE = re.compile(r'[MLCZmlcz]|-?\d+(?:\.\d+)?')
+_DEFS_RE = re.compile(r'<defs>.*?</defs>', re.DOTALL)
+_SIZE_RE = re.compile(r'width="(\d+)" height="(\d+)"')
+
+Color = Tuple[int, int, int]
+
+
+def _parse_color(value: str):
+    """'#RRGGBB' → (R, G, B)。塗りなし・未対応の指定は None"""
+    if value and re.fullmatch(r'#[0-9A-Fa-f]{6}', value):
+        return int(value[1:3], 16), int(value[3:5], 16), int(value[5:7], 16)
+    return None
+
+
+class _Canvas:
+    """RGB画素バッファ（白で初期化）"""
+
+    def __init__(self, width: int, height: int, scale: float):
+        self.width, self.height, self.scale = width, height, scale
+        self.pixels = bytearray(b'\xff' * (width * height * 3))
+
+    def fill_rect(self, x: float, y: float, w: float, h: float, color: Color):
+        x0, y0 = max(int(x * self.scale), 0), max(int(y * self.scale), 0)
+        x1, y1 = min(int(math.ceil((x + w) * self.scale)), self.width), min(int(math.ceil((y + h) * self.scale)), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        row = bytes(color) * (x1 - x0)
+        for py in range(y0, y1):
+            start = (py * self.width + x0) * 3
+            self.pixels[start:start + len(row)] = row
+
+    def line(self, x0: float, y0: float, x1: float, y1: float, color: Color, dash: bool = False):
+        s = self.scale
+        steps = max(int(max(abs(x1 - x0), abs(y1 - y0)) * s), 1)
+        for i in range(steps + 1):
+            if dash and (i // 4) % 2:
+                continue
+            px = int((x0 + (x1 - x0) * i / steps) * s)
+            py = int((y0 + (y1 - y0) * i / steps) * s)
+            if 0 <= px < self.width and 0 <= py < self.height:
+                offset = (py * self.width + px) * 3
+                self.pixels[offset:offset + 3] = bytes(color)
+
+    def to_png(self) -> bytes:
+        stride = self.width * 3
+        raw = b''.join(b'\x00' + bytes(self.pixels[y * stride:(y + 1) * stride]) for y in range(self.height))
+        return (b'\x89PNG\r\n\x1a\n'
+                + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0))
+                + _png_chunk(b'IDAT', zlib.compress(raw, 6))
+                + _png_chunk(b'IEND', b''))
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def _path_points(d: str) -> List[Tuple[float, float]]:
+    """パスデータ（M / L / C、絶対座標）を折れ線の点列に変換（曲線は分割して近似）"""
+    tokens = _PATH_TOKEN_RE.findall(d)
+    points: List[Tuple[float, float]] = []
+    command, i = 'M', 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i].upper()
+            i += 1
+            continue
+        if command in ('M', 'L') and i + 1 < len(tokens):
+            points.append((float(tokens[i]), float(tokens[i + 1])))
+            i += 2
+        elif command == 'C' and i + 5 < len(tokens) and points:
+            x0, y0 = points[-1]
+            x1, y1, x2, y2, x3, y3 = (float(v) for v in tokens[i:i + 6])
+            for step in range(1, 17):
+                t = step / 16
+                u = 1 - t
+                points.append((u ** 3 * x0 + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t ** 3 * x3,
+                               u ** 3 * y0 + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t ** 3 * y3))
+            i += 6
+        else:
+            i += 1
+    return points
+
+
+def _draw_arrow_head(canvas: _Canvas, points: List[Tuple[float, float]], color: Color):
+    (x0, y0), (x1, y1) = points[-2], points[-1]
+    angle = math.atan2(y1 - y0, x1 - x0)
+    for side in (-0.45, 0.45):
+        canvas.line(x1, y1, x1 - 8 * math.cos(angle + side), y1 - 8 * math.sin(angle + side), color)
+
+
+def rasterize_svg(svg: str, max_size: int = MAX_RASTER_SIZE) -> bytes:
+    """
+    svg_render の出力SVGをPNGに描画
+
+    Args:
+        svg: render_relation_svg / render_workflow_svg / render_navigation_svg の出力
+        max_size: 画像の最大辺（ピクセル）
+
+    Returns:
+        bytes: PNGデータ（矩形・線・矢印のみ。文字は含まない）
+    """
+    match = _SIZE_RE.search(svg)
+    width, height = (int(match.group(1)), int(match.group(2))) if match else (800, 600)
+    scale = min(max_size / max(width, height, 1), 1.0)
+    canvas = _Canvas(max(int(width * scale), 1), max(int(height * scale), 1), scale)
+
+    for element, attr_text in _ELEMENT_RE.findall(_DEFS_RE.sub('', svg)):
+        attrs = dict(_ATTR_RE.findall(attr_text))
+        fill, stroke = _parse_color(attrs.get('fill', '')), _parse_color(attrs.get('stroke', ''))
+        dash = 'stroke-dasharray' in attrs
+        if element == 'rect':
+            x, y = float(attrs.get('x', 0)), float(attrs.get('y', 0))
+            w, h = float(attrs.get('width', 0)), float(attrs.get('height', 0))
+            if fill:
+                canvas.fill_rect(x, y, w, h, fill)
+            if stroke:
+                for x0, y0, x1, y1 in ((x, y, x + w, y), (x, y + h, x + w, y + h), (x, y, x, y + h), (x + w, y, x + w, y + h)):
+                    canvas.line(x0, y0, x1, y1, stroke, dash)
+        elif stroke:
+            points = _path_points(attrs.get('d', ''))
+            for (x0, y0), (x1, y1) in zip(points, points[1:]):
+                canvas.line(x0, y0, x1, y1, stroke, dash)
+            if 'marker-end' in attrs and len(points) >= 2:
+                _draw_arrow_head(canvas, points, stroke)
+    return canvas.to_png()
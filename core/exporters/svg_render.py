@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVG図描画モジュール
+
+graph_layout の階層型レイアウトを用いて、テーブルのリレーショングラフ（ER図）、
+ワークフローの状態遷移図、画面遷移図をSVGとして描画する。外部ライブラリ・外部サービスは不要。
+"""
+
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+from core.exporters.graph_layout import GraphLayout, estimate_text_width, layered_layout
+from core.models import NavigationGraph, WorkflowInfo
+
+
+FONT_FAMILY = "Yu Gothic UI, Meiryo, sans-serif"
+FONT_SIZE = 12
+
+# 配色（Word/Excel出力のヘッダー色に合わせる）
+SVG_COLORS = {
+    'node_fill': '#FFFFFF',
+    'node_stroke': '#4472C4',
+    'header_fill': '#4472C4',
+    'edge': '#64748B',
+    'text': '#1E293B',
+    'muted': '#64748B',
+    'initial_fill': '#C6EFCE',
+    'final_fill': '#E2E8F0',
+}
+
+
+# =============================================================================
+# 描画ヘルパー
+# =============================================================================
+def _svg_open(layout: GraphLayout) -> List[str]:
+    w, h = int(layout.width), int(layout.height)
+    return [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}" '
+        f'font-family="{FONT_FAMILY}" font-size="{FONT_SIZE}">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="7" markerHeight="7" '
+        f'orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{SVG_COLORS["edge"]}"/></marker></defs>',
+        f'<rect width="{w}" height="{h}" fill="#FFFFFF"/>',
+    ]
+
+
+def _edge_path(layout: GraphLayout, source, target, bend: float = 0) -> Tuple[str, float, float]:
+    """2ノード間の曲線パスとラベル位置を返す"""
+    a, b = layout.nodes[source], layout.nodes[target]
+    x1 = a.x + a.width / 2 + bend
+    x2 = b.x + b.width / 2 + bend
+    if a.layer < b.layer:
+        y1, y2 = a.y + a.height, b.y
+    elif a.layer > b.layer:
+        y1, y2 = a.y, b.y + b.height
+    else:
+        y1 = y2 = a.y + a.height
+    dy = (y2 - y1) / 2 if y1 != y2 else 40
+    d = f'M{x1:.1f},{y1:.1f} C{x1:.1f},{y1 + dy:.1f} {x2:.1f},{y2 - dy:.1f} {x2:.1f},{y2:.1f}'
+    return d, (x1 + x2) / 2, (y1 + y2) / 2 + (dy / 2 if y1 == y2 else 0)
+
+
+# =============================================================================
+# ER図（リレーショングラフ）
+# =============================================================================
+def render_relation_svg(tables: list) -> str:
+    """
+    テーブルのリレーショングラフをSVGで描画
+
+    リレーション先が解析対象外のテーブルは破線の枠で表示する。
+    """
+    defined = {t.name for t in tables}
+    nodes = [t.name for t in tables]
+    edges = []
+    labels: Dict[str, str] = {t.name: f'{len(t.columns)}列' for t in tables}
+    for t in tables:
+        for rel in t.relations:
+            if rel.target_table not in defined and rel.target_table not in labels:
+                nodes.append(rel.target_table)
+                labels[rel.target_table] = '(対象外)'
+            edges.append((t.name, rel.target_table))
+
+    widths = {n: estimate_text_width(n) + 24 for n in nodes}
+    layout = layered_layout(nodes, edges, widths, node_height=40)
+
+    parts = _svg_open(layout)
+    for source, target in edges:
+        if source == target:
+            continue
+        d, _, _ = _edge_path(layout, source, target)
+        parts.append(f'<path d="{d}" fill="none" stroke="{SVG_COLORS["edge"]}" marker-end="url(#arrow)"/>')
+
+    for name in nodes:
+        box = layout.nodes[name]
+        dash = '' if name in defined else ' stroke-dasharray="4 3"'
+        parts.append(
+            f'<g><title>{escape(name)}</title>'
+            f'<rect x="{box.x:.1f}" y="{box.y:.1f}" width="{box.width:.1f}" height="{box.height:.1f}" rx="3" '
+            f'fill="{SVG_COLORS["node_fill"]}" stroke="{SVG_COLORS["node_stroke"]}"{dash}/>'
+            f'<rect x="{box.x:.1f}" y="{box.y:.1f}" width="{box.width:.1f}" height="4" fill="{SVG_COLORS["header_fill"]}"/>'
+            f'<text x="{box.x + box.width / 2:.1f}" y="{box.y + 19:.1f}" text-anchor="middle" '
+            f'fill="{SVG_COLORS["text"]}" font-weight="bold">{escape(name)}</text>'
+            f'<text x="{box.x + box.width / 2:.1f}" y="{box.y + 33:.1f}" text-anchor="middle" '
+            f'fill="{SVG_COLORS["muted"]}" font-size="10">{escape(labels[name])}</text></g>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+# =============================================================================
+# ワークフロー状態遷移図
+# =============================================================================
+def render_workflow_svg(workflow: WorkflowInfo) -> str:
+    """
+    ワークフローの状態遷移図をSVGで描画
+
+    初期状態を先頭に置いて上位に配置し、遷移名をエッジのラベルとして表示する。
+    """
+    states = {s.name: s for s in workflow.states}
+    ordered = [s.name for s in workflow.states if s.is_initial] + [s.name for s in workflow.states if not s.is_initial]
+    for t in workflow.transitions:
+        for name in (t.from_state, t.to_state):
+            if name not in states and name not in ordered:
+                ordered.append(name)
+
+    edges = [(t.from_state, t.to_state) for t in workflow.transitions]
+    widths = {n: estimate_text_width(n or '(未設定)') + 32 for n in ordered}
+    layout = layered_layout(ordered, edges, widths)
+
+    parts = _svg_open(layout)
+    seen_pairs: Dict[Tuple[str, str], int] = {}
+    for t in workflow.transitions:
+        if t.from_state not in layout.nodes or t.to_state not in layout.nodes:
+            continue
+        key = (t.from_state, t.to_state)
+        offset = seen_pairs.get(key, 0)
+        seen_pairs[key] = offset + 1
+        bend = offset * 14
+        if t.from_state == t.to_state:
+            box = layout.nodes[t.from_state]
+            x, y = box.x + box.width, box.y + box.height / 2
+            d = f'M{x:.1f},{y - 8:.1f} C{x + 40 + bend:.1f},{y - 30:.1f} {x + 40 + bend:.1f},{y + 30:.1f} {x:.1f},{y + 8:.1f}'
+            lx, ly = x + 44 + bend, y
+        else:
+            # 上向き（差し戻し）の遷移は下向きと重ならないよう右にずらす
+            if layout.nodes[t.from_state].layer > layout.nodes[t.to_state].layer:
+                bend += 18
+            d, lx, ly = _edge_path(layout, t.from_state, t.to_state, bend)
+        parts.append(f'<path d="{d}" fill="none" stroke="{SVG_COLORS["edge"]}" marker-end="url(#arrow)"/>')
+        if t.action:
+            parts.append(
+                f'<text x="{lx + 4:.1f}" y="{ly + 4 + offset * 12:.1f}" fill="{SVG_COLORS["muted"]}" '
+                f'font-size="10">{escape(t.action)}</text>'
+            )
+
+    for name in ordered:
+        box = layout.nodes[name]
+        state = states.get(name)
+        fill = SVG_COLORS['node_fill']
+        stroke_width = 1
+        if state and state.is_initial:
+            fill = SVG_COLORS['initial_fill']
+        elif state and state.is_final:
+            fill = SVG_COLORS['final_fill']
+            stroke_width = 2
+        parts.append(
+            f'<g><rect x="{box.x:.1f}" y="{box.y:.1f}" width="{box.width:.1f}" height="{box.height:.1f}" '
+            f'rx="{box.height / 2:.1f}" fill="{fill}" stroke="{SVG_COLORS["node_stroke"]}" stroke-width="{stroke_width}"/>'
+            f'<text x="{box.x + box.width / 2:.1f}" y="{box.y + box.height / 2 + 4:.1f}" text-anchor="middle" '
+            f'fill="{SVG_COLORS["text"]}">{escape(name or "(未設定)")}</text></g>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+# =============================================================================
+# 画面遷移図
+# =============================================================================
+# 図に載せる画面数の上限（超える場合は遷移の多い画面を優先）
+MAX_NAVIGATION_DIAGRAM_PAGES = 80
+
+
+def render_navigation_svg(navigation: NavigationGraph, max_pages: int = MAX_NAVIGATION_DIAGRAM_PAGES) -> str:
+    """
+    画面遷移図をSVGで描画
+
+    孤立画面（入口）を緑で塗って上位に配置する。マスターページ経由の遷移は破線で表示する。
+    """
+    degree: Dict[str, int] = {}
+    for source, target, _ in navigation.links:
+        degree[source] = degree.get(source, 0) + 1
+        degree[target] = degree.get(target, 0) + 1
+    orphans = set(navigation.orphan_pages)
+    candidates = list(dict.fromkeys(list(navigation.orphan_pages) + sorted(degree, key=lambda n: (-degree[n], n))))
+    nodes = [n for n in candidates if n in degree][:max_pages]
+    shown = set(nodes)
+    links = [(s, t, via) for s, t, via in navigation.links if s in shown and t in shown]
+
+    widths = {n: estimate_text_width(n) + 24 for n in nodes}
+    layout = layered_layout(nodes, [(s, t) for s, t, _ in links], widths)
+
+    parts = _svg_open(layout)
+    for source, target, via in links:
+        d, _, _ = _edge_path(layout, source, target, 9 if via else 0)
+        dash = ' stroke-dasharray="4 3"' if via else ''
+        parts.append(f'<path d="{d}" fill="none" stroke="{SVG_COLORS["edge"]}"{dash} marker-end="url(#arrow)"/>')
+
+    for name in nodes:
+        box = layout.nodes[name]
+        fill = SVG_COLORS['initial_fill'] if name in orphans else SVG_COLORS['node_fill']
+        parts.append(
+            f'<g><title>{escape(name)}</title>'
+            f'<rect x="{box.x:.1f}" y="{box.y:.1f}" width="{box.width:.1f}" height="{box.height:.1f}" rx="3" '
+            f'fill="{fill}" stroke="{SVG_COLORS["node_stroke"]}"/>'
+            f'<text x="{box.x + box.width / 2:.1f}" y="{box.y + box.height / 2 + 4:.1f}" text-anchor="middle" '
+            f'fill="{SVG_COLORS["text"]}">{escape(name)}</text></g>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
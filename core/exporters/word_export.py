@@ -6,18 +6,29 @@ Word仕様書エクスポートモジュール
 詳細仕様書をWord形式で出力する。
 """
 
+import io
 import os
 import re
 from datetime import datetime
+from typing import Optional
 
 from docx import Document
-from docx.shared import Pt
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.part import Part
+from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml import OxmlElement, parse_xml
 from docx.shared import RGBColor
 
+from core.analysis import ARTIFACT_KIND_LABELS, ROOT_KIND_LABELS, SEVERITY_LABELS, format_command_path
+from core.cancellation import CancellationToken, check_cancelled
 from core.models import AnalysisResult, CommandInfo
+from core.exporters.er_diagram import partition_tables
+from core.exporters.svg_raster import rasterize_svg
+from core.exporters.svg_render import render_navigation_svg, render_relation_svg, render_workflow_svg
+from core.exporters.export_cache import compute_analysis_hash, is_export_current, record_export, save_atomically
+from core.logging_setup import logger
 
 
 # =============================================================================
@@ -27,6 +38,10 @@ APP_VERSION = "1.1.0"
 SUPPORTED_FORGUNCY_VERSIONS = ["9.x"]
 VERSION_INFO = f"v{APP_VERSION} (Forguncy {', '.join(SUPPORTED_FORGUNCY_VERSIONS)} 対応)"
 
+# 静的解析セクションで表に載せる最大件数（全件はExcelに出力）
+WORD_MAX_FINDING_ROWS = 200
+WORD_MAX_HEAVY_PAGES = 30
+
 
 # =============================================================================
 # ヘルパー関数
@@ -73,12 +88,131 @@ def _set_table_header_style(table, header_row_idx=0):
                 run.font.color.rgb = RGBColor(255, 255, 255)
 
 
+def _add_grid_table(doc, headers: list, rows: list):
+    """見出し行付きの表を追加"""
+    table = doc.add_table(rows=len(rows) + 1, cols=len(headers))
+    table.style = 'Table Grid'
+    for j, h in enumerate(headers):
+        table.rows[0].cells[j].text = h
+    _set_table_header_style(table, 0)
+    for i, values in enumerate(rows, 1):
+        cells = table.rows[i].cells
+        for j, value in enumerate(values):
+            cells[j].text = str(value)
+    return table
+
+
+def _format_cell_types(cell_types: dict, limit: int = 5) -> str:
+    """セル型の個数を多い順に 'Type×n' 形式で並べる"""
+    items = sorted(cell_types.items(), key=lambda kv: (-kv[1], kv[0]))
+    text = ', '.join(f'{name}×{count}' for name, count in items[:limit])
+    if len(items) > limit:
+        text += f' 他{len(items) - limit}種'
+    return text or '-'
+
+
+def _add_workflow_analytics(doc, wa):
+    """ワークフローの状態遷移分析（到達性・行き止まり・循環・重い遷移）を出力"""
+    doc.add_paragraph()
+    doc.add_paragraph('■ 状態遷移の分析')
+    _add_grid_table(doc, ['項目', '状態'], [
+        ('初期状態', ', '.join(wa.initial_states) or '-'),
+        ('到達可能な状態', f'{len(wa.reachable_states)}件'),
+        ('到達できない状態', ', '.join(wa.unreachable_states) or 'なし'),
+        ('行き止まりの状態', ', '.join(wa.dead_end_states) or 'なし'),
+        ('未定義の状態への遷移', ', '.join(wa.undefined_states) or 'なし'),
+        ('循環', ' / '.join(' ⇄ '.join(c) for c in wa.cycles) or 'なし'),
+    ])
+    if wa.heavy_transitions:
+        doc.add_paragraph()
+        doc.add_paragraph('■ 重い処理を含む遷移')
+        _add_grid_table(doc, ['遷移名', '遷移元', '遷移先', 'コスト', 'SQL', '更新', 'メール', '呼出', 'ループ深さ'], [
+            (h.action, h.from_state, h.to_state, h.cost, h.sql_count, h.write_count, h.email_count,
+             h.call_count, h.max_loop_depth)
+            for h in wa.heavy_transitions
+        ])
+
+
+def _add_truncation_note(doc, total: int, shown: int):
+    if total > shown:
+        doc.add_paragraph(f'※ 上位 {shown} 件を表示しています（全 {total} 件はExcel仕様書を参照）')
+
+
+def _diagram_alt_text(title: str, names: list, max_chars: int = 1000) -> str:
+    """図の代替テキスト（図の種類と含まれる名前）"""
+    text = f"{title}: {', '.join(names)}"
+    return text if len(text) <= max_chars else text[:max_chars - 3] + '...'
+
+
+def _add_svg_picture(doc, svg: str, max_width: float = 6.3, max_height: float = 8.5, alt_text: str = ''):
+    """
+    SVG画像を段落として埋め込む
+
+    Word 2016以降はsvgBlip拡張でSVGをそのまま表示する。
+    python-docxはSVGを直接扱えないため、フォールバックPNG（図形のみを描画）を配置してから
+    SVGパートを追加し、blip要素に拡張参照を付与する。SVG非対応のビューアでは
+    フォールバックPNGが表示されるため、図中の名前は代替テキストと図の下の注記で補う。
+    """
+    match = re.search(r'width="(\d+)" height="(\d+)"', svg)
+    px_w, px_h = (int(match.group(1)), int(match.group(2))) if match else (800, 600)
+    scale = min(max_width / (px_w / 96), max_height / (px_h / 96), 1.0)
+    width, height = Inches(px_w / 96 * scale), Inches(px_h / 96 * scale)
+
+    run = doc.add_paragraph().add_run()
+    inline_shape = run.add_picture(io.BytesIO(rasterize_svg(svg)), width=width, height=height)
+    if alt_text:
+        inline_shape._inline.docPr.set('descr', alt_text)
+
+    package = doc.part.package
+    partname = package.next_partname('/word/media/diagram%d.svg')
+    svg_part = Part(partname, 'image/svg+xml', svg.encode('utf-8'), package)
+    r_id = doc.part.relate_to(svg_part, RT.IMAGE)
+
+    blip = inline_shape._inline.graphic.graphicData.pic.blipFill.blip
+    ext_lst = OxmlElement('a:extLst')
+    ext = OxmlElement('a:ext')
+    ext.set('uri', '{96DAC541-7B7A-43D3-8B79-37D633B846F1}')
+    svg_blip = parse_xml(
+        f'<asvg:svgBlip xmlns:asvg="http://schemas.microsoft.com/office/drawing/2016/SVG/main" '
+        f'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" r:embed="{r_id}"/>'
+    )
+    ext.append(svg_blip)
+    ext_lst.append(ext)
+    blip.append(ext_lst)
+
+    note = doc.add_paragraph('※ 図中の名前はSVG対応のビューア（Word 2016以降など）で表示されます。')
+    note.runs[0].font.size = Pt(8)
+    note.runs[0].font.color.rgb = RGBColor(0x64, 0x74, 0x8B)
+    return inline_shape
+
+
 # =============================================================================
 # Word仕様書生成
 # =============================================================================
-def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
-    """詳細仕様書ドキュメントを生成"""
+def generate_spec_document(analysis: AnalysisResult, output_dir: str, use_cache: bool = True,
+                           cancel_token: Optional[CancellationToken] = None) -> str:
+    """
+    詳細仕様書ドキュメントを生成
+
+    Args:
+        analysis: 解析結果
+        output_dir: 出力先フォルダ
+        use_cache: 解析内容が前回出力時と同一なら再生成をスキップする
+        cancel_token: キャンセルトークン（セクション・項目ごとに確認する）
+
+    Returns:
+        str: 出力ファイルパス
+
+    Raises:
+        OperationCancelled: キャンセルされた場合（出力ファイルは書き換えない）
+    """
     os.makedirs(output_dir, exist_ok=True)
+    file_path = os.path.join(output_dir, f'{analysis.project_name}_詳細仕様書.docx')
+    content_hash = compute_analysis_hash(analysis)
+    if use_cache and is_export_current(file_path, content_hash, 'word'):
+        logger.info(f"Word出力スキップ（解析内容に変更なし）: {file_path}")
+        return file_path
+
     doc = Document()
 
     # スタイル設定
@@ -103,6 +237,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
     doc.add_page_break()
 
     # ================== 目次 ==================
+    check_cancelled(cancel_token)
     doc.add_heading('目次', 1)
     toc_items = [
         '1. システム概要',
@@ -125,6 +260,25 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
     pages_with_buttons = [p for p in analysis.pages if p.buttons]
     if pages_with_buttons:
         toc_items.append('6. ボタン・コマンド詳細')
+    if analysis.perf_findings:
+        toc_items.append('7. パフォーマンス指摘（ループ内のデータアクセス）')
+    if analysis.index_recommendations:
+        toc_items.append('8. インデックス推奨')
+    if analysis.hot_paths:
+        toc_items.append('9. 高コスト処理')
+    heavy_pages = sorted((p for p in analysis.pages if p.page_type == 'page' and p.metrics.total_weight > 0),
+                         key=lambda p: (-p.metrics.total_weight, p.name))
+    if heavy_pages:
+        toc_items.append('10. ページ負荷')
+    if analysis.formula_reports:
+        toc_items.append('11. 数式の依存関係')
+    if analysis.table_pressure:
+        toc_items.append('12. テーブルの読み書き集中')
+    nav = analysis.navigation
+    if nav.links or nav.broken_links or nav.orphan_pages:
+        toc_items.append('13. 画面遷移')
+    if analysis.unused_artifacts:
+        toc_items.append('14. 未使用の定義')
 
     for item in toc_items:
         doc.add_paragraph(item)
@@ -132,6 +286,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
     doc.add_page_break()
 
     # ================== 1. システム概要 ==================
+    check_cancelled(cancel_token)
     doc.add_heading('1. システム概要', 1)
     doc.add_paragraph('本ドキュメントは Forguncy プロジェクトの詳細システム仕様書です。')
 
@@ -157,6 +312,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
     doc.add_page_break()
 
     # ================== 2. 画面一覧 ==================
+    check_cancelled(cancel_token)
     doc.add_heading('2. 画面一覧', 1)
 
     # フォルダ別にグループ化
@@ -190,6 +346,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
     doc.add_page_break()
 
     # ================== 3. テーブル定義 ==================
+    check_cancelled(cancel_token)
     doc.add_heading('3. テーブル定義', 1)
 
     # フォルダ別にグループ化
@@ -207,6 +364,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
         doc.add_heading(f'3.{table_section_num} {folder}', 2)
 
         for table in folder_tables:
+            check_cancelled(cancel_token)
             doc.add_heading(f'3.{table_section_num}.{table_detail_num} {table.name}', 3)
 
             # テーブル概要
@@ -240,14 +398,27 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
         table_section_num += 1
         table_detail_num = 1
 
+    # ER図（リレーションを持つクラスタごとに1枚）
+    er_clusters = [c for c in partition_tables(analysis.tables) if c.relation_count]
+    if er_clusters:
+        doc.add_heading(f'3.{table_section_num} ER図', 2)
+        for cluster in er_clusters:
+            check_cancelled(cancel_token)
+            doc.add_paragraph(f'■ {cluster.cluster_id}: {cluster.title}')
+            _add_svg_picture(doc, render_relation_svg(cluster.tables),
+                             alt_text=_diagram_alt_text('ER図', [t.name for t in cluster.tables]))
+
     doc.add_page_break()
 
     # ================== 4. ワークフロー定義 ==================
+    check_cancelled(cancel_token)
     if analysis.workflows:
         doc.add_heading('4. ワークフロー定義', 1)
         doc.add_paragraph('本システムで定義されているワークフローの詳細を以下に示します。')
+        workflow_analytics = {w.table_name: w for w in analysis.workflow_analytics}
 
         for idx, wf in enumerate(analysis.workflows, 1):
+            check_cancelled(cancel_token)
             doc.add_heading(f'4.{idx} {wf.table_name}', 2)
 
             if wf.states:
@@ -281,6 +452,16 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
                     trans_table.rows[i + 1].cells[2].text = t.from_state
                     trans_table.rows[i + 1].cells[3].text = t.to_state
 
+            if wf.states or wf.transitions:
+                doc.add_paragraph()
+                doc.add_paragraph('■ 状態遷移図')
+                _add_svg_picture(doc, render_workflow_svg(wf),
+                                 alt_text=_diagram_alt_text(f'{wf.table_name} の状態遷移図', [st.name for st in wf.states]))
+
+            wa = workflow_analytics.get(wf.table_name)
+            if wa is not None and (wf.states or wf.transitions):
+                _add_workflow_analytics(doc, wa)
+
         doc.add_page_break()
     else:
         doc.add_heading('4. ワークフロー定義', 1)
@@ -288,6 +469,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
         doc.add_page_break()
 
     # ================== 5. サーバーコマンド ==================
+    check_cancelled(cancel_token)
     if analysis.server_commands:
         doc.add_heading('5. サーバーコマンド', 1)
         doc.add_paragraph('サーバー側で実行されるコマンドの一覧と詳細を以下に示します。')
@@ -308,6 +490,7 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
 
         # 各コマンドの詳細
         for idx, cmd in enumerate(analysis.server_commands, 1):
+            check_cancelled(cancel_token)
             doc.add_heading(f'5.{idx} {cmd.name}', 2)
 
             if cmd.parameters:
@@ -341,12 +524,14 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
         doc.add_page_break()
 
     # ================== 6. ボタン・コマンド詳細 ==================
+    check_cancelled(cancel_token)
     pages_with_buttons = [p for p in analysis.pages if p.buttons]
     if pages_with_buttons:
         doc.add_heading('6. ボタン・コマンド詳細', 1)
         doc.add_paragraph('各画面のボタンに設定されているコマンドの詳細を以下に示します。')
 
         for idx, page in enumerate(pages_with_buttons, 1):
+            check_cancelled(cancel_token)
             doc.add_heading(f'6.{idx} {page.name}', 2)
 
             btn_table = doc.add_table(rows=len(page.buttons) + 1, cols=3)
@@ -369,7 +554,177 @@ def generate_spec_document(analysis: AnalysisResult, output_dir: str) -> str:
             if len(page.buttons) > 20:
                 doc.add_paragraph(f'※ 画面内に {len(page.buttons)} 個のボタンがあります')
 
-    # 保存
-    file_path = os.path.join(output_dir, f'{analysis.project_name}_詳細仕様書.docx')
-    doc.save(file_path)
+        doc.add_page_break()
+
+    # ================== 7. パフォーマンス指摘 ==================
+    check_cancelled(cancel_token)
+    if analysis.perf_findings:
+        findings = analysis.perf_findings
+        doc.add_heading('7. パフォーマンス指摘（ループ内のデータアクセス）', 1)
+        doc.add_paragraph(
+            'ループの中でSQL実行・テーブル更新を行っている箇所です（N+1 クエリ）。'
+            'ループの回数だけデータベースへのアクセスが発生するため、一括処理への置き換えを検討してください。'
+            'サーバーコマンド呼出を経由する場合は、呼出先のコマンドまで含めたパスを示します。'
+        )
+        shown = findings[:WORD_MAX_FINDING_ROWS]
+        _add_grid_table(doc, ['No.', '重要度', '場所', 'ループ深さ', '処理パス'], [
+            (i, SEVERITY_LABELS.get(f.severity, f.severity), f.location, f.loop_depth,
+             format_command_path(f.path))
+            for i, f in enumerate(shown, 1)
+        ])
+        _add_truncation_note(doc, len(findings), len(shown))
+
+        doc.add_page_break()
+
+    # ================== 8. インデックス推奨 ==================
+    check_cancelled(cancel_token)
+    if analysis.index_recommendations:
+        doc.add_heading('8. インデックス推奨', 1)
+        doc.add_paragraph(
+            'SQL実行コマンドの検索条件（WHERE）・結合条件（JOIN）・並び順（ORDER BY / GROUP BY）で'
+            '使われているカラムのうち、主キー・一意制約のないものを、使用コマンド数と実行されるページ数で'
+            '順位付けしています。'
+        )
+        _add_grid_table(doc, ['順位', 'テーブル', 'カラム', 'スコア', '使用句', 'コマンド数', 'ページ数'], [
+            (i, r.table, r.column, r.score, ', '.join(f'{c} {n}' for c, n in r.clauses.items()),
+             r.command_count, r.page_count)
+            for i, r in enumerate(analysis.index_recommendations[:WORD_MAX_FINDING_ROWS], 1)
+        ])
+
+        doc.add_page_break()
+
+    # ================== 9. 高コスト処理 ==================
+    check_cancelled(cancel_token)
+    if analysis.hot_paths:
+        doc.add_heading('9. 高コスト処理', 1)
+        doc.add_paragraph(
+            '各処理のコマンド構成から見積もった相対コストの上位です（SQL実行・テーブル更新・メール送信に重みを付け、'
+            'ループ内は入れ子ごとに倍率を掛け、サーバーコマンド呼出は呼出先のコストを加算）。'
+            '負荷試験で優先的に確認する処理の目安として利用してください。'
+        )
+        _add_grid_table(doc, ['順位', '種別', '処理', 'コスト', 'SQL', '更新', 'メール', '呼出', 'ループ深さ'], [
+            (i, ROOT_KIND_LABELS.get(h.kind, h.kind), h.location, h.cost, h.sql_count, h.write_count,
+             h.email_count, h.call_count, h.max_loop_depth)
+            for i, h in enumerate(analysis.hot_paths, 1)
+        ])
+
+        doc.add_page_break()
+
+    # ================== 10. ページ負荷 ==================
+    check_cancelled(cancel_token)
+    if heavy_pages:
+        doc.add_heading('10. ページ負荷', 1)
+        doc.add_paragraph(
+            '設定セル数・数式数・数式の長さ・コマンド数から算出した負荷スコアの高い画面です。'
+            '「合計」はマスターページ分を含みます。ページの表示速度はこれらの値に比例して低下する傾向があります。'
+        )
+        shown = heavy_pages[:WORD_MAX_HEAVY_PAGES]
+        _add_grid_table(doc, ['順位', '画面名', '合計', '自ページ', 'セル数', '数式数', 'コマンド数', 'マスターページ', '主なセル型'], [
+            (i, p.name, p.metrics.total_weight, p.metrics.weight, p.metrics.attached_cells,
+             p.metrics.formula_count, p.metrics.command_count, p.metrics.master_page or '-',
+             _format_cell_types(p.metrics.cell_types, limit=3))
+            for i, p in enumerate(shown, 1)
+        ])
+        _add_truncation_note(doc, len(heavy_pages), len(shown))
+
+        doc.add_page_break()
+
+    # ================== 11. 数式の依存関係 ==================
+    check_cancelled(cancel_token)
+    if analysis.formula_reports:
+        doc.add_heading('11. 数式の依存関係', 1)
+        doc.add_paragraph(
+            '画面内のセル数式の参照関係を解析し、循環参照・深い依存チェーン（再計算が連鎖する段数）・'
+            '多数の数式から参照されるセル（値の変更で再計算が集中する）がある画面を示します。'
+        )
+        _add_grid_table(doc, ['画面名', '数式数', '異なる数式', '循環参照', '最大段数', '最長チェーン', '被参照の多いセル'], [
+            (r.page, r.formula_count, r.distinct_formulas,
+             ' / '.join('・'.join(c) for c in r.cycles) or '-',
+             r.max_chain_depth, ' → '.join(r.deepest_chain) or '-',
+             ', '.join(f'{cell}（{n}）' for cell, n in r.high_fan_in) or '-')
+            for r in analysis.formula_reports[:WORD_MAX_FINDING_ROWS]
+        ])
+        _add_truncation_note(doc, len(analysis.formula_reports), min(len(analysis.formula_reports), WORD_MAX_FINDING_ROWS))
+
+        doc.add_page_break()
+
+    # ================== 12. テーブルの読み書き集中 ==================
+    check_cancelled(cancel_token)
+    if analysis.table_pressure:
+        doc.add_heading('12. テーブルの読み書き集中', 1)
+        doc.add_paragraph(
+            'テーブル更新・挿入・削除コマンド、SQL、ワークフロー遷移からテーブルごとの読み書き箇所を集計しました。'
+            '「重み付き」はループ内の箇所を入れ子ごとに10倍したもので、スコアは書き込みを3倍して加えています。'
+            '上位のテーブルは同時アクセス時にロック競合が起きやすいため、デプロイ前の負荷試験で確認してください。'
+        )
+        shown = analysis.table_pressure[:WORD_MAX_FINDING_ROWS]
+        _add_grid_table(doc, ['順位', 'テーブル', 'スコア', '書込箇所', '書込(重み付き)', '読込箇所', '読込(重み付き)', 'ページ数'], [
+            (i, t.table if t.defined else f'{t.table}（定義外）', t.score, t.write_sites, t.write_weight,
+             t.read_sites, t.read_weight, t.page_count)
+            for i, t in enumerate(shown, 1)
+        ])
+        _add_truncation_note(doc, len(analysis.table_pressure), len(shown))
+
+        doc.add_page_break()
+
+    # ================== 13. 画面遷移 ==================
+    check_cancelled(cancel_token)
+    if nav.links or nav.broken_links or nav.orphan_pages:
+        doc.add_heading('13. 画面遷移', 1)
+        if nav.links:
+            doc.add_paragraph(
+                f'ボタン・メニュー等のページ遷移コマンドから作成した画面遷移図です（画面 {nav.page_count}件、遷移 {len(nav.links)}件、'
+                f'入口の画面から最も遠い画面まで {nav.max_depth}回の遷移）。'
+                '緑の画面は他の画面から遷移されない画面、破線はマスターページ上のメニュー等からの遷移です。'
+            )
+            _add_svg_picture(doc, render_navigation_svg(nav),
+                             alt_text=_diagram_alt_text('画面遷移図', [' → '.join(link[:2]) for link in nav.links]))
+        else:
+            doc.add_paragraph(
+                f'ボタン・メニュー等のページ遷移コマンドに、存在する画面への遷移はありません（画面 {nav.page_count}件）。'
+            )
+
+        doc.add_paragraph()
+        doc.add_paragraph('■ 他の画面から遷移されない画面')
+        doc.add_paragraph(
+            (', '.join(nav.orphan_pages) if nav.orphan_pages else 'なし')
+            + '（開始画面・URLで直接開く画面以外は、到達できない画面の可能性があります）'
+        )
+
+        if nav.broken_links:
+            doc.add_paragraph('■ 存在しない画面への遷移')
+            _add_grid_table(doc, ['遷移元', '遷移先'], nav.broken_links[:WORD_MAX_FINDING_ROWS])
+            _add_truncation_note(doc, len(nav.broken_links), min(len(nav.broken_links), WORD_MAX_FINDING_ROWS))
+
+        if nav.longest_chains:
+            doc.add_paragraph()
+            doc.add_paragraph('■ 最長の遷移経路')
+            _add_grid_table(doc, ['遷移回数', '経路'], [
+                (len(chain) - 1, ' → '.join(chain)) for chain in nav.longest_chains
+            ])
+
+        doc.add_page_break()
+
+    # ================== 14. 未使用の定義 ==================
+    check_cancelled(cancel_token)
+    if analysis.unused_artifacts:
+        doc.add_heading('14. 未使用の定義', 1)
+        doc.add_paragraph(
+            '画面・ワークフロー・スケジュールタスクを起点に呼出の連鎖をたどり、どこからも到達しないテーブル・サーバーコマンド・'
+            'マスターページを示します（未使用のサーバーコマンドからしか呼ばれないものも含みます）。'
+            '画面のデータバインドやWeb APIからの利用は解析対象外のため、削除前に確認してください。'
+        )
+        shown = analysis.unused_artifacts[:WORD_MAX_FINDING_ROWS]
+        _add_grid_table(doc, ['No.', '種別', '名前', 'フォルダ', '備考'], [
+            (i, ARTIFACT_KIND_LABELS.get(u.kind, u.kind), u.name, u.folder or '-', u.note or '-')
+            for i, u in enumerate(shown, 1)
+        ])
+        _add_truncation_note(doc, len(analysis.unused_artifacts), len(shown))
+
+        doc.add_page_break()
+
+    # 保存（一時ファイルに書き出してから置き換える）
+    check_cancelled(cancel_token)
+    save_atomically(file_path, doc.save)
+    record_export(file_path, content_hash, 'word')
     return file_path
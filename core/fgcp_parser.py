@@ -11,12 +11,15 @@ import json
 import traceback
 import zipfile
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
+from core.analysis import run_static_analysis
+from core.cancellation import CancellationToken, OperationCancelled, check_cancelled
 from core.logging_setup import logger
+from core.safety_checks import FgcpArchive, ZipSafetyError
 from core.models import (
     AnalysisResult, AnalysisSummary, AssigneeInfo, ButtonInfo, CellCommandInfo,
-    ColumnInfo, CommandInfo, ConditionInfo, DiffResult, FormulaInfo, PageInfo,
+    ColumnInfo, CommandInfo, ConditionInfo, DiffRecord, DiffResult, FormulaInfo, PageInfo, PageMetrics,
     ParameterInfo, RelationInfo, ServerCommandInfo, StateInfo, TableInfo,
     TransitionInfo, WorkflowInfo
 )
@@ -154,7 +157,7 @@ def generate_command_description(cmd: dict, type_name: str) -> str:
         'LoopCommand': 'ループ処理',
         'SetCellValueCommand': 'セル値設定',
         'NavigateCommand': 'ページ遷移',
-        'CallServerCommandCommand': 'サーバーコマンド呼出',
+        'CallServerCommandCommand': f"サーバーコマンド呼出: {cmd.get('ServerCommandName', '(不明)')}",
     }
     return descriptions.get(type_name, type_name)
 
@@ -169,6 +172,9 @@ def parse_command(cmd: dict) -> CommandInfo:
         command.description = f"IF {format_condition(cmd.get('Condition'))}"
         command.sub_commands = parse_commands(cmd.get('TrueCommands', [])) + parse_commands(cmd.get('FalseCommands', []))
 
+    if 'LoopCommand' in cmd_type:
+        command.sub_commands = parse_commands(cmd.get('Commands', []))
+
     if 'ExecuteSqlCommand' in cmd_type:
         sql = cmd.get('SqlStatement', '')
         command.details = {'sql': sql}
@@ -178,6 +184,17 @@ def parse_command(cmd: dict) -> CommandInfo:
         command.details = {'table': cmd.get('TableName'), 'mappings': cmd.get('ColumnMappings')}
         command.description = f"テーブル更新: {cmd.get('TableName')}"
 
+    if 'InsertTableDataCommand' in cmd_type or 'DeleteTableDataCommand' in cmd_type:
+        command.details = {'table': cmd.get('TableName')}
+
+    if 'CallServerCommandCommand' in cmd_type:
+        command.details = {'server_command': cmd.get('ServerCommandName')}
+
+    if 'NavigateCommand' in cmd_type:
+        target = cmd.get('PageName') or cmd.get('TargetPageName') or ''
+        command.details = {'target': target}
+        command.description = f"ページ遷移: {target or '(不明)'}"
+
     if 'SendEmailCommand' in cmd_type:
         command.details = {'to': cmd.get('EmailTo'), 'subject': cmd.get('EmailSubject')}
         command.description = f"メール送信: {cmd.get('EmailSubject', '(件名なし)')}"
@@ -256,18 +273,63 @@ def parse_workflow(table_name: str, wf_data: dict) -> WorkflowInfo:
 # =============================================================================
 # ページ要素抽出
 # =============================================================================
+# ページ負荷スコアの重み（セル1個・数式1個・数式100文字・コマンド1個あたり）
+PAGE_WEIGHT_FACTORS = {
+    'attached_cell': 1.0,
+    'formula': 2.0,
+    'formula_100_chars': 1.0,
+    'command': 3.0,
+}
+
+
+def _scan_commands(commands: List[CommandInfo], navigation_targets: Dict[str, None]) -> int:
+    """コマンド数（入れ子を含む）を数え、同じ走査でページ遷移先を navigation_targets に集める"""
+    count = 0
+    for c in commands:
+        count += 1
+        if c.type == 'NavigateCommand' and (c.details or {}).get('target'):
+            navigation_targets[c.details['target']] = None
+        if c.sub_commands:
+            count += _scan_commands(c.sub_commands, navigation_targets)
+    return count
+
+
+def compute_page_weight(metrics: PageMetrics) -> float:
+    """ページ負荷スコア（自ページ分）を計算"""
+    f = PAGE_WEIGHT_FACTORS
+    return round(
+        metrics.attached_cells * f['attached_cell']
+        + metrics.formula_count * f['formula']
+        + metrics.formula_length / 100 * f['formula_100_chars']
+        + metrics.command_count * f['command'], 1)
+
+
 def extract_page_elements(data: dict) -> dict:
-    """ページからボタン、数式、セルコマンドを抽出"""
+    """
+    ページからボタン、数式、セルコマンドを抽出
+
+    同じ走査で負荷指標（PageMetrics）とページ遷移先（NavigateCommand の遷移先ページ名）も集計する。
+    マスターページ分の加算は全ページの読み込み後に resolve_page_weights() で行う。
+    """
     buttons, formulas, cell_commands = [], [], []
     attach_infos = data.get('AttachInfos', {})
+    metrics = PageMetrics(
+        attached_cells=len(attach_infos),
+        master_page=str(data.get('MasterPage') or data.get('MasterPageName') or ''),
+    )
+    cell_types = metrics.cell_types
 
     for cell_address, cell_data in attach_infos.items():
         cell_type = cell_data.get('CellType', {})
         if cell_data.get('Formula'):
-            formulas.append(FormulaInfo(cell=cell_address, formula=str(cell_data['Formula'])))
+            formula = str(cell_data['Formula'])
+            formulas.append(FormulaInfo(cell=cell_address, formula=formula))
+            metrics.formula_length += len(formula)
 
         if cell_type:
             type_str = cell_type.get('$type', '')
+            type_name = extract_command_type_name(type_str)
+            cell_types[type_name] = cell_types.get(type_name, 0) + 1
             if 'MenuCellType' in type_str or 'ForguncyMenuCellType' in type_str:
                 extract_menu_items(cell_type.get('Items', []), buttons, cell_address)
             if 'ButtonCellType' in type_str:
@@ -279,7 +341,38 @@ def extract_page_elements(data: dict) -> dict:
             if command_list and 'ButtonCellType' not in type_str:
                 cell_commands.append(CellCommandInfo(cell=cell_address, event='Click', commands=parse_commands(command_list)))
 
-    return {'buttons': buttons, 'formulas': formulas, 'cell_commands': cell_commands}
+    navigation_targets: Dict[str, None] = {}
+    metrics.formula_count = len(formulas)
+    metrics.command_count = (sum(_scan_commands(b.commands, navigation_targets) for b in buttons)
+                             + sum(_scan_commands(c.commands, navigation_targets) for c in cell_commands))
+    metrics.weight = compute_page_weight(metrics)
+    metrics.total_weight = metrics.weight
+    return {'buttons': buttons, 'formulas': formulas, 'cell_commands': cell_commands, 'metrics': metrics,
+            'navigation_targets': list(navigation_targets)}
+
+
+def resolve_page_weights(pages: List[PageInfo]) -> None:
+    """マスターページの負荷（継承元をすべて含む）を各ページの total_weight に加算"""
+    masters = {p.name: p for p in pages if p.page_type == 'masterPage'}
+    resolved: Dict[str, float] = {}
+
+    def master_total(name: str, visiting: set) -> float:
+        if name in resolved:
+            return resolved[name]
+        master = masters.get(name)
+        if master is None or name in visiting:
+            return 0.0
+        visiting.add(name)
+        total = master.metrics.weight
+        if master.metrics.master_page:
+            total += master_total(master.metrics.master_page, visiting)
+        resolved[name] = round(total, 1)
+        return resolved[name]
+
+    for page in pages:
+        if page.metrics.master_page:
+            page.metrics.total_weight = round(
+                page.metrics.weight + master_total(page.metrics.master_page, set()), 1)
 
 
 def extract_menu_items(items: list, buttons: list, base_cell: str):
@@ -301,7 +394,9 @@ def extract_menu_items(items: list, buttons: list, base_cell: str):
 def analyze_project(
     file_path: str,
     progress_callback: Optional[Callable[[int, str], None]] = None,
-    limits: Optional[Dict] = None
+    limits: Optional[Dict] = None,
+    archive: Optional[FgcpArchive] = None,
+    cancel_token: Optional[CancellationToken] = None
 ) -> AnalysisResult:
     """
     Forguncyプロジェクトを解析
@@ -310,12 +405,18 @@ def analyze_project(
         file_path: FGCPファイルパス
         progress_callback: 進捗コールバック (pct, msg)
         limits: 機能制限設定
+        archive: オープン済みのアーカイブ（open_checked_archive の戻り値）。
+            指定時はファイルを開き直さずに使用し、クローズは呼び出し側で行う
+        cancel_token: キャンセルトークン。エントリごと・解凍チャンクごとに確認する
+            （archive 指定時はアーカイブにも設定し、詳細検証スレッドの解凍も打ち切る）
 
     Returns:
         AnalysisResult: 解析結果
 
     Raises:
         zipfile.BadZipFile: 不正なZIPファイル
+        ZipSafetyError: エントリの解凍量・圧縮率が上限を超えた場合
+        OperationCancelled: キャンセルされた場合
         Exception: その他のエラー
     """
     def send_progress(pct, msg):
@@ -326,19 +427,25 @@ def analyze_project(
     project_name = Path(file_path).stem
     limits = limits or FEATURE_LIMITS['FREE']
 
+    owns_archive = archive is None
     try:
-        with zipfile.ZipFile(file_path, 'r') as zf:
-            entries = zf.namelist()
+        if owns_archive:
+            archive = FgcpArchive.open(file_path)
+        archive.cancel_token = cancel_token
+        try:
+            entries = archive.entries
             logger.debug(f"ZIPエントリ数: {len(entries)}")
 
             send_progress(15, 'テーブル定義を解析しています...')
             max_tables = limits.get('max_tables', 5)
-            tables = analyze_tables(zf, entries, 999999 if max_tables == float('inf') else int(max_tables))
+            tables = analyze_tables(archive, entries, 999999 if max_tables == float('inf') else int(max_tables),
+                                    cancel_token=cancel_token)
             logger.info(f"テーブル解析完了: {len(tables)}件")
 
             send_progress(25, 'ページ定義を解析しています...')
             max_pages = limits.get('max_pages', 10)
-            pages = analyze_pages(zf, entries, 999999 if max_pages == float('inf') else int(max_pages))
+            pages = analyze_pages(archive, entries, 999999 if max_pages == float('inf') else int(max_pages),
+                                  cancel_token=cancel_token)
             logger.info(f"ページ解析完了: {len(pages)}件")
 
             send_progress(35, 'ワークフローを解析しています...')
@@ -349,8 +456,12 @@ def analyze_project(
 
             send_progress(45, 'サーバーコマンドを解析しています...')
             max_cmds = limits.get('max_server_commands', 3)
-            server_commands = analyze_server_commands(zf, entries, 999999 if max_cmds == float('inf') else int(max_cmds))
+            server_commands = analyze_server_commands(archive, entries, 999999 if max_cmds == float('inf') else int(max_cmds),
+                                                      cancel_token=cancel_token)
             logger.info(f"サーバーコマンド解析完了: {len(server_commands)}件")
+        finally:
+            if owns_archive:
+                archive.close()
 
         summary = AnalysisSummary(
             table_count=len(tables),
@@ -364,7 +475,7 @@ def analyze_project(
         logger.info(f"解析完了: テーブル={summary.table_count}, ページ={summary.page_count}, "
                     f"ワークフロー={summary.workflow_count}, サーバーコマンド={summary.server_command_count}")
 
-        return AnalysisResult(
+        result = AnalysisResult(
             project_name=project_name,
             tables=tables,
             pages=pages,
@@ -373,22 +484,32 @@ def analyze_project(
             summary=summary
         )
 
+        # 静的解析（N+1 検出・インデックス推奨など）
+        run_static_analysis(result, cancel_token)
+
+        return result
+
     except zipfile.BadZipFile as e:
         logger.error(f"不正なZIPファイル: {e}")
         raise
+    except OperationCancelled:
+        logger.info(f"解析をキャンセルしました: {file_path}")
+        raise
     except Exception as e:
         logger.error(f"解析エラー: {e}\n{traceback.format_exc()}")
         raise
 
 
-def analyze_tables(zf: zipfile.ZipFile, entries: list, max_count: int = 999) -> List[TableInfo]:
+def analyze_tables(archive: FgcpArchive, entries: list, max_count: int = 999,
+                   cancel_token: Optional[CancellationToken] = None) -> List[TableInfo]:
     """テーブルを解析"""
     tables = []
     table_entries = [e for e in entries if e.startswith('Tables/') and e.endswith('.json')][:max_count]
 
     for entry in table_entries:
+        check_cancelled(cancel_token)
         try:
-            content = zf.read(entry).decode('utf-8')
+            content = archive.read(entry).decode('utf-8')
             data = extract_json(content)
             path_parts = entry.split('/')
             folder = path_parts[1] if len(path_parts) > 2 else ''
@@ -425,20 +546,25 @@ def analyze_tables(zf: zipfile.ZipFile, entries: list, max_count: int = 999) ->
                 table.workflow = parse_workflow(table.name, data['BindingRelatedWorkflow'])
 
             tables.append(table)
+        except (ZipSafetyError, OperationCancelled):
+            # 解凍上限の超過・キャンセルはエントリ単位でスキップせず解析全体を中断する
+            raise
         except Exception as e:
             logger.warning(f"テーブル解析スキップ {entry}: {e}")
 
     return tables
 
 
-def analyze_pages(zf: zipfile.ZipFile, entries: list, max_count: int = 999) -> List[PageInfo]:
+def analyze_pages(archive: FgcpArchive, entries: list, max_count: int = 999,
+                  cancel_token: Optional[CancellationToken] = None) -> List[PageInfo]:
     """ページを解析"""
     pages = []
     parse_errors = []
 
     for entry in [e for e in entries if e.startswith('Pages/') and e.endswith('.json')][:max_count]:
+        check_cancelled(cancel_token)
         try:
-            content = zf.read(entry).decode('utf-8')
+            content = archive.read(entry).decode('utf-8')
             data = extract_json(content)
             elements = extract_page_elements(data)
             path_parts = entry.split('/')
@@ -450,12 +576,15 @@ def analyze_pages(zf: zipfile.ZipFile, entries: list, max_count: int = 999) -> L
                 folder=folder,
                 **elements
             ))
+        except (ZipSafetyError, OperationCancelled):
+            raise
         except Exception as e:
             parse_errors.append(f"Page {entry}: {e}")
 
     for entry in [e for e in entries if e.startswith('MasterPages/') and e.endswith('.json')]:
+        check_cancelled(cancel_token)
         try:
-            content = zf.read(entry).decode('utf-8')
+            content = archive.read(entry).decode('utf-8')
             data = extract_json(content)
             elements = extract_page_elements(data)
             pages.append(PageInfo(
@@ -465,9 +594,13 @@ def analyze_pages(zf: zipfile.ZipFile, entries: list, max_count: int = 999) -> L
                 folder='MasterPages',
                 **elements
             ))
+        except (ZipSafetyError, OperationCancelled):
+            raise
         except Exception as e:
             parse_errors.append(f"MasterPage {entry}: {e}")
 
+    resolve_page_weights(pages)
+
     if parse_errors:
         for err in parse_errors[:5]:
             logger.warning(err)
@@ -477,14 +610,16 @@ def analyze_pages(zf: zipfile.ZipFile, entries: list, max_count: int = 999) -> L
     return pages
 
 
-def analyze_server_commands(zf: zipfile.ZipFile, entries: list, max_count: int = 999) -> List[ServerCommandInfo]:
+def analyze_server_commands(archive: FgcpArchive, entries: list, max_count: int = 999,
+                            cancel_token: Optional[CancellationToken] = None) -> List[ServerCommandInfo]:
     """サーバーコマンドを解析"""
     server_commands = []
     cmd_entries = [e for e in entries if e.startswith('ServerCommands/') and e.endswith('.json')][:max_count]
 
     for entry in cmd_entries:
+        check_cancelled(cancel_token)
         try:
-            content = zf.read(entry).decode('utf-8')
+            content = archive.read(entry).decode('utf-8')
             data = extract_json(content)
             path_parts = entry.split('/')
             folder = path_parts[1] if len(path_parts) > 2 else ''
@@ -517,8 +652,11 @@ def analyze_server_commands(zf: zipfile.ZipFile, entries: list, max_count: int =
                 path=entry,
                 commands=commands,
                 raw_commands=raw_commands,
-                parameters=parameters
+                parameters=parameters,
+                trigger_types=[extract_command_type_name(t.get('$type', '')) for t in triggers if isinstance(t, dict)]
             ))
+        except (ZipSafetyError, OperationCancelled):
+            raise
         except Exception as e:
             logger.warning(f"サーバーコマンド解析スキップ {entry}: {e}")
 
@@ -637,3 +775,57 @@ def compare_projects(old_analysis: AnalysisResult, new_analysis: AnalysisResult)
             })
 
     return diff
+
+
+def iter_diff_records(diff: DiffResult) -> Iterator[DiffRecord]:
+    """
+    差分比較結果をレコード単位で順に生成
+
+    カテゴリ（テーブル→ページ→サーバーコマンド）ごとに追加→削除→変更の順で返す。
+    """
+    for t in diff.added_tables:
+        yield DiffRecord('table', 'added', t.name, t.folder or '-', f'カラム数: {len(t.columns)}')
+    for t in diff.removed_tables:
+        yield DiffRecord('table', 'removed', t.name, t.folder or '-', f'カラム数: {len(t.columns)}')
+    for m in diff.modified_tables:
+        details = []
+        if m.get('added_columns'):
+            details.append(f"追加カラム: {', '.join(c.name for c in m['added_columns'])}")
+        if m.get('removed_columns'):
+            details.append(f"削除カラム: {', '.join(c.name for c in m['removed_columns'])}")
+        for mc in m.get('modified_columns') or []:
+            details.append(f"{mc['name']}: {', '.join(mc['changes'])}")
+        yield DiffRecord('table', 'modified', m['name'], m['old'].folder or '-',
+                         '; '.join(details) if details else '構造変更')
+
+    for p in diff.added_pages:
+        yield DiffRecord('page', 'added', p.name, p.folder or '-', f'ボタン: {len(p.buttons)}, 数式: {len(p.formulas)}')
+    for p in diff.removed_pages:
+        yield DiffRecord('page', 'removed', p.name, p.folder or '-', f'ボタン: {len(p.buttons)}, 数式: {len(p.formulas)}')
+    for m in diff.modified_pages:
+        details = []
+        if m.get('added_buttons'):
+            details.append(f"追加ボタン: {len(m['added_buttons'])}個")
+        if m.get('removed_buttons'):
+            details.append(f"削除ボタン: {len(m['removed_buttons'])}個")
+        if m.get('added_formulas'):
+            details.append(f"追加数式: {len(m['added_formulas'])}個")
+        if m.get('removed_formulas'):
+            details.append(f"削除数式: {len(m['removed_formulas'])}個")
+        yield DiffRecord('page', 'modified', m['name'], m['old'].folder or '-',
+                         '; '.join(details) if details else '内容変更')
+
+    for c in diff.added_server_commands:
+        yield DiffRecord('server_command', 'added', c.name, c.folder or '-', f'パラメータ: {len(c.parameters)}')
+    for c in diff.removed_server_commands:
+        yield DiffRecord('server_command', 'removed', c.name, c.folder or '-', f'パラメータ: {len(c.parameters)}')
+    for m in diff.modified_server_commands:
+        details = []
+        if m.get('added_parameters'):
+            details.append(f"追加パラメータ: {', '.join(p.name for p in m['added_parameters'])}")
+        if m.get('removed_parameters'):
+            details.append(f"削除パラメータ: {', '.join(p.name for p in m['removed_parameters'])}")
+        if m.get('commands_changed'):
+            details.append("処理内容変更")
+        yield DiffRecord('server_command', 'modified', m['name'], m['old'].folder or '-',
+                         '; '.join(details) if details else '内容変更')
@@ -6,11 +6,31 @@
 ファイルログとコンソールログを設定する。
 Windows: %APPDATA%/ForguncyInsight/logs/app.log
 macOS/Linux: ~/.forguncyinsight/logs/app.log
+
+ログ出力はキュー経由で専用スレッド（QueueListener）が書き込むため、解析処理が
+ディスクI/Oで待たされることはない。ファイルはサイズでローテーションする。
+ログフォルダの作成やファイルのオープンは最初のログ出力時まで遅延する（import時には行わない）。
+
+ワーカープロセス（CLIの並列実行・デーモン・サービス）は同じログファイルを開かず、
+worker_log_queue() のキューにログを送り、親プロセスのリスナーが書き込む
+（RotatingFileHandler は複数プロセスからの同時書き込み・ローテーションに対応していないため）。
+プロセスプールの initializer に init_worker_logging、initargs に (worker_log_queue(),) を指定する。
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from pathlib import Path
+from typing import Optional
+
+
+# ローテーション設定
+LOG_FILE_NAME = 'app.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024   # 1ファイルの上限（5MB）
+LOG_BACKUP_COUNT = 5              # 保持する旧ファイル数（app.log.1 〜 app.log.5）
 
 
 def get_log_dir() -> Path:
@@ -27,34 +47,160 @@ def get_log_dir() -> Path:
     return log_dir
 
 
+def _create_output_handlers() -> list:
+    """実際に書き込むハンドラ（リスナースレッド側で使用）"""
+    handlers = []
+
+    # ファイルハンドラ（サイズでローテーション）
+    try:
+        file_handler = logging.handlers.RotatingFileHandler(
+            get_log_dir() / LOG_FILE_NAME,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s [%(levelname)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        handlers.append(file_handler)
+    except OSError:
+        # ログフォルダが作成できない環境でもコンソール出力は続ける
+        pass
+
+    # コンソールハンドラ（開発用）
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+    handlers.append(console_handler)
+
+    return handlers
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    最初のログ出力時にリスナースレッドを起動するキューハンドラ
+
+    ロガー側はキューに積むだけで戻る。fork で生成された子プロセスでは
+    親のリスナースレッドが存在しないため、プロセスごとに起動し直す。
+    """
+
+    def __init__(self):
+        super().__init__(queue.Queue(-1))
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # 子プロセスでは親から引き継いだキューを使わない
+            self.queue = queue.Queue(-1)
+            self._listener = logging.handlers.QueueListener(
+                self.queue, *_create_output_handlers(), respect_handler_level=True
+            )
+            self._listener.start()
+            self._pid = pid
+
+        # multiprocessing のワーカーは atexit を実行せずに終了するため、終了処理にも登録する
+        import multiprocessing.util
+        multiprocessing.util.Finalize(self, self.stop, exitpriority=0)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self) -> None:
+        """未出力のログを書き出してリスナーを停止"""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                for handler in self._listener.handlers:
+                    handler.close()
+            self._listener = None
+            self._pid = None
+
+
+class _ForwardHandler(logging.Handler):
+    """ワーカープロセスから受け取ったログを親プロセスのロガーに渡す"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+_queue_handler: Optional[_LazyQueueHandler] = None
+
+# ワーカープロセスのログを受け取るキューと、親プロセス側のリスナー
+_worker_lock = threading.Lock()
+_worker_queue = None
+_worker_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def worker_log_queue():
+    """
+    ワーカープロセスのログ送信先キュー（親プロセスで呼ぶ）
+
+    最初の呼び出し時に multiprocessing のキューと、それを読んで親プロセスのロガーに渡す
+    リスナースレッドを作成する。
+    """
+    global _worker_queue, _worker_listener
+    with _worker_lock:
+        if _worker_queue is None:
+            import multiprocessing
+            _worker_queue = multiprocessing.Queue(-1)
+            _worker_listener = logging.handlers.QueueListener(_worker_queue, _ForwardHandler())
+            _worker_listener.start()
+        return _worker_queue
+
+
+def init_worker_logging(log_queue) -> None:
+    """
+    ワーカープロセスのログを親プロセスへ送るように設定（プロセスプールの initializer から呼ぶ）
+
+    ワーカーはログファイルを開かない。
+    """
+    global _queue_handler
+    logger = logging.getLogger('ForguncyInsight')
+    logger.handlers.clear()
+    # fork で引き継いだハンドラは親プロセスのリスナーを指しているため使わない
+    _queue_handler = None
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
 def setup_logging() -> logging.Logger:
-    """ロギングを設定"""
+    """ロギングを設定（ファイル・フォルダは最初のログ出力時に作成される）"""
+    global _queue_handler
     logger = logging.getLogger('ForguncyInsight')
     logger.setLevel(logging.DEBUG)
 
     # 既存のハンドラをクリア
+    if _queue_handler is not None:
+        _queue_handler.stop()
     logger.handlers.clear()
 
-    # ファイルハンドラ
-    log_file = get_log_dir() / 'app.log'
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    _queue_handler = _LazyQueueHandler()
+    logger.addHandler(_queue_handler)
+    return logger
+
 
-    # コンソールハンドラ（開発用）
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter('[%(levelname)s] %(message)s')
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+def shutdown_logging() -> None:
+    """キューに残っているログを書き出して終了（終了時に自動で呼ばれる）"""
+    global _worker_queue, _worker_listener
+    with _worker_lock:
+        listener, _worker_listener, _worker_queue = _worker_listener, None, None
+    if listener is not None:
+        listener.stop()
+    if _queue_handler is not None:
+        _queue_handler.stop()
 
-    return logger
 
+atexit.register(shutdown_logging)
 
 # グローバルロガー
 logger = setup_logging()
@@ -16,7 +16,7 @@ from typing import Any, Optional
 @dataclass
 class AnalysisEvent:
     """解析イベント（UIスレッドへの通知用）"""
-    event_type: str  # 'progress', 'log', 'complete', 'error'
+    event_type: str  # 'progress', 'log', 'complete', 'error', 'confirm', 'cancelled'
     data: Any = None
 
 
@@ -136,6 +136,19 @@ class CellCommandInfo:
     commands: list = field(default_factory=list)
 
 
+@dataclass
+class PageMetrics:
+    """ページ負荷指標（ページ定義の読み込み時に集計）"""
+    attached_cells: int = 0        # セル型・数式などが設定されたセル数
+    formula_count: int = 0
+    formula_length: int = 0        # 数式の総文字数
+    command_count: int = 0         # ボタン・セルコマンドのコマンド総数（入れ子を含む）
+    cell_types: dict = field(default_factory=dict)  # セル型名 -> 個数
+    master_page: str = ""
+    weight: float = 0.0            # 自ページ分の負荷スコア
+    total_weight: float = 0.0      # マスターページ（継承元をすべて含む）を加えた負荷スコア
+
+
 @dataclass
 class PageInfo:
     """ページ情報"""
@@ -146,6 +159,8 @@ class PageInfo:
     buttons: list = field(default_factory=list)
     formulas: list = field(default_factory=list)
     cell_commands: list = field(default_factory=list)
+    metrics: PageMetrics = field(default_factory=PageMetrics)
+    navigation_targets: list = field(default_factory=list)  # NavigateCommand の遷移先ページ名（重複なし）
 
 
 # =============================================================================
@@ -169,6 +184,122 @@ class ServerCommandInfo:
     commands: list = field(default_factory=list)
     raw_commands: list = field(default_factory=list)
     parameters: list = field(default_factory=list)
+    trigger_types: list = field(default_factory=list)  # トリガーの型名（Web API・スケジュールタスクなど）
+
+
+# =============================================================================
+# 静的解析（パフォーマンス・構造チェック）
+# =============================================================================
+@dataclass
+class PerfFinding:
+    """パフォーマンス指摘（ループ内のデータアクセスなど）"""
+    rule: str          # 'n_plus_one'
+    severity: str      # 'high', 'medium'
+    location: str      # 指摘箇所（例: 'ページ: 受注一覧 / ボタン: 保存'）
+    loop_depth: int
+    command_type: str
+    path: list = field(default_factory=list)        # 起点からのコマンド説明の並び
+    call_chain: list = field(default_factory=list)  # 経由したサーバーコマンド名
+
+
+@dataclass
+class IndexRecommendation:
+    """インデックス推奨（SQLの検索条件・結合条件・並び順で使われるカラム）"""
+    table: str
+    column: str
+    score: float
+    clauses: dict = field(default_factory=dict)     # 句 -> 出現SQL数（'WHERE', 'JOIN', 'ORDER BY' など）
+    command_count: int = 0                          # 使用しているコマンド（サーバーコマンド・ボタン等）の数
+    page_count: int = 0                             # 実行されるページ数（サーバーコマンド呼出経由を含む）
+    examples: list = field(default_factory=list)    # 使用箇所の例
+
+
+@dataclass
+class HandlerCost:
+    """処理（サーバーコマンド・ボタン等）の静的コスト見積もり"""
+    location: str
+    kind: str          # 'server_command', 'button', 'cell_command', 'workflow'
+    cost: float
+    sql_count: int = 0
+    write_count: int = 0
+    email_count: int = 0
+    call_count: int = 0
+    max_loop_depth: int = 0
+    hot_path: list = field(default_factory=list)    # 最もコストの大きいコマンドまでのパス
+
+
+@dataclass
+class FormulaGraphReport:
+    """ページ内の数式依存関係の解析結果"""
+    page: str
+    formula_count: int = 0
+    distinct_formulas: int = 0                      # 異なる数式テキストの数（解析はこの回数だけ）
+    max_chain_depth: int = 0                        # 最も長い依存チェーンの段数
+    deepest_chain: list = field(default_factory=list)  # 最も長いチェーンのセル（参照元 → 参照先）
+    cycles: list = field(default_factory=list)      # 循環参照しているセルの組
+    cycle_count: int = 0
+    high_fan_in: list = field(default_factory=list)  # [セル, 参照している数式の数]
+
+
+@dataclass
+class TablePressure:
+    """テーブルごとの読み書き箇所の集計（同時実行時の競合の目安）"""
+    table: str
+    defined: bool = True       # テーブル定義に存在するか（ビュー・一時テーブルなどは False）
+    read_sites: int = 0
+    write_sites: int = 0
+    read_weight: float = 0.0   # ループの入れ子で重み付けした読み込み箇所数
+    write_weight: float = 0.0
+    score: float = 0.0
+    page_count: int = 0        # 読み書きが実行されるページ数（サーバーコマンド呼出経由を含む）
+    writers: list = field(default_factory=list)  # 書き込み箇所の例
+
+
+@dataclass
+class WorkflowTransitionCost:
+    """重い処理を含むワークフロー遷移"""
+    action: str
+    from_state: str
+    to_state: str
+    cost: float
+    sql_count: int = 0
+    write_count: int = 0
+    email_count: int = 0
+    call_count: int = 0
+    max_loop_depth: int = 0
+
+
+@dataclass
+class WorkflowAnalytics:
+    """ワークフロー状態遷移の解析結果"""
+    table_name: str
+    initial_states: list = field(default_factory=list)
+    reachable_states: list = field(default_factory=list)
+    unreachable_states: list = field(default_factory=list)  # 初期状態から到達できない状態
+    dead_end_states: list = field(default_factory=list)     # 終了状態ではないのに遷移先がない状態
+    undefined_states: list = field(default_factory=list)    # 遷移で参照されているが状態一覧にない状態
+    cycles: list = field(default_factory=list)              # 循環している状態の組
+    heavy_transitions: list = field(default_factory=list)   # WorkflowTransitionCost のリスト（重い順）
+
+
+@dataclass
+class NavigationGraph:
+    """画面遷移グラフ（NavigateCommand の遷移先から作成したサイトマップ）"""
+    page_count: int = 0
+    links: list = field(default_factory=list)           # [遷移元, 遷移先, 経由マスターページ（直接の場合は空）]
+    orphan_pages: list = field(default_factory=list)    # 他の画面から遷移されない画面
+    broken_links: list = field(default_factory=list)    # [遷移元, 存在しない遷移先]
+    longest_chains: list = field(default_factory=list)  # 入口の画面からの最短遷移が長い画面までの経路
+    max_depth: int = 0                                  # 入口の画面から最も遠い画面までの遷移回数
+
+
+@dataclass
+class UnusedArtifact:
+    """どこからも使われていない定義（テーブル・サーバーコマンド・マスターページ）"""
+    kind: str          # 'table', 'server_command', 'master_page'
+    name: str
+    folder: str = ""
+    note: str = ""
 
 
 # =============================================================================
@@ -194,6 +325,18 @@ class AnalysisResult:
     workflows: list = field(default_factory=list)
     server_commands: list = field(default_factory=list)
     summary: AnalysisSummary = field(default_factory=AnalysisSummary)
+    perf_findings: list = field(default_factory=list)
+    index_recommendations: list = field(default_factory=list)
+    hot_paths: list = field(default_factory=list)
+    formula_reports: list = field(default_factory=list)
+    table_pressure: list = field(default_factory=list)
+    workflow_analytics: list = field(default_factory=list)
+    navigation: NavigationGraph = field(default_factory=NavigationGraph)
+    unused_artifacts: list = field(default_factory=list)
+
+    # 静的解析で作成した参照索引（core.analysis.ProjectIndex）。影響調査などで再利用する。
+    # 型注釈を付けずフィールドにしないことで、内容ハッシュ・asdict・比較の対象から外す
+    project_index = None
 
 
 # =============================================================================
@@ -211,3 +354,13 @@ class DiffResult:
     added_server_commands: list = field(default_factory=list)
     removed_server_commands: list = field(default_factory=list)
     modified_server_commands: list = field(default_factory=list)
+
+
+@dataclass
+class DiffRecord:
+    """差分レコード（差分レポートのストリーミング出力用の1行）"""
+    category: str  # 'table', 'page', 'server_command'
+    change: str    # 'added', 'removed', 'modified'
+    name: str
+    folder: str = ""
+    detail: str = ""
@@ -8,10 +8,14 @@ FGCPファイル（ZIP形式）の安全性をチェックし、
 """
 
 import os
+import threading
 import zipfile
 import zlib
-from typing import Callable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
 
+from core.cancellation import CancellationToken, check_cancelled
 from core.logging_setup import logger
 
 
@@ -20,31 +24,303 @@ ZIP_SAFETY_LIMITS = {
     'max_file_size_mb': 200,        # 入力ファイルサイズ上限（MB）
     'max_entries': 50000,           # ZIP内エントリ数上限
     'max_uncompressed_size_gb': 1,  # 解凍後総サイズ上限（GB）
+    'max_entry_size_mb': 256,       # 1エントリの解凍後サイズ上限（MB）
+    'max_compression_ratio': 200,   # 1エントリの圧縮率上限（解凍後/圧縮後）
 }
 
+# 圧縮率チェックを開始する解凍済みバイト数（小さいエントリの高圧縮は許容する）
+RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+# ストリーミング解凍のチャンクサイズ
+READ_CHUNK_SIZE = 64 * 1024
+
+# 詳細検証で解凍済みデータを保持しておく総量の上限（超える分は検証のみ行い、take() で再度解凍する）
+DEEP_VERIFY_RETAIN_BYTES = 64 * 1024 * 1024
+
 
 class ZipSafetyError(Exception):
     """ZIP安全チェックエラー"""
     pass
 
 
-def check_zip_safety(file_path: str, confirm_callback: Optional[Callable[[str], bool]] = None) -> dict:
+class FgcpArchive:
     """
-    ZIPファイルの安全性をチェック
+    オープン済みのFGCPアーカイブ
 
-    Args:
-        file_path: チェックするファイルパス
-        confirm_callback: サイズ警告時の確認コールバック（Trueで続行）
+    ZipFileのハンドルと、一度だけ読み込んだセントラルディレクトリ（infolist）、
+    安全チェックの判定結果（verdict）をまとめて保持する。安全チェックから解析まで
+    同じハンドルを引き回すことで、ファイルの再オープンやディレクトリの再解析を避ける。
+    """
 
-    Returns:
-        dict: チェック結果（entries, total_size, file_size）
+    def __init__(self, file_path: str, zf: zipfile.ZipFile, verdict: Optional[dict] = None):
+        self.file_path = file_path
+        self.verdict = verdict
+        self._zf = zf
+        self.infos: List[zipfile.ZipInfo] = zf.infolist()
+        self.entries: List[str] = [info.filename for info in self.infos]
+        self._info_by_name: Dict[str, zipfile.ZipInfo] = {info.filename: info for info in self.infos}
+        # 実際に解凍したバイト数（宣言サイズではなく実測で総量上限を判定する）
+        self.bytes_read = 0
+        self._budget_lock = threading.Lock()
+        self._verifier: Optional['ArchiveVerifier'] = None
+        # 解凍チャンクごとに確認するキャンセルトークン（解析側が設定する）
+        self.cancel_token: Optional[CancellationToken] = None
 
-    Raises:
-        ZipSafetyError: 安全チェック失敗時
+    @classmethod
+    def open(cls, file_path: str) -> 'FgcpArchive':
+        """安全チェックを行わずにオープン（判定結果はNone）"""
+        return cls(file_path, zipfile.ZipFile(file_path, 'r'))
+
+    @property
+    def checked(self) -> bool:
+        """安全チェック済みか"""
+        return self.verdict is not None
+
+    def getinfo(self, name: str) -> zipfile.ZipInfo:
+        info = self._info_by_name.get(name)
+        if info is None:
+            raise KeyError(f"アーカイブ内にエントリがありません: {name}")
+        return info
+
+    def read(self, name: str) -> bytes:
+        """
+        エントリをチャンク単位で解凍して読み込み
+
+        セントラルディレクトリの宣言サイズは信用せず、実際に解凍したバイト数で
+        エントリサイズ上限・圧縮率上限・アーカイブ全体の解凍量上限を判定する。
+        上限を超えた時点で読み込みを中断するため、メモリ使用量は上限で抑えられる。
+        詳細検証モードでは、検証スレッドが解凍済みのデータを受け取る。
+
+        Raises:
+            ZipSafetyError: いずれかの上限を超えた場合
+            OperationCancelled: 解凍中にキャンセルされた場合
+        """
+        if self._verifier is not None:
+            data = self._verifier.take(name)
+            if data is not None:
+                return data
+        return self._read_guarded(self.getinfo(name), keep=True)
+
+    def _read_guarded(self, info: zipfile.ZipInfo, keep: bool, count_budget: bool = True) -> Optional[bytes]:
+        """
+        上限付きでエントリを解凍（keep=Falseの場合は検証のみでデータを保持しない）
+
+        count_budget=False は検証済みエントリの再読み込み用で、総解凍量に二重に加算しない。
+        """
+        name = info.filename
+        max_entry = ZIP_SAFETY_LIMITS['max_entry_size_mb'] * 1024 * 1024
+        max_ratio = ZIP_SAFETY_LIMITS['max_compression_ratio']
+        compressed = max(info.compress_size, 1)
+
+        chunks = []
+        size = 0
+        # ZipExtFileは末尾まで読み切った時点でCRC-32を照合する（不一致はBadZipFile）
+        with self._zf.open(info) as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                check_cancelled(self.cancel_token)
+                size += len(chunk)
+                if size > max_entry:
+                    raise ZipSafetyError(
+                        f"エントリの解凍後サイズが上限を超えました: {name} "
+                        f"(上限: {ZIP_SAFETY_LIMITS['max_entry_size_mb']}MB)"
+                    )
+                if size >= RATIO_CHECK_MIN_BYTES and size / compressed > max_ratio:
+                    raise ZipSafetyError(
+                        f"エントリの圧縮率が異常です: {name} "
+                        f"(圧縮率 {size / compressed:.0f}倍 > 上限 {max_ratio}倍)"
+                    )
+                if count_budget:
+                    self._consume_budget(len(chunk))
+                if keep:
+                    chunks.append(chunk)
+        return b''.join(chunks) if keep else None
+
+    def _consume_budget(self, n: int) -> None:
+        """アーカイブ全体の解凍量を加算し、総量上限を超えたら中断"""
+        max_total = ZIP_SAFETY_LIMITS['max_uncompressed_size_gb'] * 1024 * 1024 * 1024
+        with self._budget_lock:
+            self.bytes_read += n
+            if self.bytes_read > max_total:
+                raise ZipSafetyError(
+                    f"解凍済みサイズが上限を超えました "
+                    f"(上限: {ZIP_SAFETY_LIMITS['max_uncompressed_size_gb']}GB)"
+                )
+
+    def start_deep_verify(self, max_workers: Optional[int] = None) -> 'ArchiveVerifier':
+        """
+        全エントリの詳細検証をバックグラウンドで開始
+
+        解析対象のエントリから優先的に検証し、解凍済みデータは read() で
+        そのまま解析に渡されるため、検証と解析が並行して進む。
+        """
+        if self._verifier is None:
+            self._verifier = ArchiveVerifier(self, max_workers)
+        return self._verifier
+
+    @property
+    def verifier(self) -> Optional['ArchiveVerifier']:
+        return self._verifier
+
+    def close(self) -> None:
+        if self._verifier is not None:
+            self._verifier.shutdown()
+        self._zf.close()
+
+    def __enter__(self) -> 'FgcpArchive':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# =============================================================================
+# 詳細検証（全エントリの解凍・CRCチェック）
+# =============================================================================
+# 解析で読み込むエントリ（この順で優先的に検証する）
+ANALYSIS_PREFIXES = ('Tables/', 'Pages/', 'MasterPages/', 'ServerCommands/')
+
+
+@dataclass
+class VerifyReport:
+    """詳細検証の結果"""
+    verified: int = 0                                        # 検証に成功したエントリ数
+    verified_bytes: int = 0                                  # 解凍後の総バイト数
+    corrupted: Dict[str, str] = field(default_factory=dict)  # エントリ名 -> エラー内容
+
+    @property
+    def ok(self) -> bool:
+        return not self.corrupted
+
+
+def _analysis_priority(name: str) -> int:
+    if not name.endswith('.json'):
+        return len(ANALYSIS_PREFIXES)
+    for i, prefix in enumerate(ANALYSIS_PREFIXES):
+        if name.startswith(prefix):
+            return i
+    return len(ANALYSIS_PREFIXES)
+
+
+class ArchiveVerifier:
     """
-    logger.info(f"ZIP安全チェック開始: {file_path}")
+    アーカイブ全エントリの並列検証
+
+    スレッドプールで各エントリを上限付きで解凍し、CRC-32を照合する
+    （zlibの解凍処理はGILを解放するため、スレッドで並列化できる）。
+    解析対象のエントリは DEEP_VERIFY_RETAIN_BYTES までの解凍済みデータを保持し、
+    take() で一度だけ受け渡す。上限を超える分は検証結果だけを残し、take() の時点で再度解凍する。
+    """
+
+    def __init__(self, archive: FgcpArchive, max_workers: Optional[int] = None,
+                 retain_bytes: int = DEEP_VERIFY_RETAIN_BYTES):
+        self.archive = archive
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(8, (os.cpu_count() or 1) + 2),
+            thread_name_prefix='fgcp-verify'
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._taken: Dict[str, int] = {}
+        self._retain_limit = retain_bytes
+        self._retained = 0
+
+        infos = [info for info in archive.infos if not info.is_dir()]
+        infos.sort(key=lambda info: _analysis_priority(info.filename))
+        for info in infos:
+            keep = _analysis_priority(info.filename) < len(ANALYSIS_PREFIXES)
+            self._futures[info.filename] = self._executor.submit(self._verify, info, keep)
+        logger.info(f"詳細検証開始: {len(infos):,}エントリ")
+
+    def _verify(self, info: zipfile.ZipInfo, keep: bool):
+        """1エントリを検証（保持枠を確保できた解析対象エントリのみデータを返す）"""
+        if keep:
+            with self._lock:
+                keep = self._retained + info.file_size <= self._retain_limit
+                if keep:
+                    self._retained += info.file_size
+            if not keep:
+                self.archive._read_guarded(info, keep=False)
+                return _NOT_RETAINED
+            try:
+                return self.archive._read_guarded(info, keep=True)
+            except BaseException:
+                self._release(info)
+                raise
+        return self.archive._read_guarded(info, keep=False)
+
+    def _release(self, info: zipfile.ZipInfo) -> None:
+        with self._lock:
+            self._retained -= info.file_size
+
+    def take(self, name: str) -> Optional[bytes]:
+        """
+        検証済みデータを受け取る（検証完了まで待機）
+
+        保持していないエントリはNoneを返す。破損エントリは検証時の例外を送出する。
+        """
+        with self._lock:
+            future = self._futures.get(name)
+        if future is None:
+            return None
+        data = future.result()
+        if data is None:
+            return None
+        info = self.archive.getinfo(name)
+        if data is _NOT_RETAINED:
+            # 保持枠に入らなかったエントリは検証済みのため、総解凍量に加算せずに再度解凍する
+            data = self.archive._read_guarded(info, keep=True, count_budget=False)
+        else:
+            self._release(info)
+        with self._lock:
+            # 受け渡し後はデータを手放す（報告用にサイズのみ残す）
+            self._futures[name] = _done_future(None)
+            self._taken[name] = len(data)
+        return data
 
-    # ファイルサイズチェック
+    def report(self) -> VerifyReport:
+        """全エントリの検証完了を待って結果を返す"""
+        report = VerifyReport()
+        with self._lock:
+            items = list(self._futures.items())
+        for name, future in items:
+            try:
+                future.result()
+            except (ZipSafetyError, zipfile.BadZipFile, zlib.error, EOFError, OSError) as e:
+                report.corrupted[name] = str(e)
+                continue
+            report.verified += 1
+            report.verified_bytes += self.archive.getinfo(name).file_size
+        for name, err in list(report.corrupted.items())[:20]:
+            logger.warning(f"破損エントリ: {name}: {err}")
+        if len(report.corrupted) > 20:
+            logger.warning(f"... 他 {len(report.corrupted) - 20} 件の破損エントリ")
+        logger.info(f"詳細検証完了: 正常={report.verified:,}, 破損={len(report.corrupted):,}")
+        return report
+
+    def shutdown(self) -> None:
+        """未着手の検証を取り消して終了（実行中の検証は完了を待つ）"""
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+# 検証のみ行い、データを保持しなかった解析対象エントリの検証結果
+_NOT_RETAINED = object()
+
+
+def _done_future(result) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+def _check_file_size(file_path: str, confirm_callback: Optional[Callable[[str], bool]]) -> int:
+    """入力ファイルサイズをチェック（上限超過時は確認コールバックで続行可否を問い合わせ）"""
     file_size = os.path.getsize(file_path)
     file_size_mb = file_size / (1024 * 1024)
     max_size_mb = ZIP_SAFETY_LIMITS['max_file_size_mb']
@@ -56,43 +332,106 @@ def check_zip_safety(file_path: str, confirm_callback: Optional[Callable[[str],
                 raise ZipSafetyError("ユーザーによりキャンセルされました")
         else:
             raise ZipSafetyError(msg)
+    return file_size
 
-    try:
-        with zipfile.ZipFile(file_path, 'r') as zf:
-            entries = zf.namelist()
-            entry_count = len(entries)
 
-            # エントリ数チェック
-            max_entries = ZIP_SAFETY_LIMITS['max_entries']
-            if entry_count > max_entries:
-                raise ZipSafetyError(
-                    f"ZIPエントリ数が多すぎます: {entry_count:,} (上限: {max_entries:,})"
-                )
+def _check_central_directory(infos: List[zipfile.ZipInfo], file_size: int) -> dict:
+    """セントラルディレクトリの内容からエントリ数・解凍後サイズをチェック"""
+    entry_count = len(infos)
 
-            # 解凍後サイズチェック
-            total_uncompressed = sum(info.file_size for info in zf.infolist())
-            max_uncompressed = ZIP_SAFETY_LIMITS['max_uncompressed_size_gb'] * 1024 * 1024 * 1024
+    # エントリ数チェック
+    max_entries = ZIP_SAFETY_LIMITS['max_entries']
+    if entry_count > max_entries:
+        raise ZipSafetyError(
+            f"ZIPエントリ数が多すぎます: {entry_count:,} (上限: {max_entries:,})"
+        )
 
-            if total_uncompressed > max_uncompressed:
-                raise ZipSafetyError(
-                    f"解凍後サイズが大きすぎます: {total_uncompressed / (1024**3):.1f}GB "
-                    f"(上限: {ZIP_SAFETY_LIMITS['max_uncompressed_size_gb']}GB)"
-                )
+    # 解凍後サイズチェック
+    total_uncompressed = sum(info.file_size for info in infos)
+    max_uncompressed = ZIP_SAFETY_LIMITS['max_uncompressed_size_gb'] * 1024 * 1024 * 1024
 
-            logger.info(
-                f"ZIP安全チェック完了: エントリ={entry_count:,}, "
-                f"圧縮前={file_size_mb:.1f}MB, 解凍後={total_uncompressed / (1024**2):.1f}MB"
-            )
+    if total_uncompressed > max_uncompressed:
+        raise ZipSafetyError(
+            f"解凍後サイズが大きすぎます: {total_uncompressed / (1024**3):.1f}GB "
+            f"(上限: {ZIP_SAFETY_LIMITS['max_uncompressed_size_gb']}GB)"
+        )
 
-            return {
-                'entries': entry_count,
-                'total_size': total_uncompressed,
-                'file_size': file_size,
-            }
+    logger.info(
+        f"ZIP安全チェック完了: エントリ={entry_count:,}, "
+        f"圧縮前={file_size / (1024 * 1024):.1f}MB, 解凍後={total_uncompressed / (1024**2):.1f}MB"
+    )
 
+    return {
+        'entries': entry_count,
+        'total_size': total_uncompressed,
+        'file_size': file_size,
+    }
+
+
+def open_checked_archive(
+    file_path: str,
+    confirm_callback: Optional[Callable[[str], bool]] = None,
+    deep_verify: bool = False,
+    max_workers: Optional[int] = None
+) -> FgcpArchive:
+    """
+    安全チェックを行い、チェック済みのアーカイブを返す
+
+    返されたアーカイブはそのまま analyze_project(archive=...) に渡せる。
+    呼び出し側で close() すること（with文も使用可）。
+
+    Args:
+        file_path: チェックするファイルパス
+        confirm_callback: サイズ警告時の確認コールバック（Trueで続行）
+        deep_verify: 全エントリの解凍・CRCチェックをバックグラウンドで開始する
+            （結果は archive.verifier.report() で取得）
+        max_workers: 詳細検証のスレッド数（省略時は自動）
+
+    Returns:
+        FgcpArchive: 判定結果（verdict）付きのオープン済みアーカイブ
+
+    Raises:
+        ZipSafetyError: 安全チェック失敗時
+    """
+    logger.info(f"ZIP安全チェック開始: {file_path}")
+    file_size = _check_file_size(file_path, confirm_callback)
+
+    try:
+        zf = zipfile.ZipFile(file_path, 'r')
     except zipfile.BadZipFile as e:
         logger.error(f"不正なZIPファイル: {e}")
         raise ZipSafetyError(f"ファイルが破損しているか、正しいFGCPファイルではありません: {e}")
     except zlib.error as e:
         logger.error(f"ZIP解凍エラー: {e}")
         raise ZipSafetyError(f"ファイルの読み取りに失敗しました（圧縮データ破損）: {e}")
+
+    try:
+        archive = FgcpArchive(file_path, zf)
+        archive.verdict = _check_central_directory(archive.infos, file_size)
+        if deep_verify:
+            archive.start_deep_verify(max_workers)
+        return archive
+    except BaseException:
+        zf.close()
+        raise
+
+
+def check_zip_safety(file_path: str, confirm_callback: Optional[Callable[[str], bool]] = None) -> dict:
+    """
+    ZIPファイルの安全性をチェック
+
+    解析まで続けて行う場合は open_checked_archive() を使用し、
+    アーカイブを開き直さずに analyze_project() へ渡すこと。
+
+    Args:
+        file_path: チェックするファイルパス
+        confirm_callback: サイズ警告時の確認コールバック（Trueで続行）
+
+    Returns:
+        dict: チェック結果（entries, total_size, file_size）
+
+    Raises:
+        ZipSafetyError: 安全チェック失敗時
+    """
+    with open_checked_archive(file_path, confirm_callback) as archive:
+        return archive.verdict
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ローカルHTTP解析サービス
+
+デスクトップアプリをインストールせずに仕様書を取得できるよう、解析・差分比較・出力を
+HTTPで提供する（標準ライブラリのみ使用）。既定では 127.0.0.1 のみで待ち受ける。
+
+使用方法:
+    python -m core serve [--port 8765] [-j ワーカー数] [--work-dir フォルダ]
+
+API:
+    GET  /health                     稼働確認
+    POST /uploads                    .fgcp 本体をリクエストボディで送信（X-Filename でファイル名を指定可）
+                                     → 201 {"upload_id": "<SHA-256>", "size": ...}
+    POST /jobs                       ジョブ登録（JSON）
+                                     {"type": "analyze", "upload_id": "...", "formats": ["word", "excel"]}
+                                     {"type": "compare", "old_upload_id": "...", "new_upload_id": "..."}
+                                     → 202 {"job_id": "...", "status": "queued", "cached": false}
+    GET  /jobs/<job_id>              ジョブの状態と結果
+    GET  /jobs/<job_id>/files/<形式>  出力ファイルのダウンロード（HTMLはZIPにまとめて返す）
+
+同じ内容（SHA-256）・同じオプションのジョブは、実行中・完了済みのジョブをそのまま返す
+（結果は作業フォルダに保存され、再起動後も再利用される）。
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote
+
+from core.batch import EXPORT_FORMATS, analyze_and_export, compare_and_export
+from core.exporters.export_cache import PARTIAL_SUFFIX
+from core.logging_setup import init_worker_logging, logger, worker_log_queue
+from core.safety_checks import ZIP_SAFETY_LIMITS
+
+
+SERVICE_VERSION = "1.1.0"
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# 待機中を含めて受け付けるジョブ数の上限（超過時は 503）
+MAX_PENDING_JOBS = 64
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def get_default_work_dir() -> Path:
+    """作業フォルダ（アップロード・出力結果の保存先）"""
+    return Path.home() / '.forguncyinsight' / 'service'
+
+
+def _safe_filename(name: str) -> str:
+    """アップロードされたファイル名からパス要素と危険な文字を除く"""
+    name = Path(unquote(name or '').replace('\\', '/')).name
+    name = re.sub(r'[<>:"|?*\x00-\x1f]', '_', name).strip(' .')
+    if not name.lower().endswith('.fgcp'):
+        name = (name or 'project') + '.fgcp'
+    return name
+
+
+# =============================================================================
+# ジョブ管理
+# =============================================================================
+@dataclass
+class Job:
+    """解析ジョブ"""
+    job_id: str
+    kind: str                     # 'analyze', 'compare'
+    cache_key: str
+    result_dir: str
+    status: str = 'queued'        # 'queued'（実行待ち・実行中）, 'done', 'error'
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'type': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+def _run_analyze(file_path: str, output_dir: str, formats: list, limits: dict) -> dict:
+    return analyze_and_export(file_path, output_dir, formats=formats, limits=limits)
+
+
+def _run_compare(old_path: str, new_path: str, output_dir: str, limits: dict) -> dict:
+    return compare_and_export(old_path, new_path, output_dir, limits=limits)
+
+
+class WorkerPoolError(Exception):
+    """ワーカープロセスの異常終了でジョブを受け付けられない"""
+    pass
+
+
+class JobManager:
+    """
+    ジョブキューと結果キャッシュ
+
+    ジョブはプロセスプールで実行し、同時実行数はワーカー数で制限する。
+    キャッシュキーは入力の内容ハッシュとオプションから作るため、同じファイルを
+    再度アップロードしても再解析しない。
+    """
+
+    def __init__(self, work_dir: Path, workers: int, limits: dict):
+        self.work_dir = Path(work_dir)
+        self.upload_dir = self.work_dir / 'uploads'
+        self.results_dir = self.work_dir / 'results'
+        self.limits = limits
+        self.workers = max(1, workers)
+        self._pool = self._new_pool()
+        self._lock = threading.Lock()
+        # HTML出力のZIP作成を直列化（同じジョブの同時ダウンロードで書きかけのZIPを返さない）
+        self._archive_lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # ワーカーのログは親プロセスがまとめてログファイルに書き込む
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker_logging,
+                                   initargs=(worker_log_queue(),))
+
+    # ---- アップロード --------------------------------------------------------
+    def store_upload(self, stream, length: int, filename: str) -> Tuple[str, int]:
+        """リクエストボディを逐次ハッシュしながら保存し、内容ハッシュを返す"""
+        tmp_path = self.upload_dir / f'.{uuid.uuid4().hex}.tmp'
+        h = hashlib.sha256()
+        remaining = length
+        try:
+            with open(tmp_path, 'wb') as f:
+                while remaining > 0:
+                    chunk = stream.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise ValueError('アップロードが途中で切断されました')
+                    h.update(chunk)
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            upload_id = h.hexdigest()
+            target_dir = self.upload_dir / upload_id
+            if self.find_upload(upload_id) is None:
+                target_dir.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, target_dir / _safe_filename(filename))
+            return upload_id, length
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def find_upload(self, upload_id: str) -> Optional[str]:
+        if not upload_id or not _SHA256_PATTERN.match(upload_id):
+            return None
+        target_dir = self.upload_dir / upload_id
+        if not target_dir.is_dir():
+            return None
+        files = sorted(target_dir.glob('*.fgcp'))
+        return str(files[0]) if files else None
+
+    # ---- ジョブ ---------------------------------------------------------------
+    def submit(self, spec: dict) -> Tuple[Job, bool]:
+        """
+        ジョブを登録し (ジョブ, キャッシュ利用有無) を返す
+
+        Raises:
+            ValueError: 要求内容が不正
+            OverflowError: 待機ジョブ数が上限に達している
+            WorkerPoolError: ワーカープロセスが異常終了していた（プールは作り直し済み）
+        """
+        kind = spec.get('type', 'analyze')
+        if kind == 'analyze':
+            source = self.find_upload(spec.get('upload_id'))
+            if source is None:
+                raise ValueError('upload_id が見つかりません')
+            requested = spec.get('formats') or list(EXPORT_FORMATS)
+            if not isinstance(requested, list) or any(f not in EXPORT_FORMATS for f in requested):
+                raise ValueError(f"formats は {', '.join(EXPORT_FORMATS)} のリストで指定してください")
+            formats = [f for f in EXPORT_FORMATS if f in requested]
+            key_parts = ['analyze', spec['upload_id'], ','.join(formats)]
+        elif kind == 'compare':
+            old_source = self.find_upload(spec.get('old_upload_id'))
+            new_source = self.find_upload(spec.get('new_upload_id'))
+            if old_source is None or new_source is None:
+                raise ValueError('old_upload_id / new_upload_id が見つかりません')
+            key_parts = ['compare', spec['old_upload_id'], spec['new_upload_id']]
+        else:
+            raise ValueError(f"不明なジョブ種別: {kind}")
+
+        key_parts += [SERVICE_VERSION, json.dumps(self.limits, sort_keys=True, default=str)]
+        cache_key = hashlib.sha256('\n'.join(key_parts).encode('utf-8')).hexdigest()
+
+        with self._lock:
+            job_id = self._by_key.get(cache_key)
+            if job_id and self._jobs[job_id].status != 'error':
+                return self._jobs[job_id], True
+
+            result_dir = self.results_dir / cache_key
+            job = Job(job_id=uuid.uuid4().hex, kind=kind, cache_key=cache_key, result_dir=str(result_dir))
+
+            # 前回起動時の結果が残っていれば再利用
+            saved = self._load_saved_result(result_dir)
+            if saved is not None:
+                job.status, job.result, job.finished_at = 'done', saved, time.time()
+                self._register(job)
+                return job, True
+
+            pending = sum(1 for j in self._jobs.values() if j.status in ('queued', 'running'))
+            if pending >= MAX_PENDING_JOBS:
+                raise OverflowError('処理待ちのジョブが多すぎます。しばらくしてから再実行してください')
+
+            out_dir = str(result_dir / 'out')
+            try:
+                if kind == 'analyze':
+                    future = self._pool.submit(_run_analyze, source, out_dir, formats, self.limits)
+                else:
+                    future = self._pool.submit(_run_compare, old_source, new_source, out_dir, self.limits)
+            except BrokenProcessPool:
+                # 実行中だったジョブは _on_done でエラーになっている。次の要求から新しいプールで受け付ける
+                logger.warning("ワーカープロセスが異常終了したため、ワーカープールを作り直します")
+                self._pool.shutdown(wait=False)
+                self._pool = self._new_pool()
+                raise WorkerPoolError('ワーカープロセスが異常終了しました。再実行してください')
+            self._register(job)
+        future.add_done_callback(lambda f, j=job: self._on_done(j, f))
+        logger.info(f"ジョブ登録: {job.job_id} ({kind})")
+        return job, False
+
+    def _register(self, job: Job) -> None:
+        self._jobs[job.job_id] = job
+        self._by_key[job.cache_key] = job.job_id
+
+    def _load_saved_result(self, result_dir: Path) -> Optional[dict]:
+        try:
+            with open(result_dir / 'result.json', 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 出力ファイルが削除されていれば再実行する
+        if not all(os.path.exists(p) for p in result.get('outputs', {}).values()):
+            return None
+        return result
+
+    def _on_done(self, job: Job, future: Future) -> None:
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"ジョブ実行エラー {job.job_id}: {e}")
+            with self._lock:
+                job.status, job.error, job.finished_at = 'error', f"{type(e).__name__}: {e}", time.time()
+            return
+
+        with self._lock:
+            job.result = result
+            job.finished_at = time.time()
+            if result.get('status') == 'ok':
+                job.status = 'done'
+            else:
+                job.status, job.error = 'error', result.get('error')
+        if job.status == 'done':
+            try:
+                os.makedirs(job.result_dir, exist_ok=True)
+                tmp_path = os.path.join(job.result_dir, 'result.json.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, ensure_ascii=False)
+                os.replace(tmp_path, os.path.join(job.result_dir, 'result.json'))
+            except OSError as e:
+                logger.warning(f"ジョブ結果の保存に失敗しました {job.job_id}: {e}")
+        logger.info(f"ジョブ完了: {job.job_id} ({job.status})")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def output_file(self, job: Job, fmt: str) -> Optional[str]:
+        """ダウンロード用の出力ファイル（HTMLはフォルダをZIPにまとめる）"""
+        path = (job.result or {}).get('outputs', {}).get(fmt)
+        if not path or not os.path.exists(path):
+            return None
+        if fmt != 'html':
+            return path
+        html_dir = os.path.dirname(path)
+        archive = html_dir + '.zip'
+        with self._archive_lock:
+            if not os.path.exists(archive) or os.path.getmtime(archive) < os.path.getmtime(path):
+                # 一時名で作成してから置き換える（作成途中のZIPが archive の名前で見えることはない）
+                partial = shutil.make_archive(html_dir + PARTIAL_SUFFIX, 'zip', html_dir)
+                os.replace(partial, archive)
+        return archive
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool = self._pool
+        pool.shutdown(wait=True)
+
+
+# =============================================================================
+# HTTPハンドラ
+# =============================================================================
+class ServiceHandler(BaseHTTPRequestHandler):
+    """解析サービスのリクエストハンドラ"""
+
+    server_version = f"ForguncyInsight/{SERVICE_VERSION}"
+    jobs: JobManager = None  # make_server() で設定
+
+    def log_message(self, format, *args):
+        logger.debug(f"HTTP {self.address_string()} {format % args}")
+
+    def _send_json(self, status: HTTPStatus, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {'error': message})
+
+    def _content_length(self) -> Optional[int]:
+        """Content-Length（未指定・数値でない・負の値は None）"""
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    def do_GET(self):
+        parts = [p for p in self.path.split('?', 1)[0].split('/') if p]
+        if parts == ['health']:
+            self._send_json(HTTPStatus.OK, {'status': 'ok', 'version': SERVICE_VERSION})
+            return
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, 'ジョブが見つかりません')
+            elif len(parts) == 2:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+            elif len(parts) == 4 and parts[2] == 'files':
+                self._send_file(job, parts[3])
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, '不明なパスです')
+            return
+        self._send_error(HTTPStatus.NOT_FOUND, '不明なパスです')
+
+    def _send_file(self, job: Job, fmt: str) -> None:
+        if job.status != 'done':
+            self._send_error(HTTPStatus.CONFLICT, f"ジョブが完了していません ({job.status})")
+            return
+        path = self.jobs.output_file(job, fmt)
+        if path is None:
+            self._send_error(HTTPStatus.NOT_FOUND, f"出力ファイルがありません: {fmt}")
+            return
+        size = os.path.getsize(path)
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
+        ascii_name = os.path.basename(path).encode('ascii', 'replace').decode().replace('?', '_')
+        self.send_header('Content-Disposition', f'attachment; filename="{ascii_name}"')
+        self.end_headers()
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        length = self._content_length()
+        if length is None:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, 'Content-Length に0以上の値を指定してください')
+            return
+
+        if path == '/uploads':
+            max_bytes = ZIP_SAFETY_LIMITS['max_file_size_mb'] * 1024 * 1024
+            if length > max_bytes:
+                self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                 f"ファイルサイズが上限を超えています (上限: {ZIP_SAFETY_LIMITS['max_file_size_mb']}MB)")
+                return
+            try:
+                upload_id, size = self.jobs.store_upload(self.rfile, length, self.headers.get('X-Filename', ''))
+            except ValueError as e:
+                self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+                return
+            self._send_json(HTTPStatus.CREATED, {'upload_id': upload_id, 'size': size})
+            return
+
+        if path == '/jobs':
+            try:
+                spec = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(spec, dict):
+                    raise ValueError('JSONオブジェクトで指定してください')
+                job, cached = self.jobs.submit(spec)
+            except (OverflowError, WorkerPoolError) as e:
+                self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e))
+                return
+            except ValueError as e:
+                self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+                return
+            body = job.to_dict()
+            body['cached'] = cached
+            self._send_json(HTTPStatus.OK if job.status == 'done' else HTTPStatus.ACCEPTED, body)
+            return
+
+        self._send_error(HTTPStatus.NOT_FOUND, '不明なパスです')
+
+
+def make_server(host: str, port: int, jobs: JobManager) -> ThreadingHTTPServer:
+    """サービスのHTTPサーバーを作成（port=0で空きポートを自動割り当て）"""
+    handler = type('BoundServiceHandler', (ServiceHandler,), {'jobs': jobs})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 2,
+          work_dir: Optional[str] = None, limits: Optional[dict] = None) -> int:
+    """サービスを起動し、Ctrl+Cで停止するまで処理する"""
+    from licensing.verify import FEATURE_LIMITS
+
+    jobs = JobManager(Path(work_dir) if work_dir else get_default_work_dir(), workers,
+                      limits or FEATURE_LIMITS['FREE'])
+    httpd = make_server(host, port, jobs)
+    logger.info(f"解析サービス起動: http://{host}:{httpd.server_address[1]}/ (ワーカー={workers}, 作業フォルダ={jobs.work_dir})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        jobs.shutdown()
+        logger.info("解析サービス終了")
+    return 0
@@ -54,6 +54,7 @@ FEATURE_LIMITS = {
         'max_workflows': 1,
         'word_export': False,
         'excel_export': False,
+        'html_export': False,
         'diff_compare': False,
         'commercial_use': False,
     },
@@ -64,6 +65,7 @@ FEATURE_LIMITS = {
         'max_workflows': float('inf'),
         'word_export': True,
         'excel_export': True,
+        'html_export': True,
         'diff_compare': True,
         'commercial_use': True,
     },
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動時間ベンチマーク
+
+GUIの各エントリポイント（main.py → ui.app_tk / ForguncyInsight.py）について、
+ウィンドウ表示前に行われるモジュール読み込みの時間を計測し、
+`python -X importtime` の結果をトップレベルパッケージ別に集計して表示する。
+あわせて、初回出力時（またはバックグラウンド）に遅延読み込みされる
+エクスポーターの読み込み時間も計測する。
+
+使用方法:
+    python tools/bench_startup.py [-n 計測回数] [--top 表示件数] [--json]
+
+各計測は新しいインタープリタで行う（__pycache__ は作成済みの状態で計測）。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 計測対象: (表示名, 読み込むモジュール)
+TARGETS = [
+    ('main.py (ui.app_tk)', 'ui.app_tk'),
+    ('ForguncyInsight.py', 'ForguncyInsight'),
+    ('CLI (core.cli)', 'core.cli'),
+    ('遅延読み込み: エクスポーター', 'core.exporters; core.exporters.preload()'),
+]
+
+
+def _run_import(statement: str, importtime: bool) -> Tuple[float, str]:
+    """新しいインタープリタで import を実行し (経過秒, stderr) を返す"""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', 'import ' + statement]
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{statement} の読み込みに失敗しました:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def _breakdown(stderr: str) -> Dict[str, int]:
+    """-X importtime の出力をトップレベルパッケージ別の自己時間（マイクロ秒）に集計"""
+    totals: Dict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, _, name = line[len('import time:'):].split('|', 2)
+            totals[name.strip().split('.')[0]] += int(self_us)
+        except ValueError:
+            continue
+    return dict(totals)
+
+
+def measure(statement: str, runs: int) -> dict:
+    # 1回目は __pycache__ の作成を兼ねるため計測に含めない
+    _run_import(statement, importtime=False)
+    wall = [_run_import(statement, importtime=False)[0] for _ in range(runs)]
+    _, stderr = _run_import(statement, importtime=True)
+    breakdown = _breakdown(stderr)
+    return {
+        'wall_median_ms': round(statistics.median(wall) * 1000, 1),
+        'wall_min_ms': round(min(wall) * 1000, 1),
+        'import_total_ms': round(sum(breakdown.values()) / 1000, 1),
+        'breakdown_ms': {k: round(v / 1000, 1) for k, v in sorted(breakdown.items(), key=lambda kv: -kv[1])},
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='GUI起動時のモジュール読み込み時間を計測')
+    parser.add_argument('-n', '--runs', type=int, default=5, help='計測回数（既定: 5）')
+    parser.add_argument('--top', type=int, default=12, help='内訳の表示件数（既定: 12）')
+    parser.add_argument('--json', action='store_true', help='結果をJSONで出力')
+    args = parser.parse_args(argv)
+
+    results = {label: measure(statement, max(1, args.runs)) for label, statement in TARGETS}
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    for label, r in results.items():
+        print(f"\n== {label}")
+        print(f"   起動(プロセス全体) 中央値 {r['wall_median_ms']:.1f} ms / 最小 {r['wall_min_ms']:.1f} ms, "
+              f"import合計 {r['import_total_ms']:.1f} ms")
+        for name, ms in list(r['breakdown_ms'].items())[:args.top]:
+            print(f"   {name:<28} {ms:8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
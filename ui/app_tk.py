@@ -19,11 +19,15 @@ from tkinter import (
     LEFT, RIGHT, BOTH, END, X, Y, W, E, N, S, VERTICAL, HORIZONTAL, WORD
 )
 
+from core.analysis import REFERENCE_KIND_LABELS, ProjectIndex
+from core.cancellation import CancellationToken, OperationCancelled
+from core.events import AnalysisEventBus, EventBatch
 from core.logging_setup import logger, get_log_dir
-from core.safety_checks import ZipSafetyError, check_zip_safety
+from core.safety_checks import ZipSafetyError, open_checked_archive
 from core.models import AnalysisEvent
 from core.fgcp_parser import analyze_project, compare_projects
-from core.exporters import generate_spec_document, generate_excel_document, generate_diff_excel, EXCEL_AVAILABLE
+# エクスポーター（python-docx / openpyxl）は初回使用時に読み込む（起動を速くするため）
+from core import exporters
 from licensing.verify import (
     LicenseManager, PRODUCT_NAME, PRODUCT_CODE,
     PURCHASE_URL, TRIAL_URL, PRICE_STANDARD
@@ -76,6 +80,80 @@ FONTS = {
     "small": (FONT_FAMILY, 10),
 }
 
+# イベントのポーリング間隔（ms）とログ表示欄の最大行数（超えた分は古い行から削除）
+EVENT_POLL_INTERVAL_MS = 100
+LOG_MAX_LINES = 2000
+
+
+# =============================================================================
+# 影響調査ダイアログ
+# =============================================================================
+class ImpactAnalysisDialog:
+    """カラムの影響調査ダイアログ（解析時に作成した参照索引を検索する）"""
+
+    def __init__(self, parent: Tk, analysis, index: ProjectIndex):
+        self.index = index
+        self.columns = {t.name: [c.name for c in t.columns] for t in analysis.tables}
+
+        self.dialog = Toplevel(parent)
+        self.dialog.title(f"影響調査 - {analysis.project_name}")
+        self.dialog.geometry("900x560")
+        self.dialog.transient(parent)
+        self.dialog.configure(bg=COLORS["bg"])
+
+        # 検索条件
+        form = Frame(self.dialog, bg=COLORS["bg"], padx=10, pady=10)
+        form.pack(fill='x')
+        Label(form, text="テーブル:", font=FONTS["body"], bg=COLORS["bg"], fg=COLORS["text"]).pack(side='left')
+        self.table_var = StringVar()
+        self.table_combo = ttk.Combobox(form, textvariable=self.table_var, values=sorted(self.columns),
+                                        state='readonly', width=28)
+        self.table_combo.pack(side='left', padx=(5, 15))
+        self.table_combo.bind('<<ComboboxSelected>>', self._on_table_selected)
+
+        Label(form, text="カラム:", font=FONTS["body"], bg=COLORS["bg"], fg=COLORS["text"]).pack(side='left')
+        self.column_var = StringVar()
+        self.column_combo = ttk.Combobox(form, textvariable=self.column_var, state='readonly', width=28)
+        self.column_combo.pack(side='left', padx=(5, 15))
+        self.column_combo.bind('<<ComboboxSelected>>', lambda e: self.search())
+
+        self.summary_label = Label(self.dialog, text="テーブルとカラムを選択してください", anchor='w',
+                                   font=FONTS["small"], bg=COLORS["bg"], fg=COLORS["text_secondary"], padx=10)
+        self.summary_label.pack(fill='x')
+
+        # 参照箇所一覧
+        tree_frame = Frame(self.dialog, bg=COLORS["bg"], padx=10, pady=10)
+        tree_frame.pack(fill=BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=('kind', 'location', 'detail'), show='headings')
+        for col, text, width in (('kind', '種別', 100), ('location', '場所', 320), ('detail', '内容', 440)):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, anchor='w')
+        scrollbar = Scrollbar(tree_frame, orient=VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+
+    def _on_table_selected(self, event=None):
+        self.column_combo.config(values=self.columns.get(self.table_var.get(), []))
+        self.column_var.set('')
+        self.tree.delete(*self.tree.get_children())
+        self.summary_label.config(text="カラムを選択してください")
+
+    def search(self):
+        """選択したカラムの参照箇所を表示"""
+        table, column = self.table_var.get(), self.column_var.get()
+        if not table or not column:
+            return
+        references = self.index.impact_of(table, column)
+        pages = self.index.affected_pages(references)
+        self.tree.delete(*self.tree.get_children())
+        for ref in references:
+            self.tree.insert('', END, values=(REFERENCE_KIND_LABELS.get(ref.kind, ref.kind), ref.location, ref.detail))
+        text = f"{table}.{column}: 参照 {len(references)}件 / 影響するページ {len(pages)}件"
+        if pages:
+            text += f"（{', '.join(pages[:10])}{' ほか' if len(pages) > 10 else ''}）"
+        self.summary_label.config(text=text)
+
 
 # =============================================================================
 # ライセンス認証ダイアログ
@@ -324,9 +402,14 @@ class ForguncyInsightApp:
             pass
 
         # 非同期処理用
-        self.event_queue = queue.Queue()
+        self.event_bus = AnalysisEventBus()
         self.analysis_thread = None
         self.is_analyzing = False
+        self.cancel_token = None
+
+        # 影響調査用（直近の解析結果と参照索引）
+        self.last_analysis = None
+        self.project_index = None
 
         self.license_manager = LicenseManager()
         self.file_path = StringVar()
@@ -336,8 +419,11 @@ class ForguncyInsightApp:
         self.setup_styles()
         self.setup_ui()
 
-        # イベントキューのポーリング開始
-        self._poll_event_queue()
+        # イベントバスのポーリング開始
+        self._poll_events()
+
+        # ウィンドウ表示後にエクスポーターをバックグラウンドで読み込んでおく
+        self.root.after(500, self._preload_exporters)
 
         # 起動時ログ
         logger.info(f"アプリケーション起動: {VERSION_INFO}")
@@ -361,6 +447,18 @@ class ForguncyInsightApp:
         style.configure("TCheckbutton", background=COLORS["surface"], font=FONTS["body"])
         style.configure("TProgressbar", thickness=8)
 
+    def _preload_exporters(self):
+        """python-docx / openpyxl をバックグラウンドで読み込み、初回出力の待ち時間をなくす"""
+        def preload():
+            try:
+                exporters.preload()
+                logger.debug("エクスポーターの事前読み込み完了")
+            except Exception as e:
+                # 読み込みに失敗しても出力時に改めて読み込むため警告のみ
+                logger.warning(f"エクスポーターの事前読み込みに失敗しました: {e}")
+
+        threading.Thread(target=preload, daemon=True).start()
+
     def _show_license_dialog(self):
         """ライセンスダイアログを表示"""
         dialog = LicenseActivationDialog(self.root, self.license_manager)
@@ -495,6 +593,17 @@ class ForguncyInsightApp:
         self.output_excel.pack(anchor='w')
         self.output_excel.state(['selected'] if self.license_manager.limits.get('excel_export') else ['disabled'])
 
+        self.output_html = ttk.Checkbutton(format_frame, text="HTML (大規模プロジェクト向け)")
+        self.output_html.pack(anchor='w', pady=3)
+        self.output_html.state(['selected'] if self.license_manager.limits.get('html_export') else ['disabled'])
+
+        # 入力チェック
+        Label(format_frame, text="入力チェック:",
+              font=FONTS["body"], bg=COLORS["surface"], fg=COLORS["text"]).pack(anchor='w', pady=(10, 0))
+        self.deep_verify = ttk.Checkbutton(format_frame, text="全エントリを詳細検証 (CRCチェック・受領ファイル向け)")
+        self.deep_verify.pack(anchor='w', pady=3)
+        self.deep_verify.state(['!alternate'])
+
         # プログレス
         progress_frame = Frame(self.tab_analyze, bg=COLORS["surface"])
         progress_frame.pack(fill='x', pady=20)
@@ -508,7 +617,15 @@ class ForguncyInsightApp:
         self.analyze_btn = Button(self.tab_analyze, text="解析開始", command=self.start_analysis,
                                    font=FONTS["heading"], bg=COLORS["primary"], fg='white',
                                    padx=40, pady=12, relief='flat', cursor='hand2')
-        self.analyze_btn.pack(pady=15)
+        self.analyze_btn.pack(pady=(15, 5))
+        self.cancel_btn = Button(self.tab_analyze, text="キャンセル", command=self.cancel_analysis,
+                                  font=FONTS["body"], bg=COLORS["surface"], fg=COLORS["text_muted"],
+                                  padx=20, pady=4, relief='flat', cursor='hand2', state='disabled')
+        self.cancel_btn.pack(pady=(0, 10))
+        self.impact_btn = Button(self.tab_analyze, text="影響調査（カラムの参照箇所）", command=self.open_impact_dialog,
+                                  font=FONTS["body"], bg=COLORS["surface"], fg=COLORS["primary"],
+                                  padx=20, pady=4, relief='flat', cursor='hand2', state='disabled')
+        self.impact_btn.pack(pady=(0, 10))
 
         # Free版の制限表示
         if not self.license_manager.is_activated:
@@ -748,35 +865,63 @@ class ForguncyInsightApp:
         self.status_label.config(text=msg)
         self.root.update_idletasks()
 
-    def _poll_event_queue(self):
-        """イベントキューをポーリングしてUI更新（100ms間隔）"""
+    def _poll_events(self):
+        """
+        イベントバスをポーリングしてUI更新（100ms間隔）
+
+        進捗は最新の値だけを反映し、ログはまとめて1回で挿入する。
+        """
         try:
-            while True:
-                event = self.event_queue.get_nowait()
-                self._handle_event(event)
-        except queue.Empty:
-            pass
-        # 次のポーリングをスケジュール
-        self.root.after(100, self._poll_event_queue)
+            self._apply_event_batch(self.event_bus.drain())
+        finally:
+            # 次のポーリングをスケジュール
+            self.root.after(EVENT_POLL_INTERVAL_MS, self._poll_events)
+
+    def _apply_event_batch(self, batch: EventBatch):
+        """取り出したイベントをUIに反映（進捗 → ログ → その他の順）"""
+        if batch.empty:
+            return
+        if batch.progress is not None:
+            self.update_progress(*batch.progress)
+        lines = list(batch.logs)
+        if batch.dropped_logs:
+            lines.insert(0, ('WARNING', f"... ログ {batch.dropped_logs}行を省略しました"))
+        if lines:
+            self._append_log_lines(lines)
+        for event in batch.events:
+            self._handle_event(event)
 
     def _handle_event(self, event: AnalysisEvent):
-        """イベントを処理"""
-        if event.event_type == 'progress':
-            pct, msg = event.data
-            self.update_progress(pct, msg)
-        elif event.event_type == 'log':
-            level, msg = event.data
-            self._log_to_ui(msg, level)
-        elif event.event_type == 'complete':
+        """イベントを処理（progress / log は _apply_event_batch で集約済み）"""
+        if event.event_type == 'complete':
             self._on_analysis_complete(event.data)
         elif event.event_type == 'error':
             self._on_analysis_error(event.data)
+        elif event.event_type == 'cancelled':
+            self._on_analysis_cancelled()
+        elif event.event_type == 'confirm':
+            event.data['reply'].put(messagebox.askyesno("確認", event.data['message']))
 
     def _log_to_ui(self, msg: str, level: str = 'INFO'):
         """UIのログ表示欄にメッセージを追加"""
+        self._append_log_lines([(level, msg)])
+
+    def _append_log_lines(self, lines: list):
+        """
+        複数行のログを1回の挿入で追加（lines: [(level, msg), ...]）
+
+        表示欄は LOG_MAX_LINES 行を上限とし、超えた分は古い行から削除する。
+        """
         timestamp = datetime.now().strftime('%H:%M:%S')
+        args = []
+        for level, msg in lines[-LOG_MAX_LINES:]:
+            args.extend((f"[{timestamp}] {msg}\n", level))
         self.log_text.configure(state='normal')
-        self.log_text.insert(END, f"[{timestamp}] {msg}\n", level)
+        self.log_text.insert(END, *args)
+        # 末尾の改行の後に空行が1行あるため、行数は end-1c の行番号 - 1
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete('1.0', f'{excess + 1}.0')
         self.log_text.see(END)
         self.log_text.configure(state='disabled')
 
@@ -787,8 +932,14 @@ class ForguncyInsightApp:
         self.log_text.configure(state='disabled')
 
     def _confirm_large_file(self, msg: str) -> bool:
-        """大きいファイルの処理確認"""
-        return messagebox.askyesno("確認", msg)
+        """
+        大きいファイルの処理確認（バックグラウンドスレッドから呼び出す）
+
+        ダイアログはUIスレッドで表示し、回答が届くまで呼び出し元スレッドを待機させる。
+        """
+        reply = queue.Queue(maxsize=1)
+        self.event_bus.put(AnalysisEvent('confirm', {'message': msg, 'reply': reply}))
+        return reply.get()
 
     def start_analysis(self):
         """解析を開始（非同期）"""
@@ -802,19 +953,11 @@ class ForguncyInsightApp:
 
         file_path = self.file_path.get()
 
-        # ZIP安全チェック（UIスレッドで実行、確認ダイアログ表示のため）
-        try:
-            self._log_to_ui(f"ファイルチェック中: {Path(file_path).name}")
-            check_zip_safety(file_path, self._confirm_large_file)
-        except ZipSafetyError as e:
-            logger.warning(f"ZIP安全チェック失敗: {e}")
-            self._log_to_ui(str(e), 'ERROR')
-            messagebox.showerror("ファイルエラー", str(e))
-            return
-
         # UI状態を更新
         self.is_analyzing = True
+        self.cancel_token = CancellationToken()
         self.analyze_btn.config(state='disabled', text="解析中...")
+        self.cancel_btn.config(state='normal')
         self.progress['value'] = 0
 
         self._log_to_ui(f"解析開始: {Path(file_path).name}")
@@ -822,62 +965,116 @@ class ForguncyInsightApp:
         # バックグラウンドスレッドで解析実行
         self.analysis_thread = threading.Thread(
             target=self._run_analysis_thread,
-            args=(file_path, self.output_dir.get(), self.license_manager.limits),
+            args=(file_path, self.output_dir.get(), self.license_manager.limits,
+                  self.deep_verify.instate(['selected']), self.cancel_token),
             daemon=True
         )
         self.analysis_thread.start()
 
-    def _run_analysis_thread(self, file_path: str, output_dir: str, limits: dict):
-        """解析処理（バックグラウンドスレッド）"""
+    def cancel_analysis(self):
+        """解析・出力のキャンセルを要求（処理スレッドは次の区切りで停止する）"""
+        if not self.is_analyzing or self.cancel_token is None:
+            return
+        self.cancel_token.cancel()
+        self.cancel_btn.config(state='disabled')
+        self.status_label.config(text="キャンセルしています...")
+
+    def _run_analysis_thread(self, file_path: str, output_dir: str, limits: dict, deep_verify: bool = False,
+                             cancel_token: CancellationToken = None):
+        """
+        解析処理（バックグラウンドスレッド）
+
+        キャンセル時は解析・出力を途中で打ち切る。出力ファイルは一時パスに書き出してから
+        置き換えるため、書きかけのファイルは残らない（出力済みのファイルはそのまま残る）。
+        """
         generated_files = []
         try:
             # 進捗コールバック（キュー経由でUIに通知）
             def progress_callback(pct, msg):
-                self.event_queue.put(AnalysisEvent('progress', (pct, msg)))
-                self.event_queue.put(AnalysisEvent('log', ('INFO', msg)))
-
-            progress_callback(10, "解析を開始しています...")
-            analysis = analyze_project(file_path, progress_callback, limits)
+                self.event_bus.progress(pct, msg)
+                self.event_bus.log('INFO', msg)
+
+            # ZIP安全チェック（確認ダイアログはイベントキュー経由でUIスレッドに表示）
+            self.event_bus.put(AnalysisEvent('log', ('INFO', f"ファイルチェック中: {Path(file_path).name}")))
+            archive = open_checked_archive(file_path, self._confirm_large_file, deep_verify=deep_verify)
+
+            # チェック済みのアーカイブをそのまま解析に渡す（再オープンしない）
+            # 詳細検証時は検証スレッドが解凍したデータを解析が順に受け取る
+            with archive:
+                progress_callback(10, "解析を開始しています...")
+                analysis = analyze_project(file_path, progress_callback, limits, archive=archive,
+                                           cancel_token=cancel_token)
+                verify_report = archive.verifier.report() if archive.verifier else None
+
+            # 影響調査用のカラム参照索引（静的解析で作成済みの索引を使い、UIスレッドでは検索だけ行う）
+            project_index = analysis.project_index or ProjectIndex(analysis)
+
+            if verify_report is not None:
+                for name, err in verify_report.corrupted.items():
+                    self.event_bus.put(AnalysisEvent('log', ('WARNING', f"破損エントリ: {name} ({err})")))
+                self.event_bus.put(AnalysisEvent('log', (
+                    'INFO' if verify_report.ok else 'WARNING',
+                    f"詳細検証: 正常 {verify_report.verified}件 / 破損 {len(verify_report.corrupted)}件"
+                )))
 
             # Word出力
             if limits.get('word_export'):
                 progress_callback(70, "Word仕様書を生成しています...")
-                word_path = generate_spec_document(analysis, output_dir)
+                word_path = exporters.generate_spec_document(analysis, output_dir, cancel_token=cancel_token)
                 generated_files.append(word_path)
                 logger.info(f"Word出力完了: {word_path}")
 
             # Excel出力
-            if limits.get('excel_export') and EXCEL_AVAILABLE:
+            if limits.get('excel_export') and exporters.EXCEL_AVAILABLE:
                 progress_callback(85, "Excel仕様書を生成しています...")
-                excel_path = generate_excel_document(analysis, output_dir)
+                excel_path = exporters.generate_excel_document(analysis, output_dir, cancel_token=cancel_token)
                 generated_files.append(excel_path)
                 logger.info(f"Excel出力完了: {excel_path}")
 
+            # HTML出力
+            if limits.get('html_export'):
+                progress_callback(95, "HTMLレポートを生成しています...")
+                html_path = exporters.generate_html_report(analysis, output_dir, cancel_token=cancel_token)
+                generated_files.append(html_path)
+                logger.info(f"HTML出力完了: {html_path}")
+
             progress_callback(100, "完了しました!")
 
             # 完了イベント
-            self.event_queue.put(AnalysisEvent('complete', {
+            self.event_bus.put(AnalysisEvent('complete', {
                 'analysis': analysis,
+                'project_index': project_index,
                 'generated_files': generated_files,
                 'output_dir': output_dir,
+                'verify_report': verify_report,
             }))
 
+        except OperationCancelled:
+            logger.info(f"解析をキャンセルしました: {file_path}")
+            self.event_bus.put(AnalysisEvent('cancelled', {'generated_files': generated_files}))
+        except ZipSafetyError as e:
+            # 安全チェック失敗、または解凍中に上限を超えた場合（宣言サイズを偽装したエントリなど）
+            logger.warning(f"ZIP安全チェック失敗: {e}")
+            self.event_bus.put(AnalysisEvent('error', {'error': str(e), 'safety': True}))
         except Exception as e:
             logger.error(f"解析エラー: {e}\n{traceback.format_exc()}")
-            self.event_queue.put(AnalysisEvent('error', {
+            self.event_bus.put(AnalysisEvent('error', {
                 'error': str(e),
                 'traceback': traceback.format_exc(),
             }))
 
     def _on_analysis_complete(self, data: dict):
         """解析完了時の処理（UIスレッド）"""
-        self.is_analyzing = False
-        self.analyze_btn.config(state='normal', text="解析開始")
+        self._reset_analysis_state()
 
         analysis = data['analysis']
         generated_files = data['generated_files']
         output_dir = data['output_dir']
 
+        self.last_analysis = analysis
+        self.project_index = data['project_index']
+        self.impact_btn.config(state='normal')
+
         self._log_to_ui(f"解析完了: テーブル={analysis.summary.table_count}, ページ={analysis.summary.page_count}")
 
         msg = f"解析が完了しました。\n\nテーブル: {analysis.summary.table_count}件\nページ: {analysis.summary.page_count}件"
@@ -886,7 +1083,13 @@ class ForguncyInsightApp:
             for f in generated_files:
                 self._log_to_ui(f"生成: {f}")
         else:
-            msg += "\n\n※ Word/Excel出力にはStandard版が必要です"
+            msg += "\n\n※ Word/Excel/HTML出力にはStandard版が必要です"
+
+        verify_report = data.get('verify_report')
+        if verify_report is not None and not verify_report.ok:
+            msg += f"\n\n⚠ 破損エントリが {len(verify_report.corrupted)}件 見つかりました（該当エントリは解析から除外）。詳細はログを確認してください。"
+            messagebox.showwarning("完了（破損エントリあり）", msg)
+            return
 
         messagebox.showinfo("完了", msg)
 
@@ -896,15 +1099,39 @@ class ForguncyInsightApp:
             except Exception:
                 pass
 
-    def _on_analysis_error(self, data: dict):
-        """解析エラー時の処理（UIスレッド）"""
+    def open_impact_dialog(self):
+        """直近の解析結果に対する影響調査ダイアログを開く"""
+        if self.last_analysis is None or self.project_index is None:
+            messagebox.showinfo("影響調査", "先にプロジェクトを解析してください")
+            return
+        ImpactAnalysisDialog(self.root, self.last_analysis, self.project_index)
+
+    def _on_analysis_cancelled(self):
+        """解析キャンセル時の処理（UIスレッド）"""
+        self._reset_analysis_state()
+        self.update_progress(0, "キャンセルしました")
+        self._log_to_ui("キャンセルしました（生成途中のファイルは出力していません）", 'WARNING')
+
+    def _reset_analysis_state(self):
+        """解析終了後にボタン状態を戻す"""
         self.is_analyzing = False
+        self.cancel_token = None
         self.analyze_btn.config(state='normal', text="解析開始")
+        self.cancel_btn.config(state='disabled')
+
+    def _on_analysis_error(self, data: dict):
+        """解析エラー時の処理（UIスレッド）"""
+        self._reset_analysis_state()
         self.update_progress(0, "エラーが発生しました")
 
         error_msg = data['error']
         tb = data.get('traceback', '')
 
+        if data.get('safety'):
+            self._log_to_ui(error_msg, 'ERROR')
+            messagebox.showerror("ファイルエラー", error_msg)
+            return
+
         self._log_to_ui(f"エラー: {error_msg}", 'ERROR')
 
         # エラーダイアログにログファイルの場所を表示
@@ -1036,7 +1263,7 @@ class ForguncyInsightApp:
 
         try:
             output_dir = self.output_dir.get()
-            file_path = generate_diff_excel(
+            file_path = exporters.generate_diff_excel(
                 self._last_diff,
                 self._last_diff_old_name,
                 self._last_diff_new_name,
@@ -1067,6 +1294,11 @@ class ForguncyInsightApp:
         else:
             self.output_excel.state(['disabled', '!selected'])
 
+        if self.license_manager.limits.get('html_export'):
+            self.output_html.state(['!disabled', 'selected'])
+        else:
+            self.output_html.state(['disabled', '!selected'])
+
         # 差分比較タブを再構築
         for widget in self.tab_diff.winfo_children():
             widget.destroy()